@@ -0,0 +1 @@
+# bench — benchmark lokal crawler_engine (tanpa kuota CSE): python -m bench --help
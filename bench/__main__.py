@@ -0,0 +1,41 @@
+# bench/__main__.py
+# python -m bench [--only planning,search,extraction] [--quick] [-o hasil.json] [--compare sebelumnya.json]
+
+import sys, json, argparse
+
+from .suite import BENCHMARKS, DEFAULTS, QUICK, run_child, run_suite, compare
+
+def build_parser():
+    p=argparse.ArgumentParser(prog="bench",description="Benchmark crawler_engine terhadap CSE tiruan & situs berita palsu lokal.")
+    p.add_argument("--only",default=",".join(BENCHMARKS),help="Daftar benchmark dipisah koma")
+    p.add_argument("--quick",action="store_true",help="Rentang & jumlah artikel kecil (smoke)")
+    p.add_argument("-o","--output",default="-",help="File JSON hasil (default stdout)")
+    p.add_argument("--compare",help="File JSON hasil sebelumnya untuk dibandingkan")
+    for k,v in DEFAULTS.items():
+        p.add_argument("--"+k.replace("_","-"),type=type(v),default=None,help=f"default {v}")
+    p.add_argument("--child",help=argparse.SUPPRESS)
+    p.add_argument("--config",help=argparse.SUPPRESS)
+    return p
+
+def main(argv=None):
+    args=build_parser().parse_args(argv)
+    if args.child:
+        run_child(args.child,json.loads(args.config)); return 0
+    cfg=dict(DEFAULTS,**(QUICK if args.quick else {}))
+    cfg.update({k:getattr(args,k) for k in DEFAULTS if getattr(args,k) is not None})
+    names=[n for n in args.only.split(",") if n]
+    unknown=[n for n in names if n not in BENCHMARKS]
+    if unknown:
+        print(f"Benchmark tidak dikenal: {', '.join(unknown)}",file=sys.stderr); return 2
+    report=run_suite(names,cfg,progress=lambda m: print(m,file=sys.stderr))
+    text=json.dumps(report,indent=2,ensure_ascii=False)
+    if args.output=="-": print(text)
+    else:
+        with open(args.output,"w",encoding="utf-8") as fh: fh.write(text+"\n")
+    if args.compare:
+        with open(args.compare,encoding="utf-8") as fh: old=json.load(fh)
+        print("\n".join(compare(old,report)),file=sys.stderr)
+    return 1 if any("error" in r for r in report["results"]) else 0
+
+if __name__=="__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+# bench/servers.py
+# Server lokal untuk benchmark tanpa kuota: tiruan endpoint customsearch/v1 dan situs berita palsu.
+# Keduanya http.server multi-thread di thread latar; latensi, jumlah hasil dan laju 429 bisa diatur.
+
+import re, gzip, json, time, random, threading, zlib
+from datetime import date, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+class _QuietServer(ThreadingHTTPServer):
+    """Klien yang menutup koneksi lebih awal (baca body terpotong) bukan error."""
+    def handle_error(self,request,client_address):
+        import sys
+        if not isinstance(sys.exc_info()[1],(ConnectionError,TimeoutError)):
+            super().handle_error(request,client_address)
+
+class _Server:
+    """Basis: jalankan handler di ThreadingHTTPServer 127.0.0.1:port-acak pada thread daemon."""
+    def __init__(self):
+        outer=self
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version="HTTP/1.1"
+            def do_GET(self): outer.handle(self)
+            def log_message(self,*a): pass
+        self.httpd=_QuietServer(("127.0.0.1",0),Handler)
+        self.httpd.daemon_threads=True
+        self.lock=threading.Lock()
+        self.thread=None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def start(self):
+        self.thread=threading.Thread(target=self.httpd.serve_forever,daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown(); self.httpd.server_close()
+
+    def __enter__(self): return self.start()
+    def __exit__(self,*exc): self.stop()
+
+    @staticmethod
+    def send(req,status,body,content_type="application/json",headers=None,compress=False):
+        """`compress`: gzip jika klien mengirim Accept-Encoding: gzip."""
+        data=body if isinstance(body,bytes) else body.encode("utf-8")
+        if compress and "gzip" in req.headers.get("Accept-Encoding",""):
+            data=gzip.compress(data,compresslevel=5); headers=dict(headers or {},**{"Content-Encoding":"gzip"})
+        req.send_response(status)
+        req.send_header("Content-Type",content_type)
+        req.send_header("Content-Length",str(len(data)))
+        for k,v in (headers or {}).items(): req.send_header(k,v)
+        req.end_headers()
+        req.wfile.write(data)
+
+class MockCSE(_Server):
+    """
+    Tiruan customsearch/v1. Tiap hari di rentang after:/before: punya `rate_per_day` artikel;
+    totalResults = jumlah artikel di rentang, item maksimal 100 per query (seperti CSE).
+      - latency: detik per request
+      - error_rate: peluang 429 "rateLimitExceeded" (per menit, bisa dicoba ulang)
+      - overlap: peluang sebuah item adalah artikel hari tetangga di luar rentang → duplikat antar shard
+    Link item menunjuk ke `news` (FakeNewsSites) jika diberikan. Seperti API asli, item membawa
+    htmlTitle/pagemap/metatags kecuali parameter `fields` diberikan (partial response), dan respons
+    di-gzip jika diminta.
+    """
+    def __init__(self,rate_per_day=20,latency=0.05,error_rate=0.0,overlap=0.0,news=None,seed=1):
+        super().__init__()
+        self.rate_per_day, self.latency, self.error_rate, self.overlap = rate_per_day, latency, error_rate, overlap
+        self.news, self.seed = news, seed
+        self.calls=self.errors=0
+
+    @property
+    def url(self):
+        return self.base_url+"/customsearch/v1"
+
+    def link(self,day,k):
+        if self.news: return self.news.article_url(day,k)
+        return f"https://berita.example.id/read/{day:%Y/%m/%d}/{k}"
+
+    def results(self,a,b,q):
+        """Artikel rentang [a, b) dalam urutan ranking deterministik per query."""
+        days=max(0,(b-a).days)
+        rng=random.Random(zlib.crc32(f"{self.seed}|{q}|{a}|{b}".encode()))
+        arts=[(a+timedelta(days=d),k) for d in range(days) for k in range(self.rate_per_day)]
+        rng.shuffle(arts)
+        out=[]
+        for day,k in arts[:100]:
+            if self.overlap and rng.random()<self.overlap:
+                day=day+timedelta(days=rng.choice((-1,days)) or -1)   # hari tepat di luar rentang
+            out.append((day,k))
+        return len(arts),out
+
+    def handle(self,req):
+        with self.lock: self.calls+=1
+        if self.latency: time.sleep(self.latency)
+        params={k:v[0] for k,v in parse_qs(urlparse(req.path).query).items()}
+        if self.error_rate and random.random()<self.error_rate:
+            with self.lock: self.errors+=1
+            return self.send(req,429,json.dumps({"error":{"code":429,"message":"Rate Limit Exceeded",
+                                                          "errors":[{"reason":"rateLimitExceeded"}]}}))
+        q=params.get("q","")
+        m_a,m_b=re.search(r"after:(\S+)",q),re.search(r"before:(\S+)",q)
+        a=date.fromisoformat(m_a.group(1)) if m_a else date(2024,1,1)
+        b=date.fromisoformat(m_b.group(1)) if m_b else a+timedelta(days=30)
+        total,ranked=self.results(a,b,re.sub(r"\s*(after|before):\S+","",q))
+        start,num=int(params.get("start",1)),int(params.get("num",10))
+        items=[{"title":f"Berita {day:%d/%m/%Y} #{k}","link":self.link(day,k),
+                "snippet":f"Ringkasan berita tanggal {day:%d %B %Y} nomor {k}."}
+               for day,k in ranked[start-1:start-1+num]]
+        body={"searchInformation":{"totalResults":str(total)}}
+        if items: body["items"]=items if "fields" in params else [self.full_item(it) for it in items]
+        if "fields" not in params:
+            body.update({"kind":"customsearch#search","queries":{"request":[dict(params,totalResults=str(total))]},
+                         "context":{"title":"CSE"}})
+        self.send(req,200,json.dumps(body),compress=True)
+
+    @staticmethod
+    def full_item(it):
+        """Item lengkap seperti CSE asli (field yang tidak dipakai crawler)."""
+        url=it["link"]
+        meta={"og:title":it["title"],"og:description":it["snippet"],"og:url":url,"og:type":"article",
+              "og:image":url+"/thumb.jpg","twitter:card":"summary_large_image","viewport":"width=device-width",
+              "article:section":"Nasional","content_tag":"berita, nasional, terkini"}
+        return dict(it,kind="customsearch#result",htmlTitle=f"<b>{it['title']}</b>",displayLink=urlparse(url).netloc,
+                    htmlSnippet=f"<b>{it['snippet']}</b>",formattedUrl=url,htmlFormattedUrl=url,cacheId=f"{zlib.crc32(url.encode()):x}",
+                    pagemap={"cse_thumbnail":[{"src":url+"/thumb.jpg","width":"300","height":"168"}],
+                             "metatags":[meta],"cse_image":[{"src":url+"/image.jpg"}],
+                             "newsarticle":[{"headline":it["title"],"datepublished":"2024-06-01","author":"Redaksi"}]})
+
+PARAGRAF=[
+    "Pemerintah menegaskan komitmennya untuk mempercepat transformasi digital di berbagai sektor pelayanan publik.",
+    "Menurut data Badan Pusat Statistik, pertumbuhan ekonomi pada kuartal ini tercatat lebih tinggi dari perkiraan.",
+    "Sejumlah pengamat menilai kebijakan tersebut perlu diikuti pengawasan yang ketat agar tepat sasaran.",
+    "Warga di beberapa kecamatan mengeluhkan kemacetan yang semakin parah menjelang akhir pekan.",
+    "Kepala dinas setempat mengatakan anggaran tambahan telah disiapkan untuk perbaikan infrastruktur jalan.",
+    "Kecerdasan buatan mulai dimanfaatkan oleh perusahaan rintisan untuk meningkatkan efisiensi operasional.",
+    "Dalam keterangannya kepada wartawan, juru bicara kementerian menyebut evaluasi akan dilakukan setiap bulan.",
+    "Harga kebutuhan pokok di pasar tradisional relatif stabil meskipun permintaan meningkat.",
+    "Aparat kepolisian mengimbau masyarakat untuk tetap waspada terhadap modus penipuan daring.",
+    "Para pelaku usaha mikro berharap pelatihan pemasaran digital dapat diperluas ke daerah terpencil.",
+]
+
+class FakeNewsSites:
+    """
+    Situs berita palsu: `hosts` server (port berbeda = domain berbeda untuk scheduler per host),
+    HTML artikel berbahasa Indonesia realistis (nav, iklan, skrip, rail teaser <article>, "Baca juga")
+    ± `page_kb` KB,
+    latensi per request `latency` detik. Mendukung ETag/If-None-Match (304).
+    """
+    def __init__(self,hosts=4,latency=0.05,page_kb=80,seed=1):
+        self.latency, self.page_kb, self.seed = latency, page_kb, seed
+        self.servers=[self._site(i) for i in range(hosts)]
+        self.requests=self.bytes_sent=0
+        self.lock=threading.Lock()
+
+    def _site(self,i):
+        site=_Server(); site.handle=lambda req,i=i: self.handle(req,i)
+        return site
+
+    def start(self):
+        for s in self.servers: s.start()
+        return self
+
+    def stop(self):
+        for s in self.servers: s.stop()
+
+    def __enter__(self): return self.start()
+    def __exit__(self,*exc): self.stop()
+
+    def article_url(self,day,k):
+        site=self.servers[zlib.crc32(f"{day}|{k}".encode())%len(self.servers)]
+        return f"{site.base_url}/read/{day:%Y/%m/%d}/{k}/berita-{day:%Y%m%d}-{k}"
+
+    def page(self,path):
+        rng=random.Random(zlib.crc32(f"{self.seed}|{path}".encode()))
+        title=f"{rng.choice(PARAGRAF).split(',')[0][:70]}"
+        body="".join(f"<p>{' '.join(rng.choice(PARAGRAF) for _ in range(rng.randint(2,5)))}</p>\n"
+                     for _ in range(rng.randint(8,20)))
+        junk="<script>"+"var _ads=[];"*40+"</script>\n"
+        nav="<nav><ul>"+"".join(f'<li><a href="/kanal/{i}">Kanal {i}</a></li>' for i in range(30))+"</ul></nav>"
+        related='<div class="baca-juga">'+"".join(f'<a href="/read/{i}">Baca juga: berita terkait {i}</a>' for i in range(6))+"</div>"
+        # rail "Terkini" berbentuk <article> (> 2 KB markup, teks pendek) sebelum berita utama, seperti banyak outlet
+        teaser=('<article class="terkini"><h2>Terkini</h2><ul>'
+                +"".join(f'<li class="terkini__item"><a href="/read/terkini/{i}" class="terkini__link" data-track="terkini-{i}">'
+                         f'<img src="/img/terkini/{i}.jpg" alt="thumbnail" width="120" height="80" loading="lazy">'
+                         f'<h3 class="terkini__title">{rng.choice(PARAGRAF)[:60]}</h3></a></li>' for i in range(10))
+                +"</ul></article>")
+        html=(f'<!DOCTYPE html><html lang="id"><head><meta charset="utf-8"><title>{title} - Berita Lokal</title>'
+              f'<meta property="og:title" content="{title}"><meta name="author" content="Redaksi {rng.randint(1,20)}">'
+              f'<meta property="article:published_time" content="{"-".join(path.split("/")[2:5])}">{junk}</head>'
+              f'<body>{nav}<header><div class="ads-top">Iklan</div></header>'
+              f'<main>{teaser}<article><h1>{title}</h1><div class="content">{body}{related}</div></article></main>'
+              f'<aside class="sidebar">{"<div>Terpopuler</div>"*20}</aside><footer>© Berita Lokal</footer>')
+        pad=max(0,self.page_kb*1024-len(html))
+        return (html+f"<script>/*{'x'*pad}*/</script></body></html>").encode("utf-8")
+
+    def handle(self,req,i):
+        if self.latency: time.sleep(self.latency)
+        path=urlparse(req.path).path
+        etag=f'"{zlib.crc32(path.encode())}"'
+        if req.headers.get("If-None-Match")==etag:
+            with self.lock: self.requests+=1
+            req.send_response(304); req.send_header("ETag",etag); req.send_header("Content-Length","0"); req.end_headers()
+            return
+        data=self.page(path)
+        with self.lock: self.requests+=1; self.bytes_sent+=len(data)
+        _Server.send(req,200,data,"text/html; charset=utf-8",{"ETag":etag})
@@ -0,0 +1,200 @@
+# bench/suite.py
+# Benchmark engine terhadap server lokal (bench/servers.py). Tiap benchmark berjalan di subprocess
+# sendiri dengan CRAWLER_CACHE_DIR sementara → cache/store/ledger bersih dan peak RSS terpisah.
+
+import os, sys, json, time, resource, platform, subprocess, tempfile
+from datetime import date, timedelta
+
+DEFAULTS = {
+    "cse_latency": 0.05,      # detik per request CSE tiruan
+    "rate_per_day": 20,       # artikel tersedia per hari per query
+    "overlap": 0.05,          # porsi item yang jatuh ke hari tetangga (duplikat antar shard)
+    "error_rate": 0.0,        # peluang 429 per request CSE
+    "days": 90,               # rentang tanggal benchmark planning/search
+    "target_links": 1000,
+    "max_calls": 300,
+    "articles": 300,
+    "hosts": 4,
+    "news_latency": 0.03,
+    "page_kb": 80,
+}
+QUICK = {"days": 30, "target_links": 300, "articles": 80}
+
+def bench_pool():
+    from crawler_engine.quota import KeyPool
+    return KeyPool([("bench-key","bench-cx")],daily_quota=10**9)
+
+def start_cse(cfg,news=None):
+    from bench.servers import MockCSE
+    import crawler_engine.cse as cse
+    mock=MockCSE(cfg["rate_per_day"],cfg["cse_latency"],cfg["error_rate"],cfg["overlap"],news).start()
+    cse.CSE_URL=mock.url
+    cse.CSE_RETRY_BACKOFF=0.05
+    return mock
+
+def bench_planning(cfg):
+    """Efisiensi rencana shard: call per link unik untuk tiap mode planner pada data yang sama."""
+    from crawler_engine.crawl import run_split_search, run_adaptive_search
+    from crawler_engine.planner import plan_auto_optimize
+    from crawler_engine.urls import DedupSet
+    mock=start_cse(cfg); pool=bench_pool()
+    end=date(2024,6,30); start=end-timedelta(days=cfg["days"]-1)
+    rows={}
+    def run(name,fn):
+        c0,t0=mock.calls,time.perf_counter()
+        dedup=DedupSet(); fn(dedup)
+        calls=mock.calls-c0
+        rows[name]={"calls":calls,"unique_links":len(dedup),"wall_s":round(time.perf_counter()-t0,3),
+                    "calls_per_unique_link":round(calls/max(1,len(dedup)),4)}
+    for gran,L in (("Monthly",100),("Weekly",50),("Daily",20)):
+        q=f"bench {gran.lower()}"
+        run(f"manual_{gran.lower()}_{L}",lambda d,q=q,gran=gran,L=L: run_split_search(
+            pool,pool.cx,q,start,end,gran,L,"id","id",shard_workers=8,qps=100,dedup=d))
+    for label,warm in (("auto",False),("auto_model",True)):
+        q=f"bench {label}"
+        if warm:   # riwayat yield dari rentang sebelumnya (query sama) → planner memakai model
+            run_split_search(pool,pool.cx,q,start-timedelta(days=60),start-timedelta(days=1),"Weekly",50,"id","id",
+                             shard_workers=8,qps=100)
+        plan=plan_auto_optimize(start,end,cfg["target_links"],cfg["max_calls"],None,q)
+        run(label,lambda d,q=q,plan=plan: run_split_search(pool,pool.cx,q,start,end,plan[0],plan[1],"id","id",
+                                                          shard_workers=8,qps=100,dedup=d))
+        rows[label]["plan"]=f"{plan[0]}/{plan[1]}"
+    run("adaptive",lambda d: run_adaptive_search(pool,pool.cx,"bench adaptive",start,end,"id","id",
+                                                 cfg["max_calls"],cfg["target_links"],shard_workers=8,qps=100,dedup=d))
+    mock.stop()
+    return {"plans":rows}
+
+def bench_search(cfg):
+    """Throughput pencarian: halaman CSE per detik (shard harian paralel, latensi & 429 dari mock)."""
+    from crawler_engine.crawl import run_split_search
+    mock=start_cse(cfg); pool=bench_pool()
+    end=date(2024,6,30); start=end-timedelta(days=cfg["days"]-1)
+    from crawler_engine.http import TRANSFER
+    before,t0=TRANSFER.snapshot(),time.perf_counter()
+    items=run_split_search(pool,pool.cx,"bench search",start,end,"Daily",30,"id","id",shard_workers=8,qps=100)
+    el=time.perf_counter()-t0
+    cse=TRANSFER.since(before).get("cse",{})
+    mock.stop()
+    return {"requests":mock.calls,"errors_429":mock.errors,"links":len(items),"wall_s":round(el,3),
+            "requests_per_s":round(mock.calls/el,2),"links_per_s":round(len(items)/el,2),
+            "kb_wire":round(cse.get("wire",0)/1024,1),"kb_body":round(cse.get("body",0)/1024,1)}
+
+def bench_extraction(cfg):
+    """Ekstraksi artikel dari situs palsu: artikel/detik untuk parse di thread vs ProcessPool, lalu run hangat."""
+    import crawler_engine.articles as articles
+    from crawler_engine.http import TRANSFER
+    from bench.servers import FakeNewsSites
+    sites=FakeNewsSites(cfg["hosts"],cfg["news_latency"],cfg["page_kb"]).start()
+    day=date(2024,6,1)
+    links=[sites.article_url(day+timedelta(days=i//50),i%50) for i in range(cfg["articles"])]
+    out={}
+    for name,parse_workers in (("parse_in_thread",0),("parse_pool",articles.PARSE_WORKERS_DEFAULT)):
+        store=articles.get_article_store()
+        store.conn.execute("DELETE FROM articles"); store.conn.execute("DELETE FROM blobs")
+        r0,b0,t0=sites.requests,sites.bytes_sent,time.perf_counter()
+        before=TRANSFER.snapshot()
+        rows=articles.enrich_with_articles([{"link":u} for u in links],max_workers=16,per_host=4,delay=0.0,
+                                           parse_workers=parse_workers)
+        el=time.perf_counter()-t0
+        art=TRANSFER.since(before).get("article",{})
+        out[name]={"articles":len(rows),"wall_s":round(el,3),"articles_per_s":round(len(rows)/el,2),
+                   "requests":sites.requests-r0,"mb_downloaded":round((sites.bytes_sent-b0)/2**20,2),
+                   "mb_read":round(art.get("wire",0)/2**20,2),"cut":art.get("cut",0),
+                   "with_text":sum(1 for r in rows if r.get("article_text"))}
+    # run hangat: semua artikel direvalidasi (ETag → 304), tanpa parse ulang
+    articles.ARTICLE_REVALIDATE_AFTER=0
+    r0,b0,t0=sites.requests,sites.bytes_sent,time.perf_counter()
+    rows=articles.enrich_with_articles([{"link":u} for u in links],max_workers=16,per_host=4,delay=0.0)
+    el=time.perf_counter()-t0
+    out["revalidate_304"]={"articles":len(rows),"wall_s":round(el,3),"articles_per_s":round(len(rows)/el,2),
+                           "requests":sites.requests-r0,"mb_downloaded":round((sites.bytes_sent-b0)/2**20,2)}
+    sites.stop()
+    return out
+
+BENCHMARKS = {"planning": bench_planning, "search": bench_search, "extraction": bench_extraction}
+
+PARSE_WORKER_RSS = []   # VmHWM (MB) tiap proses parser, dicatat sebelum ProcessPool ditutup
+
+def peak_rss_mb():
+    """Peak RSS proses benchmark ini, MB."""
+    scale=1 if sys.platform=="darwin" else 1024   # Linux: KB, macOS: byte
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss*scale/2**20,1)
+
+def vmhwm_mb(pid):
+    """Peak RSS proses lain dari /proc/<pid>/status (Linux); None jika tidak tersedia."""
+    try:
+        with open(f"/proc/{pid}/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"): return int(line.split()[1])/1024
+    except (OSError,ValueError):
+        pass
+    return None
+
+def sample_parse_workers():
+    """
+    Pool parser berjalan lewat forkserver/spawn: prosesnya anak forkserver, bukan anak proses ini,
+    sehingga RUSAGE_CHILDREN selalu 0. Ganti ProcessPoolExecutor (hanya di subprocess benchmark)
+    dengan subclass yang membaca VmHWM tiap worker tepat sebelum shutdown.
+    """
+    import concurrent.futures as futures
+    class SampledPool(futures.ProcessPoolExecutor):
+        def shutdown(self,*args,**kwargs):
+            for pid in list(self._processes or ()):
+                mb=vmhwm_mb(pid)
+                if mb is not None: PARSE_WORKER_RSS.append(mb)
+            return super().shutdown(*args,**kwargs)
+    futures.ProcessPoolExecutor=SampledPool
+
+def run_child(name,cfg):
+    """Dijalankan di subprocess: satu benchmark → satu baris JSON di stdout."""
+    sample_parse_workers()
+    t0=time.perf_counter()
+    metrics=BENCHMARKS[name](cfg)
+    print(json.dumps({"name":name,"wall_s":round(time.perf_counter()-t0,3),"peak_rss_mb":peak_rss_mb(),
+                      # null = tidak ada pool parser / bukan Linux
+                      "peak_rss_parse_worker_mb":round(max(PARSE_WORKER_RSS),1) if PARSE_WORKER_RSS else None,
+                      "metrics":metrics}))
+
+def run_suite(names,cfg,progress=print):
+    results=[]
+    for name in names:
+        progress(f"benchmark {name} ...")
+        with tempfile.TemporaryDirectory(prefix="crawler-bench-") as tmp:
+            env=dict(os.environ,CRAWLER_CACHE_DIR=tmp)
+            proc=subprocess.run([sys.executable,"-m","bench","--child",name,"--config",json.dumps(cfg)],
+                                capture_output=True,text=True,env=env)
+        if proc.returncode!=0:
+            results.append({"name":name,"error":proc.stderr.strip().splitlines()[-1:] or ["gagal"]})
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return {"meta":environment(cfg),"results":results}
+
+def environment(cfg):
+    try:
+        rev=subprocess.run(["git","rev-parse","--short","HEAD"],capture_output=True,text=True,
+                           cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        rev=""
+    return {"git":rev,"python":platform.python_version(),"platform":platform.platform(),
+            "cpu_count":os.cpu_count(),"timestamp":time.strftime("%Y-%m-%dT%H:%M:%S"),"config":cfg}
+
+def flatten(d,prefix=""):
+    out={}
+    for k,v in d.items():
+        key=f"{prefix}{k}"
+        if isinstance(v,dict): out.update(flatten(v,key+"."))
+        elif isinstance(v,(int,float)) and not isinstance(v,bool): out[key]=v
+    return out
+
+def compare(old,new):
+    """Baris teks: metrik numerik lama → baru (Δ%) per benchmark."""
+    old_by={r["name"]:flatten(r) for r in old["results"] if "error" not in r}
+    lines=[]
+    for r in new["results"]:
+        if "error" in r or r["name"] not in old_by: continue
+        prev=old_by[r["name"]]
+        for k,v in flatten(r).items():
+            if k in prev:
+                delta=(v-prev[k])/prev[k]*100 if prev[k] else 0.0
+                lines.append(f"{r['name']:<11} {k:<50} {prev[k]:>12} → {v:>12}  ({delta:+.1f}%)")
+    return lines
@@ -0,0 +1,34 @@
+# crawler_engine — mesin crawl headless (tanpa Streamlit) untuk Google CSE + ekstraksi artikel.
+# Dipakai oleh front-end Streamlit (crawler_berita.py, crawler_extract_berita.py) dan CLI:
+#   python -m crawler_engine search --query "AI site:kompas.com" --from 2024-01-01 --to 2024-01-31 --plan auto --extract
+#   python -m crawler_engine resume <job_id>      # lanjutkan job dari checkpoint terakhir
+#   python -m crawler_engine watch run            # crawl delta semua query tersimpan
+# Import submodul dilakukan lazy agar startup CLI/worker tetap cepat.
+
+import importlib
+
+_EXPORTS = {
+    "daterange_chunks": "util", "build_query_with_dates": "util", "clean_text": "util",
+    "search_cse": "cse", "search_cse_paginated": "cse", "get_cse_cache": "cse",
+    "estimate_calls_and_results": "planner", "plan_auto_optimize": "planner",
+    "count_cached_calls": "planner", "max_per_shard_limit_under_calls": "planner",
+    "estimate_with_model": "planner", "get_yield_store": "yields",
+    "run_split_search": "crawl", "run_adaptive_search": "crawl",
+    "extract_article": "articles", "iter_articles": "articles", "enrich_with_articles": "articles",
+    "get_article_store": "articles",
+    "job_params": "jobs", "create_job": "jobs", "run_job": "jobs", "job_results": "jobs",
+    "get_job_store": "jobs",
+    "KeyPool": "quota", "get_quota_ledger": "quota", "parse_key_pool": "quota",
+    "expand_matrix": "batch", "plan_batch": "batch", "batch_params": "batch", "run_batch_search": "batch",
+    "get_search_index": "search", "write_results": "results", "ResultSet": "results",
+    "export_result": "exports", "export_to": "exports",
+    "save_watch": "watches", "run_watch": "watches", "get_watch_store": "watches",
+    "render_prometheus": "metrics", "write_prometheus": "metrics", "serve_prometheus": "metrics",
+}
+
+__all__ = sorted(_EXPORTS)
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
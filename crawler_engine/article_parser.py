@@ -0,0 +1,163 @@
+# crawler_engine/article_parser.py
+# Ekstraksi isi artikel dari HTML mentah: lxml (parser C) + aturan selector per domain,
+# fallback readability generik → newspaper3k → BeautifulSoup.
+# Sengaja bebas Streamlit: modul ini di-import oleh worker ProcessPool tahap parse.
+
+import re, time
+from collections import defaultdict
+from functools import lru_cache
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+@lru_cache(maxsize=None)
+def _lxml():
+    """Import lxml (parser C) saat pertama dipakai; None jika tidak terpasang → BeautifulSoup."""
+    try:
+        import lxml.html
+        from lxml.cssselect import CSSSelector
+        return lxml.html, CSSSelector
+    except ImportError:
+        return None
+
+def clean_text(x: str) -> str:
+    if not x: return ""
+    return re.sub(r"\s+", " ", str(x)).strip()
+
+def url_host(url):
+    return urlparse(url).netloc.lower()
+
+# Aturan per outlet: selector CSS untuk judul/isi/penulis/tanggal, dan parameter query
+# untuk varian satu-halaman ("all_pages") agar artikel multi-halaman cukup 1x fetch.
+DOMAIN_RULES={
+    "kompas.com":      {"title":"h1.read__title","body":".read__content","author":".credit-title-name",
+                        "date":".read__time","all_pages":("page","all")},
+    "detik.com":       {"title":"h1.detail__title","body":".detail__body-text","author":".detail__author",
+                        "date":".detail__date","all_pages":("single","1")},
+    "tribunnews.com":  {"title":"h1#arttitle","body":".side-article.txt-article, .txt-article","author":"#penulis a",
+                        "date":"time","all_pages":("page","all")},
+    "okezone.com":     {"title":"h1","body":"#contentx, .read","all_pages":("page","all")},
+    "sindonews.com":   {"title":"h1","body":"#detail-desc, .detail-desc","all_pages":("showpage","all")},
+    "cnnindonesia.com":{"title":"h1","body":".detail-text"},
+    "cnbcindonesia.com":{"title":"h1","body":".detail_text"},
+    "liputan6.com":    {"title":"h1.read-page--header--title","body":".article-content-body__item-content",
+                        "author":".read-page--header--author__name","date":"time.read-page--header--author__datetime"},
+    "tempo.co":        {"title":"h1","body":"#isi, .detail-konten"},
+    "antaranews.com":  {"title":"h1","body":".post-content"},
+    "republika.co.id": {"title":"h1","body":".article-content"},
+    "suara.com":       {"title":"h1","body":".detail--content"},
+}
+# Elemen sampah yang dibuang sebelum mengambil teks (nav, iklan, "Baca juga", dll.)
+JUNK_SELECTOR=("script, style, noscript, iframe, form, nav, header, footer, aside, figure, "
+               "[class*=baca-juga], [class*=read__also], [class*=related], [class*=share], "
+               "[class*=social], [class*=advert], [class*=ads-], [class*=comment], [id*=comment]")
+META_AUTHOR=('meta[name="author"], meta[property="article:author"], meta[name="content_author"], '
+             'meta[name="dtk:author"]')
+META_DATE=('meta[property="article:published_time"], meta[name="content_PublishedDate"], '
+           'meta[name="publishdate"], meta[name="dtk:publishdate"], meta[itemprop="datePublished"]')
+MIN_ARTICLE_CHARS=200
+
+def domain_rule(url):
+    host=url_host(url).split(":")[0]
+    for dom,rule in DOMAIN_RULES.items():
+        if host==dom or host.endswith("."+dom): return rule
+    return None
+
+def all_pages_url(url):
+    """URL varian satu-halaman (mis. kompas ?page=all, detik ?single=1) jika outlet mendukung."""
+    rule=domain_rule(url)
+    if not rule or "all_pages" not in rule: return url
+    key,val=rule["all_pages"]
+    p=urlparse(url)
+    q=[(k,v) for k,v in parse_qsl(p.query,keep_blank_values=True) if k!=key]+[(key,val)]
+    return urlunparse(p._replace(query=urlencode(q)))
+
+@lru_cache(maxsize=None)
+def _css(sel):
+    return _lxml()[1](sel,translator="html")
+
+def _first_text(doc,sel):
+    for el in (_css(sel)(doc) if sel else []):
+        t=clean_text(el.text_content())
+        if t: return t
+    return ""
+
+def _meta(doc,sel):
+    for el in _css(sel)(doc):
+        t=clean_text(el.get("content") or el.get("datetime") or "")
+        if t: return t
+    return ""
+
+def _block_text(el):
+    paras=[clean_text(p.text_content()) for p in el.iter("p")]
+    paras=[t for t in paras if t]
+    return " ".join(paras) if paras else clean_text(el.text_content())
+
+def _readability_body(doc):
+    """Fallback generik ala readability: kontainer dengan skor teks <p> tertinggi."""
+    scores=defaultdict(float)
+    for p in doc.iter("p"):
+        n=len(clean_text(p.text_content()))
+        if n<40: continue
+        parent=p.getparent()
+        if parent is None: continue
+        scores[parent]+=n
+        grand=parent.getparent()
+        if grand is not None: scores[grand]+=n/2
+    if not scores: return ""
+    return _block_text(max(scores,key=scores.get))
+
+def parse_article_lxml(url,html_bytes):
+    doc=_lxml()[0].fromstring(html_bytes)
+    for el in _css(JUNK_SELECTOR)(doc):
+        if el.getparent() is not None: el.drop_tree()
+    rule=domain_rule(url) or {}
+    text=""
+    if rule.get("body"):
+        text=" ".join(_block_text(el) for el in _css(rule["body"])(doc))
+    if len(text)<MIN_ARTICLE_CHARS:
+        text=_readability_body(doc) or text
+    title=(_first_text(doc,rule.get("title")) or _meta(doc,'meta[property="og:title"]')
+           or _first_text(doc,"h1") or _first_text(doc,"title"))
+    return {
+        "article_title":title,
+        "article_text":clean_text(text),
+        "article_author":_first_text(doc,rule.get("author")) or _meta(doc,META_AUTHOR),
+        "article_published":_meta(doc,META_DATE) or _first_text(doc,rule.get("date")),
+    }
+
+def parse_article_html(url,html_bytes):
+    """lxml + aturan domain → readability generik → newspaper3k (jika teks masih terlalu pendek)."""
+    fields=None
+    if _lxml() is not None:
+        try: fields=parse_article_lxml(url,html_bytes)
+        except Exception: fields=None
+        if fields and len(fields["article_text"])>=MIN_ARTICLE_CHARS:
+            return fields
+    try:
+        # newsfetch memakai newspaper3k; parse langsung dari HTML yang sudah diunduh
+        from newspaper import Article
+        a=Article(url); a.download(input_html=html_bytes.decode("utf-8","replace")); a.parse()
+        if a.text:
+            return {
+                "article_title":clean_text(a.title or ""),
+                "article_text":clean_text(a.text or ""),
+                "article_author":clean_text(", ".join(a.authors or []) or ""),
+                "article_published":clean_text(str(a.publish_date or "")) if a.publish_date else ""
+            }
+    except Exception:
+        pass
+    if fields: return fields
+    # Fallback sederhana
+    from bs4 import BeautifulSoup
+    soup=BeautifulSoup(html_bytes,"html.parser")
+    paras=" ".join(p.get_text() for p in soup.find_all("p"))
+    return {
+        "article_title":clean_text(soup.title.get_text() if soup.title else ""),
+        "article_text":clean_text(paras),
+        "article_author":"", "article_published":""
+    }
+
+def parse_timed(url,html_bytes):
+    """Entry point worker proses: (fields, detik CPU parse)."""
+    t0=time.process_time()
+    fields=parse_article_html(url,html_bytes)
+    return fields, time.process_time()-t0
@@ -0,0 +1,308 @@
+# crawler_engine/articles.py
+# Ekstraksi artikel: store persisten (revalidasi ETag/Last-Modified) + pipeline
+# fetch (thread, dijadwalkan per host) → parse (ProcessPool).
+# Body di-stream: respons bukan HTML ditolak sebelum body diunduh, unduhan dipotong di
+# ARTICLE_MAX_BYTES dan (lean I/O) berhenti begitu kontainer <article> pertama tertutup.
+
+import os, re, json, time, zlib, sqlite3, hashlib, threading
+import multiprocessing
+import concurrent.futures as futures
+from collections import defaultdict, deque
+from functools import lru_cache
+
+from . import metrics
+from .article_parser import parse_article_html, parse_timed, all_pages_url, url_host
+from .http import HTTP, HOST_MAX_CONCURRENCY, HOST_DELAY, LEAN_IO, TRANSFER, host_session, wire_bytes
+from .urls import canonical_url
+from .util import CACHE_DIR, noop_progress
+
+ARTICLE_REVALIDATE_AFTER = 6*3600   # detik; sebelum ini artikel tersimpan dipakai tanpa request
+PARSE_WORKERS_DEFAULT = min(4, os.cpu_count() or 1)  # proses parser HTML (0 = parse di thread fetch)
+ARTICLE_MAX_BYTES = 2*1024*1024   # batas body per artikel (setelah dekompresi); 0 = tanpa batas
+ARTICLE_CHUNK = 16*1024           # ukuran potongan baca streaming (granularitas batas & berhenti awal)
+EARLY_STOP_MIN_TEXT = 800        # karakter teks <p>; <article> dengan teks lebih sedikit (kartu teaser) tidak menghentikan unduhan
+HTML_TYPES = ("text/html","application/xhtml+xml","text/xml","application/xml")
+_ARTICLE_TAG = re.compile(rb"<(/?)article[\s>]",re.I)
+_PARAGRAPH = re.compile(rb"<p(?:\s[^>]*)?>(.*?)</p>",re.I|re.S)
+_TAG = re.compile(rb"<[^>]*>")
+# Proses parser tidak di-fork dari proses pemanggil yang multi-thread (Streamlit, pool fetch):
+# fork bisa mewarisi lock yang sedang dipegang thread lain dan membuat proses anak macet.
+PARSE_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+EMPTY_ARTICLE={"article_title":"","article_text":"","article_author":"","article_published":""}
+
+def article_extracted(row):
+    """True jika baris membawa hasil ekstraksi (bukan EMPTY_ARTICLE dari fetch/parse yang gagal)."""
+    return any(row.get(k) for k in EMPTY_ARTICLE)
+
+class ArticleStore:
+    """
+    Penyimpanan artikel persisten (SQLite), content-addressed:
+      - blobs(hash → HTML terkompresi + field hasil ekstraksi), dipakai bersama antar URL
+      - articles(url kanonik → ETag/Last-Modified, hash konten, waktu cek terakhir)
+    """
+    def __init__(self,path):
+        os.makedirs(os.path.dirname(path) or ".",exist_ok=True)
+        self.stats=defaultdict(int)  # fresh / not_modified / unchanged / parsed
+        self.lock=threading.Lock()
+        self.conn=sqlite3.connect(path,check_same_thread=False,isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS blobs(
+            hash TEXT PRIMARY KEY, html BLOB, fields TEXT)""")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS articles(
+            url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, hash TEXT, checked REAL)""")
+
+    def get(self,url):
+        with self.lock:
+            row=self.conn.execute("""SELECT a.etag,a.last_modified,a.hash,a.checked,b.fields
+                FROM articles a LEFT JOIN blobs b ON a.hash=b.hash WHERE a.url=?""",(url,)).fetchone()
+        if not row: return None
+        return {"etag":row[0],"last_modified":row[1],"hash":row[2],"checked":row[3],
+                "fields":json.loads(row[4]) if row[4] else None}
+
+    def fields_for_hash(self,h):
+        with self.lock:
+            row=self.conn.execute("SELECT fields FROM blobs WHERE hash=?",(h,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def touch(self,url,etag=None,last_modified=None):
+        with self.lock:
+            self.conn.execute("""UPDATE articles SET checked=?,
+                etag=COALESCE(?,etag), last_modified=COALESCE(?,last_modified) WHERE url=?""",
+                (time.time(),etag,last_modified,url))
+
+    def put(self,url,etag,last_modified,h,html_bytes,fields):
+        with self.lock:
+            self.conn.execute("INSERT OR IGNORE INTO blobs VALUES(?,?,?)",
+                              (h,zlib.compress(html_bytes),json.dumps(fields,ensure_ascii=False)))
+            self.conn.execute("INSERT OR REPLACE INTO articles VALUES(?,?,?,?,?)",
+                              (url,etag,last_modified,h,time.time()))
+
+@lru_cache(maxsize=None)
+def get_article_store():
+    """Satu instance per proses (bertahan lintas rerun Streamlit)."""
+    return ArticleStore(os.path.join(CACHE_DIR,"articles.sqlite3"))
+
+def is_html(r):
+    """Content-Type HTML/XHTML (atau tidak ada header) — selain itu body tidak diunduh."""
+    ctype=r.headers.get("Content-Type","").split(";")[0].strip().lower()
+    return not ctype or ctype in HTML_TYPES
+
+def paragraph_chars(html):
+    """Jumlah karakter teks di dalam <p>…</p> (tanpa tag & spasi berlebih)."""
+    return sum(len(b" ".join(_TAG.sub(b" ",m.group(1)).split())) for m in _PARAGRAPH.finditer(html))
+
+def read_body(r,max_bytes=ARTICLE_MAX_BYTES,early_stop=LEAN_IO):
+    """
+    Baca body streaming → (bytes, dipotong?). Berhenti di `max_bytes`, atau dengan `early_stop`
+    setelah tag penutup kontainer <article> pertama (bersarang dihitung) yang memuat ≥ EARLY_STOP_MIN_TEXT
+    karakter teks paragraf: meta/JSON-LD di <head> dan isi artikel sudah terbaca, sisanya umumnya skrip,
+    related, footer. Kartu teaser/terkait berbentuk <article> sebelum berita utama dilewati.
+    """
+    buf=bytearray(); depth=0; opened=0; scanned=0
+    for chunk in r.iter_content(ARTICLE_CHUNK):
+        buf+=chunk
+        if max_bytes and len(buf)>=max_bytes:
+            return bytes(buf[:max_bytes]), True
+        if not early_stop: continue
+        for m in _ARTICLE_TAG.finditer(buf,max(0,scanned-16)):
+            if m.start()<scanned: continue
+            scanned=m.end()
+            if not m.group(1):
+                if depth==0: opened=m.start()
+                depth+=1
+            elif depth:
+                depth-=1
+                if depth==0 and paragraph_chars(buf[opened:m.end()])>=EARLY_STOP_MIN_TEXT:
+                    return bytes(buf[:m.end()]), True
+        scanned=max(scanned,len(buf)-16)
+    return bytes(buf), False
+
+def fetch_article(url,session=None,max_bytes=ARTICLE_MAX_BYTES):
+    """
+    Tahap I/O ekstraksi lewat ArticleStore → (fields, None) jika selesai tanpa parse,
+    atau (None, job) berisi bytes HTML yang perlu di-parse:
+      - dicek < ARTICLE_REVALIDATE_AFTER lalu → langsung dari store (tanpa request)
+      - conditional GET (If-None-Match / If-Modified-Since); 304 → field tersimpan
+      - bukan HTML → ditolak sebelum body diunduh; body dibaca lewat read_body (batas byte)
+      - 200 dengan hash konten yang sudah dikenal → parse dilewati
+    """
+    store=get_article_store()
+    key=canonical_url(url)
+    rec=store.get(key)
+    stored=dict(rec["fields"]) if rec and rec["fields"] is not None else None
+    if stored is not None and time.time()-(rec["checked"] or 0)<ARTICLE_REVALIDATE_AFTER:
+        store.stats["fresh"]+=1; metrics.inc("crawler_article_fetch_total",result="fresh")
+        return stored, None
+    headers={"User-Agent":"Mozilla/5.0"}
+    if stored is not None:
+        if rec["etag"]: headers["If-None-Match"]=rec["etag"]
+        if rec["last_modified"]: headers["If-Modified-Since"]=rec["last_modified"]
+    t0=time.perf_counter()
+    try:
+        r=(session or HTTP).get(all_pages_url(url),timeout=20,headers=headers,stream=True)
+    except Exception:
+        metrics.inc("crawler_article_fetch_total",result="error")
+        return stored or dict(EMPTY_ARTICLE), None
+    try:
+        if r.ok and not is_html(r):
+            length=int(r.headers.get("Content-Length") or 0)
+            TRANSFER.add("article",requests=1,rejected=1,saved_rejected=length)
+            metrics.inc("crawler_article_fetch_total",result="rejected")
+            if length: metrics.inc("crawler_bytes_saved_total",length,kind="article",reason="rejected")
+            return stored or dict(EMPTY_ARTICLE), None
+        try: content,cut=read_body(r,max_bytes) if r.ok else (b"",False)
+        except Exception:
+            metrics.inc("crawler_article_fetch_total",result="error")
+            return stored or dict(EMPTY_ARTICLE), None
+        wire=wire_bytes(r,len(content))
+    finally:
+        r.close()
+    length=int(r.headers.get("Content-Length") or 0)
+    saved_cut=max(0,length-wire) if cut else 0
+    TRANSFER.add("article",requests=1,wire=wire,body=len(content),saved_gzip=max(0,len(content)-wire),
+                 cut=int(cut),saved_cut=saved_cut)
+    if metrics.ENABLED:
+        metrics.observe("crawler_article_fetch_seconds",time.perf_counter()-t0,host=url_host(url))
+        metrics.inc("crawler_bytes_total",wire,kind="article")
+        if saved_cut: metrics.inc("crawler_bytes_saved_total",saved_cut,kind="article",reason="cut")
+    etag,last_mod=r.headers.get("ETag"),r.headers.get("Last-Modified")
+    if r.status_code==304 and stored is not None:
+        store.touch(key,etag,last_mod); store.stats["not_modified"]+=1
+        metrics.inc("crawler_article_fetch_total",result="not_modified")
+        return stored, None
+    if not r.ok:
+        metrics.inc("crawler_article_fetch_total",result="error")
+        return stored or dict(EMPTY_ARTICLE), None
+    job={"key":key,"url":url,"etag":etag,"last_modified":last_mod,
+         "hash":hashlib.sha256(content).hexdigest(),"content":content}
+    fields=store.fields_for_hash(job["hash"])
+    if fields is not None:
+        store.stats["unchanged"]+=1; metrics.inc("crawler_article_fetch_total",result="unchanged")
+        store.put(key,etag,last_mod,job["hash"],content,fields)
+        return dict(fields), None
+    metrics.inc("crawler_article_fetch_total",result="fetched")
+    return None, job
+
+def finish_article(job,fields):
+    """Simpan hasil parse ke store; dipanggil di thread utama setelah tahap parse."""
+    store=get_article_store()
+    store.stats["parsed"]+=1
+    store.put(job["key"],job["etag"],job["last_modified"],job["hash"],job["content"],fields)
+    return dict(fields)
+
+def extract_article(url,session=None,max_bytes=ARTICLE_MAX_BYTES):
+    """Fetch + parse sekaligus di thread pemanggil (tanpa process pool)."""
+    fields,job=fetch_article(url,session,max_bytes)
+    if job is None: return fields
+    try:
+        with metrics.timed("crawler_parse_seconds"): fields=parse_article_html(url,job["content"])
+    except Exception: fields=dict(EMPTY_ARTICLE)
+    return finish_article(job,fields)
+
+def new_pipeline_stats():
+    return {"t0":time.monotonic(),"fetched":0,"fetch_bytes":0,"parsed":0,"parse_cpu":0.0,
+            "parse_backlog":0,"parse_backlog_peak":0}
+
+def pipeline_summary(stats,n_done):
+    el=max(time.monotonic()-stats["t0"],1e-6)
+    return (f"{n_done/el:.1f} artikel/detik · fetch {stats['fetched']/el:.1f}/dtk "
+            f"({stats['fetch_bytes']/el/1024:.0f} KB/dtk) · parse {stats['parsed']/el:.1f}/dtk · "
+            f"antrian parse {stats['parse_backlog']}")
+
+def iter_articles(items,max_workers=8,per_host=HOST_MAX_CONCURRENCY,delay=HOST_DELAY,
+                  parse_workers=PARSE_WORKERS_DEFAULT,queue_size=None,stats=None,max_bytes=ARTICLE_MAX_BYTES):
+    """
+    Pipeline ekstraksi 2 tahap, yield (index, item) urut selesai (bukan urut submit):
+      1. fetch (thread, I/O) — scheduler di thread pemanggil hanya men-submit link yang
+         host-nya masih punya slot (≤ per_host koneksi, jeda `delay` detik antar request)
+      2. parse (ProcessPool, CPU) — bytes HTML masuk antrian terbatas `queue_size`;
+         jika antrian penuh, fetch baru ditahan (backpressure)
+    parse_workers=0 → parse di thread fetch (tanpa process pool). `max_bytes`: batas body per artikel.
+    """
+    stats=new_pipeline_stats() if stats is None else stats
+    queue_size=queue_size or max(4,parse_workers*4)
+    queues={}
+    for idx,it in enumerate(items):
+        if it.get("link"): queues.setdefault(url_host(it["link"]),deque()).append((idx,it))
+    active, next_ok = defaultdict(int), defaultdict(float)
+    fetching, parsing, backlog = {}, {}, deque()
+    if parse_workers>0: fetch_fn=lambda url,session: fetch_article(url,session,max_bytes)
+    else: fetch_fn=lambda url,session: (extract_article(url,session,max_bytes),None)
+    pool=(futures.ProcessPoolExecutor(max_workers=parse_workers,
+                                      mp_context=multiprocessing.get_context(PARSE_START_METHOD))
+          if parse_workers>0 else None)
+    try:
+        with futures.ThreadPoolExecutor(max_workers=max_workers) as ex:
+            while queues or fetching or parsing or backlog:
+                # tahap 2: isi slot process pool dari antrian
+                while backlog and len(parsing)<parse_workers*2:
+                    idx,it,job=backlog.popleft()
+                    parsing[pool.submit(parse_timed,job["url"],job["content"])]=(idx,it,job)
+                stats["parse_backlog"]=len(backlog)
+                now, wake = time.monotonic(), None
+                # tahap 1: fetch baru hanya jika antrian parse belum penuh (backpressure)
+                room=queue_size-len(backlog)-len(parsing)
+                for host in list(queues):
+                    q=queues[host]
+                    while q and active[host]<per_host and next_ok[host]<=now and len(fetching)<min(max_workers,room):
+                        idx,it=q.popleft()
+                        fetching[metrics.submit(ex,fetch_fn,it["link"],host_session(host,per_host))]=(idx,it,host)
+                        active[host]+=1; next_ok[host]=now+delay
+                    if not q: del queues[host]
+                    elif active[host]<per_host and len(fetching)<min(max_workers,room):
+                        wake=next_ok[host] if wake is None else min(wake,next_ok[host])
+                if not fetching and not parsing:
+                    time.sleep(max(0.0,(wake or now)-now)); continue
+                timeout=None if wake is None else max(0.0,wake-time.monotonic())
+                done,_=futures.wait(list(fetching)+list(parsing),timeout=timeout,return_when=futures.FIRST_COMPLETED)
+                for fut in done:
+                    if fut in fetching:
+                        idx,it,host=fetching.pop(fut); active[host]-=1
+                        try: fields,job=fut.result()
+                        except Exception: fields,job=dict(EMPTY_ARTICLE),None
+                        stats["fetched"]+=1
+                        if job is not None:
+                            stats["fetch_bytes"]+=len(job["content"])
+                            backlog.append((idx,it,job))
+                            stats["parse_backlog"]=len(backlog)
+                            stats["parse_backlog_peak"]=max(stats["parse_backlog_peak"],len(backlog))
+                            continue
+                    else:
+                        idx,it,job=parsing.pop(fut)
+                        try: fields,cpu=fut.result()
+                        except Exception: fields,cpu=dict(EMPTY_ARTICLE),0.0
+                        fields=finish_article(job,fields)
+                        stats["parsed"]+=1; stats["parse_cpu"]+=cpu
+                        metrics.observe("crawler_parse_seconds",cpu)
+                    it.update(fields)
+                    yield idx,it
+    finally:
+        if pool is not None: pool.shutdown(cancel_futures=True)
+
+def enrich_with_articles(items,max_workers=8,per_host=HOST_MAX_CONCURRENCY,delay=HOST_DELAY,on_partial=None,
+                         parse_workers=PARSE_WORKERS_DEFAULT,progress=noop_progress,on_article=None,index=None,
+                         max_bytes=ARTICLE_MAX_BYTES):
+    """
+    Ekstrak semua link; `on_partial(rows)` dipanggil berkala dengan hasil yang sudah selesai,
+    `on_article(row)` untuk tiap artikel begitu selesai (urut selesai). Artikel selesai juga
+    di-index bertahap ke indeks full-text (`index`, default SEARCH_INDEX_ENABLED).
+    """
+    from .search import SEARCH_INDEX_ENABLED, Indexer
+    total=sum(1 for it in items if it.get("link"))
+    done, stats = [], new_pipeline_stats()
+    indexer=Indexer() if (SEARCH_INDEX_ENABLED if index is None else index) else None
+    progress("Ekstraksi artikel",0,total)
+    try:
+        with metrics.phase("extraction"):
+            for i,(idx,it) in enumerate(iter_articles(items,max_workers,per_host,delay,parse_workers,stats=stats,max_bytes=max_bytes),1):
+                done.append((idx,it))
+                if indexer: indexer.add(it)
+                if on_article: on_article(it)
+                progress("Ekstraksi artikel",i,total,pipeline_summary(stats,i))
+                if on_partial and (i%20==0 or i==total):
+                    on_partial([row for _,row in done])
+    finally:
+        if indexer: indexer.flush()
+    # urutan akhir mengikuti urutan shard/posisi seperti semula
+    return [it for _,it in sorted(done,key=lambda d:d[0])]
@@ -0,0 +1,157 @@
+# crawler_engine/batch.py
+# Batch query × site: satu antrian shard global untuk semua kombinasi kata kunci × outlet,
+# satu budget call bersama (dibagi adil menurut bobot) dan satu DedupSet untuk seluruh batch,
+# sehingga link yang muncul di beberapa query hanya diekstrak sekali. Setiap item diberi
+# tag `query` asal (query dengan shard paling awal di antrian yang menemukannya).
+
+import concurrent.futures as futures
+
+from . import metrics
+from .cse import paginate_shard
+from .crawl import SHARD_WORKERS_DEFAULT, tag_shard, extract_items
+from .http import CSE_DEFAULT_QPS, TokenBucket, CallBudget
+from .quota import as_pool
+from .urls import DedupSet
+from .util import daterange_chunks, build_query_with_dates, noop_progress
+from .yields import get_yield_store
+
+def parse_weighted(lines):
+    """Baris "teks" atau "teks | bobot" → [(teks, bobot)]; baris kosong/# diabaikan."""
+    out=[]
+    for line in (lines.splitlines() if isinstance(lines,str) else lines):
+        line=line.strip()
+        if not line or line.startswith("#"): continue
+        text,_,w=line.partition("|")
+        try: weight=float(w) if w.strip() else 1.0
+        except ValueError: weight=1.0
+        out.append((text.strip(),max(weight,0.0)))
+    return out
+
+def expand_matrix(keywords,sites=()):
+    """
+    Matriks kata kunci × site → [{"query", "priority"}]; bobot query = bobot kata kunci × bobot site.
+    `keywords`/`sites` berupa [(teks, bobot)] atau [teks]. Tanpa site → kata kunci apa adanya.
+    """
+    kw=[k if isinstance(k,tuple) else (k,1.0) for k in keywords]
+    st=[s if isinstance(s,tuple) else (s,1.0) for s in sites] or [("",1.0)]
+    out, seen = [], set()
+    for k,wk in kw:
+        for s,ws in st:
+            q=f"{k} site:{s.removeprefix('site:')}" if s else k
+            if q in seen or wk*ws<=0: continue
+            seen.add(q); out.append({"query":q,"priority":wk*ws})
+    return out
+
+def plan_batch(queries,start_date,end_date,max_calls,target_links,granularity=None,per_shard_limit=None,
+               quota_left=None):
+    """
+    Rencana per query. Manual: granularitas & hasil/shard sama untuk semua. Auto: plan_auto_optimize
+    per query dengan porsi budget & target sebanding bobotnya. Query yang porsinya terlalu kecil untuk
+    rencana apa pun tetap ikut dengan rencana kasar (granularitas terkasar, 1 halaman per shard,
+    "coarse": True); CallBudget bersama dan antrian WFQ yang menjatah call-nya.
+    """
+    from .planner import GRANULARITIES, plan_auto_optimize, calls_allowed
+    if granularity:
+        return [dict(q,granularity=granularity,per_shard_limit=per_shard_limit) for q in queries]
+    total_calls=calls_allowed(max_calls,quota_left)
+    weight=sum(q["priority"] for q in queries) or 1.0
+    out=[]
+    for q in queries:
+        share=q["priority"]/weight
+        plan=plan_auto_optimize(start_date,end_date,max(1,round(target_links*share)),
+                                max(1,int(total_calls*share)),None,q["query"])
+        if plan: out.append(dict(q,granularity=plan[0],per_shard_limit=plan[1]))
+        else: out.append(dict(q,granularity=GRANULARITIES[0],per_shard_limit=10,coarse=True))   # 10 = 1 halaman
+    return out
+
+def batch_params(queries,start_date,end_date,gl="id",hl="id",max_calls=None,target_links=None,
+                 extract=False,extract_opts=None,shard_workers=None,qps=None):
+    """Parameter job mode "batch": job_params biasa + daftar query terencana dari plan_batch."""
+    from .jobs import job_params
+    p=job_params("batch",f"batch: {len(queries)} query",start_date,end_date,gl,hl,None,None,max_calls,
+                 target_links,extract,extract_opts,shard_workers,qps)
+    p["queries"]=queries
+    return p
+
+def shard_queue(queries,start_date,end_date):
+    """
+    Antrian shard global urut weighted fair queueing: shard ke-j query berbobot w mendapat
+    waktu virtual (j+1)/w, sehingga budget terbagi sebanding bobot dan tiap query maju bersama.
+    → [(qi, s, e, label)] dengan label unik lintas query ("q<qi>:<label shard>").
+    """
+    entries=[]
+    for qi,q in enumerate(queries):
+        for j,(s,e,label) in enumerate(daterange_chunks(start_date,end_date,q["granularity"])):
+            entries.append(((j+1)/max(q["priority"],1e-9),qi,s,e,f"q{qi}:{label}"))
+    entries.sort(key=lambda x:(x[0],x[1],x[2]))
+    return [(qi,s,e,label) for _,qi,s,e,label in entries]
+
+def run_batch_search(api_key,cx,queries,start_date,end_date,gl,hl,max_calls,
+                     extract=False,extract_opts=None,shard_workers=SHARD_WORKERS_DEFAULT,qps=CSE_DEFAULT_QPS,
+                     progress=noop_progress,on_items=None,on_partial=None,dedup=None,
+                     on_article=None,checkpoint=None):
+    """
+    Jalankan batch: `queries` dari plan_batch. Semua shard masuk satu ThreadPool dengan urutan
+    shard_queue dan satu CallBudget; link dibuang lintas query oleh satu DedupSet sebelum ekstraksi.
+    Shard yang terpotong/tidak kebagian budget tidak dicatat di checkpoint (bisa dilanjutkan).
+    Return: (items, stats) — stats per query: shard, hasil, link unik yang "dimiliki".
+    """
+    limiter, budget = TokenBucket(qps), CallBudget(max_calls)
+    dedup=DedupSet() if dedup is None else dedup
+    api_key=as_pool(api_key,cx)
+    queue=shard_queue(queries,start_date,end_date)
+    results, skipped = {}, 0
+    per_query=[{"query":q["query"],"priority":q["priority"],"coarse":bool(q.get("coarse")),"shards":0,"raw":0,"unique":0}
+               for q in queries]
+
+    def work(qi,s,e,label):
+        """→ (items, (totalResults) atau None jika dari checkpoint); None jika budget habis."""
+        if checkpoint and checkpoint.shard(label):
+            return checkpoint.shard(label)[0], None
+        if budget.left<=0: return None
+        q=queries[qi]; view=budget.track()
+        items,est=paginate_shard(api_key,cx,build_query_with_dates(q["query"],s,e),q["per_shard_limit"],gl,hl,
+                                 limiter,view,checkpoint=checkpoint)
+        if view.denied: return None
+        items=tag_shard(items,s,e,label,q["query"])
+        if checkpoint: checkpoint.save_shard(label,s,e,items)
+        return items, (est if view.calls else None)
+
+    finished, nxt = {}, 0
+    def release():
+        # dedup urut antrian: link dimiliki shard paling awal di antrian, tidak tergantung urutan selesai
+        nonlocal nxt, skipped
+        while nxt<len(queue) and nxt in finished:
+            qi,s,e,label=queue[nxt]
+            out=finished.pop(nxt); nxt+=1
+            if out is None:
+                skipped+=1; continue
+            items,est=out
+            kept=dedup.filter(items,label)
+            if est is not None:
+                q=queries[qi]
+                get_yield_store().record(q["query"],s,e,est,len(items),q["per_shard_limit"],len(kept))
+            results[label]=kept
+            st=per_query[qi]; st["shards"]+=1; st["raw"]+=len(items); st["unique"]+=len(kept)
+            if on_items: on_items(kept)
+
+    with metrics.phase("search"), futures.ThreadPoolExecutor(max_workers=max(1,int(shard_workers))) as ex:
+        futs={metrics.submit(ex,work,*entry):n for n,entry in enumerate(queue)}
+        progress("Shard batch",0,len(queue))
+        try:
+            for n,fut in enumerate(futures.as_completed(futs),1):
+                finished[futs[fut]]=fut.result()
+                release()
+                progress("Shard batch",n,len(queue),f"{budget.used} call · {len(dedup)} link unik")
+        except BaseException:
+            for f in futs: f.cancel()
+            raise
+
+    all_items=[]
+    for qi,s,e,label in sorted(queue,key=lambda x:(x[0],x[1])):
+        all_items+=results.get(label,[])
+    if extract and all_items:
+        all_items=extract_items(all_items,extract_opts,progress,on_partial,on_article,checkpoint)
+    stats={"calls":budget.used,"shards":len(results),"skipped_shards":skipped,"unique_links":len(dedup),
+           "duplicates":dedup.totals()["dup"],"queries":per_query}
+    return all_items, stats
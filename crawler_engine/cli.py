@@ -0,0 +1,393 @@
+# crawler_engine/cli.py
+# CLI headless: python -m crawler_engine search --query ... --from ... --to ... [--plan auto] [--extract]
+#               python -m crawler_engine batch --keywords-file kw.txt --sites-file outlet.txt --from ... --to ...
+#               python -m crawler_engine resume <job_id> | jobs | quota
+#               python -m crawler_engine export <job_id> -o hasil.parquet   (csv/xlsx/parquet/jsonl[.gz])
+#               python -m crawler_engine index find "banjir jakarta" [--domain ...] | import | stats
+#               python -m crawler_engine watch add|run|list|rm   (query tersimpan, crawl delta)
+# Hasil di-stream sebagai JSONL (stdout atau file) begitu tiap shard/artikel selesai;
+# progress ditulis ke stderr.
+
+import os, sys, json, time, argparse
+from datetime import date
+
+from .crawl import SHARD_WORKERS_DEFAULT
+from .http import CSE_DEFAULT_QPS, HOST_MAX_CONCURRENCY, HOST_DELAY, transfer_summary
+from .watches import DELTA_OVERLAP_DAYS
+
+GRANULARITIES = ["Monthly","Weekly","Daily"]
+
+class JsonlWriter:
+    """
+    mode "w" (search/resume): file ditulis ulang — shard & artikel yang dipulihkan dari checkpoint ikut
+    diputar ulang, jadi keluaran resume sudah lengkap tanpa baris ganda. mode "a": watch run (baris baru saja).
+    """
+    def __init__(self,path,mode="w"):
+        self.fh=sys.stdout if path in (None,"-") else open(path,mode,encoding="utf-8")
+        self.count=0
+
+    def write(self,rows):
+        for row in rows:
+            self.fh.write(json.dumps(row,ensure_ascii=False)+"\n"); self.count+=1
+        self.fh.flush()
+
+    def close(self):
+        if self.fh is not sys.stdout: self.fh.close()
+
+def stderr_progress(desc,done,total,detail=""):
+    line=f"\r{desc}: {done}/{total}"+(f" · {detail}" if detail else "")
+    sys.stderr.write(line.ljust(100)+("\n" if done>=total else ""))
+    sys.stderr.flush()
+
+def quiet_progress(desc,done,total,detail=""):
+    pass
+
+def add_key_args(s):
+    s.add_argument("--api-key",default=os.environ.get("CSE_API_KEY"))
+    s.add_argument("--cx",default=os.environ.get("CSE_CX"))
+    s.add_argument("--key-pool",default=os.environ.get("CSE_KEY_POOL"),
+                   help="File pool key tambahan, satu per baris: api_key cx [kuota_harian]")
+    s.add_argument("--daily-quota",type=int,default=None,
+                   help="Kuota harian default per key (default: env CSE_DAILY_QUOTA, tanpa batas jika kosong)")
+
+def key_pool(args):
+    """KeyPool dari --api-key/--cx + --key-pool; None (dengan pesan) jika kosong."""
+    from .quota import KeyPool, parse_key_pool, CSE_DAILY_QUOTA
+    creds=[(args.api_key,args.cx)] if args.api_key and args.cx else []
+    if args.key_pool:
+        with open(args.key_pool,encoding="utf-8") as fh: creds+=parse_key_pool(fh.read())
+    if not creds:
+        print("API key & cx wajib (--api-key/--cx, --key-pool, atau env CSE_API_KEY/CSE_CX).",file=sys.stderr)
+        return None
+    return KeyPool(creds,args.daily_quota or CSE_DAILY_QUOTA)
+
+def add_run_args(s):
+    """Opsi yang tidak disimpan di job (kredensial & keluaran) — dipakai search dan resume."""
+    add_key_args(s)
+    s.add_argument("--collapse-near-dups",action="store_true",
+                   help="Dengan --extract: tulis hanya artikel kanonik tiap cluster near-duplicate")
+    s.add_argument("-o","--output",default="-",help="File JSONL (default stdout)")
+    s.add_argument("-q","--quiet",action="store_true")
+    s.add_argument("--metrics-file",help="Tulis metrik Prometheus (format teks) ke file ini di akhir run")
+    s.add_argument("--metrics-port",type=int,help="Sajikan metrik Prometheus di http://127.0.0.1:PORT/metrics selama run")
+
+def build_parser():
+    p=argparse.ArgumentParser(prog="crawl",description="Crawler berita Google CSE (headless).")
+    sub=p.add_subparsers(dest="command",required=True)
+    s=sub.add_parser("search",help="Cari link per shard tanggal, opsional ekstrak isi artikel.")
+    s.add_argument("--query",required=True,help="Kata kunci / operator, mis. 'AI site:kompas.com'")
+    s.add_argument("--from",dest="start",required=True,type=date.fromisoformat,help="YYYY-MM-DD")
+    s.add_argument("--to",dest="end",required=True,type=date.fromisoformat,help="YYYY-MM-DD")
+    add_plan_args(s)
+    add_run_args(s)
+    r=sub.add_parser("resume",help="Lanjutkan job dari checkpoint terakhir (hanya yang belum tercatat).")
+    r.add_argument("job_id")
+    add_run_args(r)
+    j=sub.add_parser("jobs",help="Daftar job terakhir beserta status & jumlah checkpoint.")
+    j.add_argument("--limit",type=int,default=20)
+    e=sub.add_parser("export",help="Ekspor hasil tercatat job ke CSV/XLSX/Parquet/JSONL (format dari ekstensi -o).")
+    e.add_argument("job_id")
+    e.add_argument("-o","--output",required=True,help="mis. hasil.parquet, hasil.csv, hasil.xlsx, hasil.jsonl.gz")
+    e.add_argument("--format",choices=["csv","xlsx","parquet","jsonl","jsonl.gz"])
+    e.add_argument("--collapse-near-dups",action="store_true",help="Hanya artikel kanonik tiap cluster near-duplicate")
+    k=sub.add_parser("quota",help="Pemakaian & sisa kuota CSE hari ini per key di pool.")
+    add_key_args(k)
+    b=sub.add_parser("batch",help="Matriks kata kunci × site dalam satu job: satu antrian shard, budget & dedup.")
+    b.add_argument("--keyword",action="append",default=[],help="Kata kunci (boleh berulang; 'teks | bobot')")
+    b.add_argument("--keywords-file",help="Satu kata kunci per baris, opsional '| bobot'")
+    b.add_argument("--site",action="append",default=[],help="Outlet, mis. kompas.com (boleh berulang; 'site | bobot')")
+    b.add_argument("--sites-file",help="Satu outlet per baris, opsional '| bobot'")
+    b.add_argument("--from",dest="start",required=True,type=date.fromisoformat,help="YYYY-MM-DD")
+    b.add_argument("--to",dest="end",required=True,type=date.fromisoformat,help="YYYY-MM-DD")
+    add_plan_args(b)
+    add_run_args(b)
+    x=sub.add_parser("index",help="Indeks full-text artikel terekstrak (FTS5, stemming Bahasa Indonesia).")
+    xsub=x.add_subparsers(dest="index_command",required=True)
+    xf=xsub.add_parser("find",help="Cari artikel: kata = AND, \"frasa\", OR, -kecuali, awalan*.")
+    xf.add_argument("text")
+    xf.add_argument("--domain"); xf.add_argument("--query",help="Query asal (tag `query`)")
+    xf.add_argument("--from",dest="start",type=date.fromisoformat); xf.add_argument("--to",dest="end",type=date.fromisoformat)
+    xf.add_argument("--limit",type=int,default=20)
+    xi=xsub.add_parser("import",help="Index file JSONL hasil crawl (mis. dataset watch / -o search).")
+    xi.add_argument("files",nargs="+")
+    xsub.add_parser("stats",help="Jumlah dokumen, rentang tanggal, domain & query teratas.")
+    w=sub.add_parser("watch",help="Query tersimpan untuk crawl delta terjadwal (mis. dari cron).")
+    wsub=w.add_subparsers(dest="watch_command",required=True)
+    wa=wsub.add_parser("add",help="Simpan/perbarui query; run pertama mulai dari --from.")
+    wa.add_argument("name")
+    wa.add_argument("--query",required=True)
+    wa.add_argument("--from",dest="start",required=True,type=date.fromisoformat,help="Awal backfill, YYYY-MM-DD")
+    wa.add_argument("--overlap",type=int,default=DELTA_OVERLAP_DAYS,help="Hari sebelum watermark yang dicari ulang")
+    wa.add_argument("--dataset",help="File JSONL tujuan (ditambahkan tiap run; link di dalamnya dilewati)")
+    add_plan_args(wa)
+    wr=wsub.add_parser("run",help="Jalankan delta: shard setelah watermark saja, baris baru ditambahkan ke dataset.")
+    wr.add_argument("names",nargs="*",help="Nama query (kosong = semua)")
+    add_run_args(wr)
+    wsub.add_parser("list",help="Daftar query tersimpan, watermark & jumlah link.")
+    wd=wsub.add_parser("rm",help="Hapus query tersimpan (dataset tidak dihapus).")
+    wd.add_argument("name")
+    return p
+
+def add_plan_args(s):
+    """Opsi rencana & ekstraksi yang disimpan bersama job / query tersimpan."""
+    s.add_argument("--plan",default="auto",choices=["auto","adaptive"]+GRANULARITIES)
+    s.add_argument("--per-shard",type=int,default=50,help="Hasil/shard (≤100) untuk plan manual")
+    s.add_argument("--max-calls",type=int,default=300)
+    s.add_argument("--target-links",type=int,default=1000)
+    s.add_argument("--gl",default="id"); s.add_argument("--hl",default="id")
+    s.add_argument("--shard-workers",type=int,default=SHARD_WORKERS_DEFAULT)
+    s.add_argument("--qps",type=float,default=CSE_DEFAULT_QPS)
+    s.add_argument("--extract",action="store_true",help="Ekstrak isi artikel tiap link")
+    s.add_argument("--fetch-workers",type=int,default=8)
+    s.add_argument("--parse-workers",type=int,default=None)
+    s.add_argument("--per-host",type=int,default=HOST_MAX_CONCURRENCY)
+    s.add_argument("--host-delay",type=float,default=HOST_DELAY)
+    s.add_argument("--max-article-kb",type=int,default=None,
+                   help="Batas unduhan body per artikel dalam KB (default 2048; 0 = tanpa batas)")
+
+def common_params(args):
+    """Parameter job_params (selain mode, query, tanggal & rencana shard) dari opsi add_plan_args."""
+    extract_opts=dict(max_workers=args.fetch_workers,per_host=args.per_host,delay=args.host_delay)
+    if args.parse_workers is not None: extract_opts["parse_workers"]=args.parse_workers
+    if args.max_article_kb is not None: extract_opts["max_bytes"]=args.max_article_kb*1024
+    return dict(gl=args.gl,hl=args.hl,max_calls=args.max_calls,target_links=args.target_links,
+                extract=args.extract,extract_opts=extract_opts,shard_workers=args.shard_workers,qps=args.qps)
+
+def cmd_search(args):
+    from .jobs import job_params, create_job
+    from .planner import plan_auto_optimize, estimate_calls_and_results, calls_allowed
+    from .util import daterange_chunks
+    from .yields import get_yield_store
+
+    pool=key_pool(args)
+    if pool is None: return 2
+    if args.start>args.end:
+        print("Tanggal mulai tidak boleh melebihi tanggal selesai.",file=sys.stderr); return 2
+    common=common_params(args)
+    quota_left=pool.remaining()
+    print(f"Kuota CSE hari ini: sisa {'tanpa batas' if quota_left is None else quota_left} call "
+          f"di {len(pool.creds)} key",file=sys.stderr)
+    if args.plan=="adaptive":
+        common["max_calls"]=calls_allowed(args.max_calls,quota_left)
+        if common["max_calls"]<=0:
+            print("Kuota CSE hari ini habis untuk semua key.",file=sys.stderr); return 2
+        params=job_params("adaptive",args.query,args.start,args.end,**common); plan=None
+    else:
+        if args.plan=="auto":
+            plan=plan_auto_optimize(args.start,args.end,args.target_links,args.max_calls,quota_left,args.query)
+            if not plan:
+                print("Tidak ada rencana yang muat di batas request / sisa kuota harian.",file=sys.stderr); return 2
+            gran,limit,n_shards,est_calls,est_cap=plan
+            model=get_yield_store().model(args.query,gran)
+            print(f"Rencana: {gran} | hasil/shard {limit} | shard {n_shards} | "
+                  f"estimasi request {est_calls} | estimasi {'link unik' if model else 'maksimal hasil'} {est_cap}"
+                  +(f" | {model}" if model else ""),file=sys.stderr)
+        else:
+            gran,limit=args.plan,args.per_shard
+            est_calls,est_cap=estimate_calls_and_results(len(daterange_chunks(args.start,args.end,gran)),limit)
+            if est_calls>calls_allowed(args.max_calls,quota_left):
+                print(f"Estimasi {est_calls} call > batas {args.max_calls} / sisa kuota {quota_left}.",file=sys.stderr); return 2
+        mode="auto" if args.plan=="auto" else "manual"
+        params=job_params(mode,args.query,args.start,args.end,granularity=gran,per_shard_limit=limit,**common)
+        plan={"granularity":gran,"per_shard_limit":limit,"est_calls":est_calls,"est_cap":est_cap,
+              "shards":[label for *_,label in daterange_chunks(args.start,args.end,gran)]}
+    job_id=create_job(params,plan)
+    print(f"Job {job_id} — lanjutkan jika terputus: python -m crawler_engine resume {job_id}",file=sys.stderr)
+    return run_cli_job(args,job_id,pool)
+
+def cmd_batch(args):
+    from .batch import parse_weighted, expand_matrix, plan_batch, batch_params
+    from .jobs import create_job
+    from .planner import calls_allowed
+
+    def weighted(items,path):
+        text="\n".join(items)
+        if path:
+            with open(path,encoding="utf-8") as fh: text+="\n"+fh.read()
+        return parse_weighted(text)
+    pool=key_pool(args)
+    if pool is None: return 2
+    if args.start>args.end:
+        print("Tanggal mulai tidak boleh melebihi tanggal selesai.",file=sys.stderr); return 2
+    if args.plan=="adaptive":
+        print("Batch mendukung --plan auto atau granularitas tetap.",file=sys.stderr); return 2
+    queries=expand_matrix(weighted(args.keyword,args.keywords_file),weighted(args.site,args.sites_file))
+    if not queries:
+        print("Isi minimal satu --keyword / --keywords-file.",file=sys.stderr); return 2
+    common=common_params(args)
+    quota_left=pool.remaining()
+    common["max_calls"]=calls_allowed(args.max_calls,quota_left)
+    if common["max_calls"]<=0:
+        print("Kuota CSE hari ini habis untuk semua key.",file=sys.stderr); return 2
+    manual=args.plan!="auto"
+    planned=plan_batch(queries,args.start,args.end,common["max_calls"],args.target_links,
+                       args.plan if manual else None,args.per_shard if manual else None)
+    coarse=[q["query"] for q in planned if q.get("coarse")]
+    print(f"Batch: {len(planned)} query · budget {common['max_calls']} call "
+          f"(sisa kuota {quota_left})",file=sys.stderr)
+    if coarse:
+        print(f"  {len(coarse)} query dengan rencana kasar (Monthly, 1 halaman/shard; budget terlalu kecil "
+              f"untuk target): {', '.join(coarse[:10])}{' …' if len(coarse)>10 else ''}",file=sys.stderr)
+    job_id=create_job(batch_params(planned,args.start,args.end,**common),
+                      {"queries":[(q["query"],q["granularity"],q["per_shard_limit"]) for q in planned]})
+    print(f"Job {job_id} — lanjutkan jika terputus: python -m crawler_engine resume {job_id}",file=sys.stderr)
+    return run_cli_job(args,job_id,pool)
+
+def cmd_index(args):
+    from .search import COUNT_CAP, get_search_index, Indexer
+    index=get_search_index()
+    if args.index_command=="find":
+        t0=time.perf_counter()
+        filters=dict(domain=args.domain,date_from=args.start,date_to=args.end,query=args.query)
+        hits=index.search(args.text,limit=args.limit,**filters)
+        total=index.count(args.text,**filters)
+        for h in hits:
+            print(f"{h['score']:>7.2f}  {h['day'] or '-':<10}  {h['domain']:<22} {h['title']}\n"
+                  f"         {h['link']}\n         {h['snippet']}")
+        print(f"{total}{'+' if total>=COUNT_CAP else ''} hasil ({(time.perf_counter()-t0)*1000:.0f} ms)",file=sys.stderr)
+        return 0
+    if args.index_command=="import":
+        indexer=Indexer(index)
+        for path in args.files:
+            with open(path,encoding="utf-8") as fh:
+                for line in fh:
+                    try: indexer.add(json.loads(line))
+                    except ValueError: continue
+        indexer.flush()
+        print(f"{indexer.indexed} artikel di-index.",file=sys.stderr)
+        return 0
+    st=index.stats()
+    print(f"{st['docs']} dokumen · {st['first_day'] or '-'} … {st['last_day'] or '-'}")
+    for col in ("domain","query"):
+        print(f"{col}: "+", ".join(f"{v} ({n})" for v,n in index.facets(col)[:10]))
+    return 0
+
+def cmd_resume(args):
+    pool=key_pool(args)
+    if pool is None: return 2
+    return run_cli_job(args,args.job_id,pool)
+
+def cmd_quota(args):
+    pool=key_pool(args)
+    if pool is None: return 2
+    for k in pool.status():
+        print(f"{k['key']}  cx {k['cx']}  terpakai {k['used']}/{k['quota'] or '∞'} (gagal {k['failed']})  "
+              f"sisa {'tanpa batas' if k['remaining'] is None else k['remaining']}")
+    left=pool.remaining()
+    print(f"Total sisa hari ini: {'tanpa batas' if left is None else left}")
+    return 0
+
+def cmd_jobs(args):
+    from .jobs import get_job_store
+    for job in get_job_store().recent(args.limit):
+        p=job["params"]
+        print(f"{job['id']}  {job['status']:<7} {p['mode']:<8} {p['start_date']}..{p['end_date']}  "
+              f"shard {job['shards_done']} · halaman {job['pages']} · artikel {job['articles']}  {p['base_query']}")
+    return 0
+
+def cmd_export(args):
+    from .exports import EXPORT_FORMATS, export_to
+    from .jobs import get_job_store, job_results
+    from .results import write_results
+    if get_job_store().get(args.job_id) is None:
+        print(f"Job {args.job_id} tidak ditemukan.",file=sys.stderr); return 2
+    fmt=args.format or next((f for f in sorted(EXPORT_FORMATS,key=len,reverse=True)
+                             if args.output.endswith("."+EXPORT_FORMATS[f][0])),None)
+    if fmt is None:
+        print("Format tidak dikenali dari ekstensi -o; pakai --format.",file=sys.stderr); return 2
+    rs=write_results(job_results(args.job_id),f"job_{args.job_id}")
+    export_to(rs,fmt,args.output,collapse=args.collapse_near_dups)
+    print(f"{len(rs)} baris → {args.output} ({fmt})",file=sys.stderr)
+    return 0
+
+def cmd_watch(args):
+    from .jobs import job_params
+    from .watches import get_watch_store, save_watch, run_watch, delta_window
+
+    store=get_watch_store()
+    if args.watch_command=="add":
+        if args.plan in ("auto","adaptive"):
+            params=job_params(args.plan,args.query,args.start,args.start,**common_params(args))
+        else:
+            params=job_params("manual",args.query,args.start,args.start,granularity=args.plan,
+                              per_shard_limit=args.per_shard,**common_params(args))
+        w=save_watch(args.name,params,args.overlap,args.dataset)
+        print(f"Tersimpan: {w['name']} → {w['dataset']} ({w['links']} link sudah ada di dataset)",file=sys.stderr)
+        return 0
+    if args.watch_command=="list":
+        for w in store.all():
+            s,e=delta_window(w)
+            print(f"{w['name']:<20} {w['params']['mode']:<8} watermark {w['watermark'] or '-':<10} "
+                  f"link {w['links']:<6} run berikutnya {s}..{e}  {w['params']['base_query']}  → {w['dataset']}")
+        return 0
+    if args.watch_command=="rm":
+        store.delete(args.name); return 0
+    pool=key_pool(args)
+    if pool is None: return 2
+    from . import metrics
+    if args.metrics_file or args.metrics_port: metrics.enable()
+    if args.metrics_port: metrics.serve_prometheus(args.metrics_port)
+    names=args.names or [w["name"] for w in store.all()]
+    out, rc = JsonlWriter(args.output,"a"), 0
+    for name in names:
+        try:
+            job_id,rows,stats=run_watch(name,pool,pool.cx,quota_left=pool.remaining(),
+                                        progress=quiet_progress if args.quiet else stderr_progress)
+        except Exception as e:
+            print(f"\n{name}: gagal ({type(e).__name__}: {e}); run berikutnya melanjutkan job terakhir.",file=sys.stderr)
+            rc=1; continue
+        if job_id is None:
+            print(f"{name}: tidak ada tanggal baru.",file=sys.stderr); continue
+        out.write([r for r in rows if not (args.collapse_near_dups and r.get("dup_canonical") is False)])
+        print(f"\n{name}: {len(rows)} link baru (job {job_id}, {stats.get('duplicates',0)} duplikat/sudah ada) "
+              f"→ {store.get(name)['dataset']}",file=sys.stderr)
+        print(f"  Transfer: {transfer_summary(stats.get('transfer',{}))}",file=sys.stderr)
+    out.close()
+    if args.metrics_file: metrics.write_prometheus(args.metrics_file)
+    return rc
+
+def run_cli_job(args,job_id,pool):
+    from .jobs import get_job_store, run_job
+    from .neardup import NearDupIndex, tag_near_duplicate
+
+    job=get_job_store().get(job_id)
+    if job is None:
+        print(f"Job {job_id} tidak ditemukan.",file=sys.stderr); return 2
+    from . import metrics
+    if args.metrics_file or args.metrics_port: metrics.enable()
+    if args.metrics_port: metrics.serve_prometheus(args.metrics_port)
+    progress=quiet_progress if args.quiet else stderr_progress
+    out=JsonlWriter(args.output)
+    index=NearDupIndex() if job["params"]["extract"] else None
+    def on_article(it):
+        # streaming: anggota pertama yang selesai menjadi kanonik cluster-nya
+        tag_near_duplicate(index,it)
+        if not (args.collapse_near_dups and it["dup_canonical"] is False):
+            out.write([it])
+    # tanpa ekstraksi: stream per shard; dengan ekstraksi: stream per artikel selesai
+    try:
+        _,stats=run_job(job_id,pool,pool.cx,progress=progress,
+                        on_items=None if index else out.write,on_article=on_article if index else None)
+    except Exception as e:
+        print(f"\nJob {job_id} berhenti ({type(e).__name__}: {e}). Checkpoint tersimpan; "
+              f"lanjutkan: python -m crawler_engine resume {job_id}",file=sys.stderr)
+        return 1
+    finally:
+        out.close()
+        if args.metrics_file: metrics.write_prometheus(args.metrics_file)
+    if job["params"]["mode"]=="adaptive":
+        print(f"Adaptive: { {k:v for k,v in stats.items() if k!='transfer'} }",file=sys.stderr)
+    if job["params"]["mode"]=="batch":
+        print(f"\nBatch: {stats['calls']} call · {stats['shards']} shard ({stats['skipped_shards']} belum kebagian budget) · "
+              f"{stats['unique_links']} link unik · {stats['duplicates']} duplikat lintas query",file=sys.stderr)
+        for q in stats["queries"]:
+            print(f"  {q['unique']:>6} unik / {q['raw']:>6} hasil  ×{q['priority']:g}  {q['query']}"
+                  +(" (rencana kasar)" if q.get("coarse") else ""),file=sys.stderr)
+    print(f"Transfer: {transfer_summary(stats.get('transfer',{}))}",file=sys.stderr)
+    print(f"Selesai: {out.count} baris ditulis (job {job_id}).",file=sys.stderr)
+    return 0
+
+def main(argv=None):
+    args=build_parser().parse_args(argv)
+    return {"search":cmd_search,"resume":cmd_resume,"jobs":cmd_jobs,"quota":cmd_quota,"export":cmd_export,
+            "batch":cmd_batch,"watch":cmd_watch,"index":cmd_index}[args.command](args)
@@ -0,0 +1,222 @@
+# crawler_engine/crawl.py
+# Orkestrasi run: shard tanggal paralel (manual/auto) atau bisection adaptif, lalu ekstraksi opsional.
+# Semua laporan lewat callback: progress(desc, done, total, detail), on_items(items) per shard
+# (urut shard), on_partial(rows) untuk hasil ekstraksi parsial.
+# Link duplikat (setelah kanonikalisasi URL) dibuang sebelum ekstraksi. Shard yang selesai ditahan
+# sampai semua shard sebelumnya selesai lalu didedup urut shard, sehingga link selalu "dimiliki"
+# shard paling awal (shard_label & position sama seperti run dengan 1 worker / drop_duplicates).
+# Dengan `checkpoint` (jobs.JobCheckpoint) tiap halaman, shard dan artikel dicatat begitu selesai;
+# yang sudah tercatat diputar ulang dari checkpoint tanpa request.
+# Yield tiap shard baru yang lengkap (totalResults, hasil, link unik) dicatat ke yields untuk estimator;
+# shard yang tidak kebagian budget tidak dicatat (0/0 palsu akan menarik median laju ke 0).
+# Setiap item diberi tag `query` (base query asal) untuk dataset gabungan & filter indeks full-text.
+
+import concurrent.futures as futures
+from datetime import timedelta
+
+from . import metrics
+from .cse import CSE_MAX_RESULTS, paginate_shard
+from .http import CSE_DEFAULT_QPS, TokenBucket, CallBudget
+from .quota import as_pool
+from .urls import DedupSet
+from .util import daterange_chunks, build_query_with_dates, shard_label, bisect_range, noop_progress
+from .yields import get_yield_store
+
+SHARD_WORKERS_DEFAULT = 4
+REDUNDANT_SHARD_RATIO = 0.8   # shard adaptif dengan ≥80% link duplikat tidak dibelah lagi
+
+def tag_shard(items,s,e,label,query=None):
+    for it in items:
+        it.update({"shard_label":label,"shard_start":s.isoformat(),"shard_end":e.isoformat()})
+        if query: it["query"]=query
+    return items
+
+def run_shards_concurrent(api_key,cx,base_query,shards,per_shard_limit,gl,hl,
+                          shard_workers=SHARD_WORKERS_DEFAULT,qps=CSE_DEFAULT_QPS,
+                          progress=noop_progress,on_items=None,dedup=None,checkpoint=None,refresh=False):
+    """
+    Jalankan semua shard paralel; hasil (sudah didedup) dikembalikan per shard sesuai urutan `shards`.
+    `refresh`: halaman tidak dibaca dari cache CSE (run delta).
+    """
+    dedup=DedupSet() if dedup is None else dedup
+    api_key=as_pool(api_key,cx)   # satu KeyPool per run: rotasi & cooldown berlaku lintas shard
+    limiter=TokenBucket(qps)
+    results=[[] for _ in shards]
+    restored=[i for i,(_,_,label) in enumerate(shards) if checkpoint and checkpoint.shard(label)]
+    raw={i:checkpoint.shard(shards[i][2])[0] for i in restored}
+    est={}
+    nxt=0
+    def release():
+        # dedup urut shard: lepaskan shard berurutan selama pendahulunya sudah selesai
+        nonlocal nxt
+        while nxt<len(shards) and nxt in raw:
+            i=nxt; s,e,label=shards[i]
+            items=raw.pop(i)
+            results[i]=dedup.filter(items,label)
+            if i in est: get_yield_store().record(base_query,s,e,est.pop(i),len(items),per_shard_limit,len(results[i]))
+            if on_items: on_items(results[i])
+            nxt+=1
+    release()
+    with futures.ThreadPoolExecutor(max_workers=max(1,int(shard_workers))) as ex:
+        futs={metrics.submit(ex,paginate_shard,api_key,cx,build_query_with_dates(base_query,s,e),
+                        per_shard_limit,gl,hl,limiter,checkpoint=checkpoint,refresh=refresh):i
+              for i,(s,e,_) in enumerate(shards) if i not in restored}
+        progress("Memproses shard",len(restored),len(shards))
+        try:
+            for n,fut in enumerate(futures.as_completed(futs),len(restored)+1):
+                i=futs[fut]; s,e,label=shards[i]
+                items,est[i]=fut.result()
+                items=tag_shard(items,s,e,label,base_query)
+                if checkpoint: checkpoint.save_shard(label,s,e,items)
+                raw[i]=items
+                release()
+                progress("Memproses shard",n,len(shards),f"{len(dedup)} link unik")
+        except BaseException:
+            for f in futs: f.cancel()
+            raise
+    return results
+
+def extract_items(all_items,extract_opts=None,progress=noop_progress,on_partial=None,
+                  on_article=None,checkpoint=None):
+    """
+    Ekstraksi artikel + penandaan near-duplicate (modul ekstraksi di-import hanya jika dipakai).
+    Artikel yang sudah tercatat di `checkpoint` dipulihkan tanpa fetch; sisanya dicatat begitu berhasil
+    diekstrak (yang gagal diambil lagi saat resume).
+    """
+    from .articles import enrich_with_articles, article_extracted
+    from .neardup import annotate_near_duplicates
+    restored, todo = [], []
+    for it in all_items:
+        if not it.get("link"): continue
+        fields=checkpoint.article(it) if checkpoint else None
+        if fields is None: todo.append(it)
+        else: it.update(fields); restored.append(it)
+    if on_article:
+        for it in restored: on_article(it)
+    def finished(it):
+        # fetch gagal (timeout, 5xx, bukan HTML) → EMPTY_ARTICLE: tidak dicatat, resume mencobanya lagi
+        if checkpoint and article_extracted(it): checkpoint.save_article(it)
+        if on_article: on_article(it)
+    partial=(lambda rows: on_partial(restored+rows)) if on_partial and restored else on_partial
+    enrich_with_articles(todo,on_partial=partial,progress=progress,on_article=finished,**(extract_opts or {}))
+    # enrich memperbarui dict item di tempat → urutan akhir tetap urutan shard/posisi
+    rows=[it for it in all_items if it.get("link")]
+    annotate_near_duplicates(rows)
+    return rows
+
+def run_split_search(api_key,cx,base_query,start_date,end_date,granularity,per_shard_limit,gl,hl,
+                     extract=False,extract_opts=None,shard_workers=SHARD_WORKERS_DEFAULT,qps=CSE_DEFAULT_QPS,
+                     progress=noop_progress,on_items=None,on_partial=None,dedup=None,
+                     on_article=None,checkpoint=None,refresh=False):
+    """
+    Shard tetap (Monthly/Weekly/Daily × hasil/shard). `extract_opts` diteruskan ke
+    enrich_with_articles (max_workers, per_host, delay, parse_workers, max_bytes). Berikan `dedup`
+    (DedupSet) untuk membaca statistik duplikat per shard setelah run.
+    """
+    shards = daterange_chunks(start_date, end_date, granularity)
+    all_items=[]
+    with metrics.phase("search"):
+        for items in run_shards_concurrent(api_key,cx,base_query,shards,per_shard_limit,gl,hl,
+                                           shard_workers,qps,progress,on_items,dedup,checkpoint,refresh):
+            all_items+=items
+    if extract and all_items:
+        all_items = extract_items(all_items,extract_opts,progress,on_partial,on_article,checkpoint)
+    return all_items
+
+def run_adaptive_search(api_key,cx,base_query,start_date,end_date,gl,hl,max_calls,target_links,
+                        extract=False,extract_opts=None,shard_workers=SHARD_WORKERS_DEFAULT,qps=CSE_DEFAULT_QPS,
+                        progress=noop_progress,on_items=None,on_partial=None,dedup=None,
+                        on_article=None,checkpoint=None,refresh=False):
+    """
+    Planner adaptif, mulai dari shard Monthly:
+      - probe halaman 1; jika totalResults > 100 dan rentang > 1 hari → langsung dibelah dua
+      - jika tidak, paginasi sampai halaman pendek / totalResults habis
+      - shard yang tetap jenuh (100 hasil) dibelah lagi, sampai shard harian,
+        kecuali hasilnya sebagian besar duplikat (≥ REDUNDANT_SHARD_RATIO)
+    Berhenti menjadwalkan shard baru saat budget call habis atau target link unik tercapai.
+    Saat resume, shard tercatat di `checkpoint` (beserta keputusan belahnya) diputar ulang tanpa
+    memakai budget; budget berlaku untuk call run ini. Shard yang terpotong budget tidak dicatat
+    di checkpoint maupun hasil, sehingga `resume` memintanya lagi.
+    stats["complete_until"]: tanggal terakhir yang rentangnya tercari lengkap (tanpa shard terlewat
+    atau shard jenuh yang batal dibelah karena budget/target habis), untuk watermark run delta.
+    Return: (items, stats)
+    """
+    limiter, budget = TokenBucket(qps), CallBudget(max_calls)
+    dedup=DedupSet() if dedup is None else dedup
+    api_key=as_pool(api_key,cx)
+    done, n_split, skipped = [], 0, 0
+    incomplete=[]   # (s, e) yang tidak tercari lengkap
+
+    def work(s,e,label):
+        """
+        → (items, split, (totalResults, limit yang diminta) atau None jika dari checkpoint / tanpa call);
+        None jika budget habis sebelum shard lengkap (tidak dicatat, bisa dilanjutkan).
+        """
+        if checkpoint and checkpoint.shard(label):
+            return (*checkpoint.shard(label), None)
+        q=build_query_with_dates(base_query,s,e)
+        view=budget.track()
+        items,est=paginate_shard(api_key,cx,q,10,gl,hl,limiter,view,checkpoint=checkpoint,refresh=refresh)
+        if s<e and est>CSE_MAX_RESULTS:
+            items,split,requested=tag_shard(items,s,e,label,base_query), True, 10
+        else:
+            if len(items)==10 and (not est or est>10):
+                more,est=paginate_shard(api_key,cx,q,CSE_MAX_RESULTS,gl,hl,limiter,view,start=11,
+                                        checkpoint=checkpoint,refresh=refresh)
+                items+=more
+            items,split,requested=tag_shard(items,s,e,label,base_query), (s<e and len(items)>=CSE_MAX_RESULTS), CSE_MAX_RESULTS
+        if view.denied: return None
+        if checkpoint: checkpoint.save_shard(label,s,e,items,split)
+        # hanya shard yang benar-benar mengirim request pertamanya memberi observasi yield
+        return items, split, ((est,requested) if view.calls else None)
+
+    def order(s,e):
+        # urutan shard = urutan hasil akhir; anak hasil belahan selalu sesudah induknya
+        return (s,-(e-s).days)
+
+    def release(s,e,label,items,split,obs):
+        nonlocal n_split
+        raw=len(items)
+        items=dedup.filter(items,label)
+        if obs: get_yield_store().record(base_query,s,e,obs[0],raw,obs[1],len(items))
+        done.append((s,e,items))
+        if on_items: on_items(items)
+        if not split or dedup.redundancy(label)>=REDUNDANT_SHARD_RATIO: return
+        if budget.left<=0 or len(dedup)>=target_links:
+            incomplete.append((s,e))
+        else:
+            n_split+=1
+            for (cs,ce) in bisect_range(s,e):
+                cl=shard_label(cs,ce)
+                pending[metrics.submit(ex,work,cs,ce,cl)]=(cs,ce,cl)
+
+    roots=daterange_chunks(start_date,end_date,"Monthly")
+    finished=[]  # shard selesai yang masih menunggu shard sebelumnya (dedup urut shard)
+    with metrics.phase("search"), futures.ThreadPoolExecutor(max_workers=max(1,int(shard_workers))) as ex:
+        pending={metrics.submit(ex,work,s,e,label):(s,e,label) for (s,e,label) in roots}
+        progress("Shard adaptif",0,len(pending))
+        while pending:
+            fut=next(futures.as_completed(pending))
+            s,e,label=pending.pop(fut)
+            out=fut.result()
+            if out is None: skipped+=1; incomplete.append((s,e))
+            else: finished.append((s,e,label,*out))
+            # lepaskan selama tidak ada shard berjalan yang mendahuluinya (anaknya pun selalu sesudahnya)
+            while finished:
+                first=min(finished,key=lambda f:order(f[0],f[1]))
+                if pending and min(order(ps,pe) for ps,pe,_ in pending.values())<order(first[0],first[1]):
+                    break
+                finished.remove(first)
+                release(*first)
+            progress("Shard adaptif",len(done),len(done)+len(pending)+len(finished),
+                     f"{budget.used} call · {len(dedup)} link unik")
+
+    all_items=[]
+    for (_,_,items) in sorted(done,key=lambda d:order(d[0],d[1])):
+        all_items+=items
+    if extract and all_items:
+        all_items = extract_items(all_items,extract_opts,progress,on_partial,on_article,checkpoint)
+    stats={"calls":budget.used,"shards":len(done),"skipped_shards":skipped,"splits":n_split,"unique_links":len(dedup),
+           "duplicates":dedup.totals()["dup"],
+           "complete_until":(min(incomplete)[0]-timedelta(days=1) if incomplete else end_date).isoformat()}
+    return all_items, stats
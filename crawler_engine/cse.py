@@ -0,0 +1,210 @@
+# crawler_engine/cse.py
+# Google Custom Search JSON API: cache respons persisten + paginasi per shard.
+
+import os, re, json, time, zlib, sqlite3, hashlib, threading
+from datetime import date, timedelta
+from functools import lru_cache
+
+from . import metrics
+from .http import HTTP, CSE_LIMITER, LEAN_IO, TRANSFER, wire_bytes
+from .quota import as_pool
+from .util import CACHE_DIR, clean_text
+
+CSE_URL = os.environ.get("CSE_API_URL", "https://www.googleapis.com/customsearch/v1")  # override: server tiruan (bench)
+CSE_MAX_RESULTS = 100               # CSE tidak memberi hasil di atas posisi 100 per query
+CSE_CACHE_TTL = 6*3600              # detik; shard yang sudah lama lewat tidak pernah kedaluwarsa
+CSE_CACHE_SETTLE_DAYS = 7           # shard yang berakhir < N hari lalu masih bisa berubah (artikel terlambat terindeks)
+CSE_CACHE_MAX_BYTES = 256*1024*1024 # batas ukuran cache (LRU)
+CSE_MAX_RETRIES = 3                 # 429 per menit / 5xx dengan satu key: coba ulang dengan backoff
+CSE_RETRY_BACKOFF = 1.0             # detik, dikali 2 tiap percobaan
+# Partial response: hanya field yang dipakai search_cse_page (tanpa pagemap/metatags/thumbnail).
+# Google hanya mengirim gzip jika User-Agent juga memuat "gzip".
+CSE_FIELDS = "searchInformation/totalResults,items(title,link,snippet)"
+CSE_LEAN_HEADERS = {"Accept-Encoding":"gzip","User-Agent":"crawling-media (gzip)"}
+
+# =========================
+# Cache respons CSE (SQLite)
+# =========================
+class CSECache:
+    """
+    Cache persisten respons mentah CSE, key = (cx, query, num, start, gl, hl).
+      - TTL per entri; entri dari shard yang berakhir ≥ CSE_CACHE_SETTLE_DAYS hari lalu tidak kedaluwarsa
+      - Eviksi LRU jika total ukuran payload > max_bytes
+      - Counter hit/miss untuk ditampilkan di UI
+    """
+    def __init__(self,path,ttl=CSE_CACHE_TTL,max_bytes=CSE_CACHE_MAX_BYTES):
+        os.makedirs(os.path.dirname(path) or ".",exist_ok=True)
+        self.ttl, self.max_bytes = ttl, max_bytes
+        self.hits = self.misses = 0
+        self.lock=threading.Lock()
+        self.conn=sqlite3.connect(path,check_same_thread=False,isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS cse_cache(
+            key TEXT PRIMARY KEY, payload BLOB, size INTEGER,
+            created REAL, accessed REAL, expires REAL)""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ix_cse_accessed ON cse_cache(accessed)")
+
+    @staticmethod
+    def make_key(cx,query,num,start,gl,hl):
+        raw=json.dumps([cx,query,int(num),int(start),gl,hl],ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def is_past_query(query,today=None,settle_days=CSE_CACHE_SETTLE_DAYS):
+        # query shard berisi before:YYYY-MM-DD (eksklusif) → lampau jika before ≤ hari ini − settle_days;
+        # hari-hari terakhir tetap ber-TTL karena artikel terlambat terindeks masih bisa muncul
+        m=re.search(r"before:(\d{4}-\d{2}-\d{2})",query or "")
+        return bool(m) and date.fromisoformat(m.group(1))<=(today or date.today())-timedelta(days=settle_days)
+
+    def get(self,key):
+        now=time.time()
+        with self.lock:
+            row=self.conn.execute("SELECT payload,expires FROM cse_cache WHERE key=?",(key,)).fetchone()
+            if row and (row[1] is None or row[1]>now):
+                self.conn.execute("UPDATE cse_cache SET accessed=? WHERE key=?",(now,key))
+                self.hits+=1
+                return json.loads(zlib.decompress(row[0]))
+            if row: self.conn.execute("DELETE FROM cse_cache WHERE key=?",(key,))
+            self.misses+=1
+            return None
+
+    def put(self,key,data,permanent=False):
+        now=time.time()
+        blob=zlib.compress(json.dumps(data,ensure_ascii=False).encode("utf-8"))
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO cse_cache VALUES(?,?,?,?,?,?)",
+                              (key,blob,len(blob),now,now,None if permanent else now+self.ttl))
+            self._evict()
+
+    def _evict(self):
+        total=self.conn.execute("SELECT COALESCE(SUM(size),0) FROM cse_cache").fetchone()[0]
+        if total<=self.max_bytes: return
+        excess=total-self.max_bytes; freed=0; victims=[]
+        for key,size in self.conn.execute("SELECT key,size FROM cse_cache ORDER BY accessed"):
+            victims.append((key,)); freed+=size
+            if freed>=excess: break
+        self.conn.executemany("DELETE FROM cse_cache WHERE key=?",victims)
+
+    def count_cached(self,keys):
+        """Jumlah key yang masih valid di cache (tanpa mengubah counter/LRU)."""
+        keys=list(keys); now=time.time(); n=0
+        with self.lock:
+            for i in range(0,len(keys),500):
+                chunk=keys[i:i+500]
+                n+=self.conn.execute(
+                    f"SELECT COUNT(*) FROM cse_cache WHERE key IN ({','.join('?'*len(chunk))}) "
+                    "AND (expires IS NULL OR expires>?)",(*chunk,now)).fetchone()[0]
+        return n
+
+@lru_cache(maxsize=None)
+def get_cse_cache():
+    """Satu instance per proses (bertahan lintas rerun Streamlit)."""
+    return CSECache(os.path.join(CACHE_DIR,"cse_cache.sqlite3"))
+
+# =========================
+# Google CSE
+# =========================
+def is_daily_quota_error(r):
+    try: msg=json.dumps(r.json().get("error",{}))
+    except ValueError: msg=r.text or ""
+    return "per day" in msg.lower() or "dailylimitexceeded" in msg.lower()
+
+def fetch_cse_page(pool,query,num,start,gl,hl,limiter=None):
+    """
+    Request satu halaman lewat KeyPool; setiap call (berhasil atau gagal) dicatat di ledger kuota.
+    429 kuota harian → key ditandai habis, 429 per menit → key di-cooldown; keduanya rotasi ke key
+    berikutnya (jika semua key cooldown, pick() menunggu yang paling awal selesai). Tanpa key lain,
+    429 per menit / 5xx dicoba ulang ≤ CSE_MAX_RETRIES kali (backoff). QuotaExhausted hanya jika
+    semua key habis untuk hari ini.
+    """
+    attempt=0
+    lean={"fields":CSE_FIELDS} if LEAN_IO else {}
+    while True:
+        with metrics.timed("crawler_cse_rate_limit_wait_seconds"):
+            api_key,cx=pool.pick()
+            try: (limiter or CSE_LIMITER).acquire()
+            except BaseException: pool.release(api_key); raise
+        try:
+            with metrics.timed("crawler_cse_request_seconds"):
+                r=HTTP.get(CSE_URL,params={
+                    "key":api_key,"cx":cx,"q":query,
+                    "num":num,"start":start,
+                    "gl":gl,"hl":hl,**lean},headers=CSE_LEAN_HEADERS if LEAN_IO else None,timeout=25)
+        except Exception:
+            pool.record(api_key,ok=False); metrics.inc("crawler_cse_failures_total",reason="exception"); raise
+        body=len(r.content); wire=wire_bytes(r,body)
+        TRANSFER.add("cse",requests=1,wire=wire,body=body,saved_gzip=max(0,body-wire))
+        if metrics.ENABLED:
+            metrics.inc("crawler_bytes_total",wire,kind="cse")
+            if body>wire: metrics.inc("crawler_bytes_saved_total",body-wire,kind="cse",reason="gzip")
+        if r.status_code in (403,429) and is_daily_quota_error(r):
+            pool.record(api_key,ok=False,exhausted=True); metrics.inc("crawler_cse_retries_total",reason="daily_quota")
+            continue
+        pool.record(api_key,ok=r.ok)
+        if r.status_code==429 and len(pool.creds)>1:
+            pool.rate_limited(api_key); metrics.inc("crawler_cse_retries_total",reason="rate_limit_rotate"); continue
+        if (r.status_code==429 or r.status_code>=500) and attempt<CSE_MAX_RETRIES:
+            metrics.inc("crawler_cse_retries_total",reason=str(r.status_code))
+            time.sleep(CSE_RETRY_BACKOFF*2**attempt); attempt+=1; continue
+        r.raise_for_status()
+        return r.json()
+
+def search_cse_page(api_key,cx,query,num=10,start=1,gl="id",hl="id",limiter=None,checkpoint=None,refresh=False):
+    """
+    Satu halaman CSE → (items, totalResults). `checkpoint` (JobCheckpoint) dibaca sebelum cache.
+    `api_key` boleh berupa KeyPool (rotasi multi-key); `cx` tetap menjadi identitas cache.
+    Runner membuat KeyPool sekali per run agar status rotasi/cooldown tidak hilang antar halaman.
+    `refresh`: cache tidak dibaca (tetap ditulis), mis. jendela overlap run delta.
+    """
+    cache=get_cse_cache()
+    num,start=min(max(num,1),10),max(start,1)
+    key=CSECache.make_key(cx,query,num,start,gl,hl)
+    data=checkpoint.page(key) if checkpoint else None
+    source="checkpoint"
+    if data is None and not refresh:
+        data,source=cache.get(key),"hit"
+        if data is not None and checkpoint: checkpoint.save_page(key,data)
+    if data is None:
+        source="miss"
+        data=fetch_cse_page(as_pool(api_key,cx),query,num,start,gl,hl,limiter)
+        cache.put(key,data,permanent=CSECache.is_past_query(query))
+        if checkpoint: checkpoint.save_page(key,data)
+    metrics.inc("crawler_cse_cache_total",result=source)
+    try: total_results=int(data.get("searchInformation",{}).get("totalResults") or 0)
+    except (TypeError,ValueError): total_results=0
+    return [{
+        "title":clean_text(it.get("title")),
+        "link":it.get("link"),
+        "snippet":clean_text(it.get("snippet")),
+        "position":i
+    } for i,it in enumerate(data.get("items",[]),start=start)], total_results
+
+def search_cse(api_key,cx,query,num=10,start=1,gl="id",hl="id",limiter=None):
+    return search_cse_page(api_key,cx,query,num,start,gl,hl,limiter)[0]
+
+def paginate_shard(api_key,cx,query,total,gl="id",hl="id",limiter=None,budget=None,start=1,checkpoint=None,
+                   refresh=False):
+    """
+    Ambil posisi start..total (≤100) satu shard → (items, totalResults).
+    Berhenti lebih awal jika halaman pendek, totalResults habis, atau budget call habis.
+    """
+    total=max(1,min(int(total),CSE_MAX_RESULTS))  # CSE hard cap per query
+    with metrics.phase("cse_shard"):
+        return _paginate(as_pool(api_key,cx),cx,query,total,gl,hl,limiter,budget,start,checkpoint,refresh)
+
+def _paginate(api_key,cx,query,total,gl,hl,limiter,budget,start,checkpoint,refresh):
+    collected, start_idx, remain, est=[],start,total-start+1,0
+    while remain>0:
+        batch=min(remain,10)
+        if budget is not None and not budget.take(): break
+        # jeda antar-request diatur oleh limiter (global), bukan sleep tetap
+        items,est=search_cse_page(api_key,cx,query,num=batch,start=start_idx,gl=gl,hl=hl,limiter=limiter,
+                                    checkpoint=checkpoint,refresh=refresh)
+        if not items: break
+        collected+=items
+        remain-=len(items); start_idx+=len(items)
+        if len(items)<batch or (est and start_idx>est): break
+    return collected, est
+
+def search_cse_paginated(api_key,cx,query,total,gl="id",hl="id",limiter=None,checkpoint=None):
+    return paginate_shard(api_key,cx,query,total,gl,hl,limiter,checkpoint=checkpoint)[0]
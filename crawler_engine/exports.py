@@ -0,0 +1,117 @@
+# crawler_engine/exports.py
+# Ekspor hasil (ResultSet) ke CSV / XLSX / Parquet / JSONL(.gz). File ditulis per batch langsung ke
+# disk (tidak pernah seluruh hasil sebagai bytes di memori) dan di-cache per versi hasil: ekspor
+# yang sama untuk hasil yang sama dibuat sekali, dan baru dibuat saat benar-benar diminta.
+
+import os, gzip, uuid, shutil, hashlib
+
+from .results import RESULTS_DIR, RESULT_COLUMNS, _pa, _schema
+
+EXPORTS_DIR = os.path.join(RESULTS_DIR,"exports")
+XLSX_MAX_ROWS = 1_048_575   # baris data per sheet (batas Excel 1.048.576 termasuk header)
+XLSX_MAX_CELL = 32_767      # karakter per sel; teks lebih panjang dipotong
+
+# format → (ekstensi, mime)
+EXPORT_FORMATS = {
+    "csv": ("csv","text/csv"),
+    "xlsx": ("xlsx","application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "parquet": ("parquet","application/vnd.apache.parquet"),
+    "jsonl": ("jsonl","application/x-ndjson"),
+    "jsonl.gz": ("jsonl.gz","application/gzip"),
+}
+
+def _batches(rs,columns=None,collapse=False):
+    """Batch DataFrame dari ResultSet; `collapse` = hanya anggota kanonik cluster near-duplicate."""
+    cols=list(columns) if columns else None
+    need=cols+["dup_canonical"] if collapse and cols and "dup_canonical" not in cols else cols
+    for df in rs.iter_batches(need):
+        if collapse: df=df[df["dup_canonical"].ne(False).fillna(True).astype(bool)]
+        yield df[cols] if cols else df
+
+def _write_csv(batches,path):
+    with open(path,"w",encoding="utf-8",newline="") as fh:
+        for i,df in enumerate(batches): df.to_csv(fh,header=i==0,index=False)
+
+def _write_jsonl(batches,path,compress=False):
+    with (gzip.open(path,"wt",encoding="utf-8") if compress else open(path,"w",encoding="utf-8")) as fh:
+        for df in batches:
+            if len(df): fh.write(df.to_json(orient="records",lines=True,force_ascii=False).rstrip("\n")+"\n")
+
+def _write_parquet(batches,path,columns):
+    pa=_pa()
+    if pa is None: raise ImportError("ekspor Parquet butuh pyarrow")
+    schema=pa.schema([_schema().field(c) for c in columns])   # skema tetap: batch berisi null semua tetap cocok
+    with pa.parquet.ParquetWriter(path,schema,compression="zstd") as writer:
+        for df in batches: writer.write_table(pa.Table.from_pandas(df,schema=schema,preserve_index=False))
+
+def _xlsx_value(v):
+    import pandas as pd
+    if v is None or pd.isna(v): return None
+    try:
+        if hasattr(v,"item"): v=v.item()
+    except (ValueError,TypeError): pass
+    return v[:XLSX_MAX_CELL] if isinstance(v,str) else v
+
+def _write_xlsx(batches,path,sheet="Results"):
+    """constant_memory: baris di-flush ke disk begitu ditulis; sheet baru tiap XLSX_MAX_ROWS baris."""
+    import xlsxwriter
+    wb=xlsxwriter.Workbook(path,{"constant_memory":True,"strings_to_urls":False,"strings_to_numbers":False,
+                                 "strings_to_formulas":False})
+    try:
+        ws, row, n = None, 0, 0
+        for df in batches:
+            header=list(df.columns)
+            for values in df.itertuples(index=False,name=None):
+                if ws is None or row>XLSX_MAX_ROWS:
+                    n+=1; ws=wb.add_worksheet(sheet if n==1 else f"{sheet}_{n}")
+                    ws.write_row(0,0,header); row=1
+                ws.write_row(row,0,[_xlsx_value(v) for v in values]); row+=1
+        if ws is None: wb.add_worksheet(sheet)
+    finally:
+        wb.close()
+
+def export_to(rs,fmt,path,columns=None,collapse=False):
+    """Tulis ResultSet ke `path` dalam format `fmt` (lihat EXPORT_FORMATS) → path."""
+    if fmt not in EXPORT_FORMATS: raise ValueError(f"format ekspor tidak dikenal: {fmt}")
+    os.makedirs(os.path.dirname(path) or ".",exist_ok=True)
+    tmp=f"{path}.{uuid.uuid4().hex[:6]}.tmp"   # unik: dua sesi boleh mengekspor hasil yang sama bersamaan
+    batches=_batches(rs,columns,collapse)
+    try:
+        if fmt=="parquet" and rs.parquet and not columns and not collapse: shutil.copyfile(rs.path,tmp)
+        elif fmt=="csv": _write_csv(batches,tmp)
+        elif fmt=="xlsx": _write_xlsx(batches,tmp)
+        elif fmt=="parquet": _write_parquet(batches,tmp,list(columns or RESULT_COLUMNS))
+        else: _write_jsonl(batches,tmp,compress=fmt=="jsonl.gz")
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+    os.replace(tmp,path)
+    return path
+
+def export_path(rs,fmt,columns=None,collapse=False,directory=None):
+    """Path cache ekspor: versi hasil + pilihan kolom/collapse → nama file stabil."""
+    variant=hashlib.sha1(repr((tuple(columns or ()),bool(collapse))).encode()).hexdigest()[:8]
+    return os.path.join(directory or EXPORTS_DIR,f"{rs.version}-{variant}.{EXPORT_FORMATS[fmt][0]}")
+
+def export_result(rs,fmt,columns=None,collapse=False,directory=None):
+    """Ekspor ter-cache: dibuat sekali per versi hasil, berikutnya langsung dipakai ulang → path."""
+    path=export_path(rs,fmt,columns,collapse,directory)
+    if not os.path.exists(path):
+        export_to(rs,fmt,path,columns,collapse)
+        if directory is None: prune_exports()
+    return path
+
+def prune_exports():
+    """Hapus ekspor di EXPORTS_DIR yang file hasil sumbernya sudah tidak ada (lihat results.prune_results)."""
+    if not os.path.isdir(EXPORTS_DIR): return
+    live={f.split(".")[0] for f in os.listdir(RESULTS_DIR) if f.endswith((".parquet",".jsonl.gz"))}
+    for f in os.listdir(EXPORTS_DIR):
+        if f.rsplit("-",1)[0] not in live and not f.endswith(".tmp"):
+            try: os.remove(os.path.join(EXPORTS_DIR,f))
+            except OSError: pass
+
+def available_formats():
+    """Format yang dependensinya terpasang (xlsx butuh xlsxwriter, parquet butuh pyarrow)."""
+    import importlib.util
+    missing={"xlsx":importlib.util.find_spec("xlsxwriter") is None,"parquet":_pa() is None}
+    return [f for f in EXPORT_FORMATS if not missing.get(f)]
@@ -0,0 +1,141 @@
+# crawler_engine/http.py
+# Connection pool, rate limiter token-bucket, budget call, Session per host berita, dan
+# penghitung transfer (byte jaringan vs byte yang dihemat mode lean I/O).
+
+import os, time, threading
+from collections import defaultdict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CSE_DEFAULT_QPS = 4.0      # ± setara sleep 0.20s lama + latensi jaringan
+HOST_MAX_CONCURRENCY = 2   # koneksi simultan maksimum ke satu domain berita
+HOST_DELAY = 0.5           # jeda sopan (detik) antar request ke domain yang sama
+# Lean I/O: CSE partial response (`fields`) + gzip, artikel berhenti diunduh setelah kontainer
+# <article> tertutup. CRAWLER_LEAN_IO=0 → payload penuh (mis. untuk membandingkan).
+LEAN_IO = os.environ.get("CRAWLER_LEAN_IO","1")!="0"
+
+def make_session(pool_size=16):
+    """requests.Session dengan connection pool (keep-alive) yang aman dipakai bersama antar thread."""
+    s=requests.Session()
+    adapter=HTTPAdapter(pool_connections=pool_size,pool_maxsize=pool_size)
+    s.mount("https://",adapter); s.mount("http://",adapter)
+    return s
+
+class TokenBucket:
+    """Rate limiter token-bucket global: `qps` token/detik, kapasitas `burst`."""
+    def __init__(self,qps=CSE_DEFAULT_QPS,burst=None):
+        self.rate=max(float(qps),0.01)
+        self.capacity=float(burst if burst is not None else max(1.0,self.rate))
+        self.tokens=self.capacity; self.ts=time.monotonic()
+        self.lock=threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now=time.monotonic()
+                self.tokens=min(self.capacity,self.tokens+(now-self.ts)*self.rate); self.ts=now
+                if self.tokens>=1:
+                    self.tokens-=1; return
+                wait=(1-self.tokens)/self.rate
+            time.sleep(wait)
+
+class CallBudget:
+    """Sisa jatah call CSE untuk satu run (thread-safe)."""
+    def __init__(self,max_calls):
+        self.left=int(max_calls); self.used=0; self.lock=threading.Lock()
+
+    def take(self):
+        with self.lock:
+            if self.left<=0: return False
+            self.left-=1; self.used+=1
+            return True
+
+    def track(self):
+        """BudgetView untuk satu shard: mencatat call yang didapat dan apakah pernah ditolak."""
+        return BudgetView(self)
+
+class BudgetView:
+    """
+    Pemakaian CallBudget bersama oleh satu shard: `calls` = call yang didapat shard ini,
+    `denied` = paginasi terhenti karena budget habis (shard belum lengkap, jangan dicatat selesai).
+    """
+    def __init__(self,budget):
+        self.budget=budget; self.calls=0; self.denied=False
+
+    @property
+    def left(self):
+        return self.budget.left
+
+    def take(self):
+        if self.budget.take():
+            self.calls+=1; return True
+        self.denied=True
+        return False
+
+HTTP=make_session()
+CSE_LIMITER=TokenBucket(CSE_DEFAULT_QPS)
+
+_HOST_SESSIONS, _HOST_SESSIONS_LOCK = {}, threading.Lock()
+
+def host_session(host,per_host=HOST_MAX_CONCURRENCY):
+    """
+    Satu Session (connection pool keep-alive) per host berita, pool = 2 × `per_host`.
+    Jika run berikutnya memakai `per_host` lebih besar, Session dibuat ulang dengan pool lebih besar.
+    """
+    size=max(1,int(per_host))*2
+    with _HOST_SESSIONS_LOCK:
+        cur=_HOST_SESSIONS.get(host)
+        if cur is None or cur[0]<size:
+            _HOST_SESSIONS[host]=cur=(size,make_session(pool_size=size))
+        return cur[1]
+
+class TransferStats:
+    """
+    Byte transfer kumulatif per proses, per jenis (cse/article), thread-safe:
+      requests, wire (byte di jaringan, terkompresi), body (setelah dekompresi),
+      saved_gzip (body − wire), cut (body dipotong: batas byte / berhenti awal) + saved_cut
+      (sisa Content-Length yang tidak diunduh, jika diketahui), rejected (bukan HTML,
+      body tidak diunduh) + saved_rejected. Ringkasan per run: snapshot() sebelum, since() sesudah.
+    """
+    def __init__(self):
+        self.lock=threading.Lock()
+        self.counts=defaultdict(int)
+
+    def add(self,kind,**values):
+        with self.lock:
+            for k,v in values.items(): self.counts[(kind,k)]+=int(v)
+
+    def snapshot(self):
+        with self.lock: return dict(self.counts)
+
+    def since(self,before):
+        """{jenis: {counter: nilai}} sejak snapshot `before`."""
+        out={}
+        for (kind,k),v in self.snapshot().items():
+            d=v-before.get((kind,k),0)
+            if d: out.setdefault(kind,{})[k]=d
+        return out
+
+TRANSFER=TransferStats()
+
+def wire_bytes(r,body_len):
+    """Byte yang benar-benar lewat jaringan untuk body respons (terkompresi); fallback panjang body."""
+    try: return int(r.raw.tell())
+    except Exception: return body_len
+
+def transfer_summary(t):
+    """Satu baris ringkasan TransferStats.since() untuk UI/CLI."""
+    def mb(n): return f"{n/2**20:.2f} MB" if n>=2**20 else f"{n/1024:.0f} KB"
+    parts=[]
+    for kind,label in (("cse","CSE"),("article","artikel")):
+        c=t.get(kind)
+        if not c: continue
+        saved=c.get("saved_gzip",0)+c.get("saved_cut",0)+c.get("saved_rejected",0)
+        extra=[f"gzip −{mb(c['saved_gzip'])}" if c.get("saved_gzip") else "",
+               f"{c['cut']} dipotong/berhenti awal −{mb(c.get('saved_cut',0))}" if c.get("cut") else "",
+               f"{c['rejected']} bukan HTML −{mb(c.get('saved_rejected',0))}" if c.get("rejected") else ""]
+        extra=" · ".join(e for e in extra if e)
+        parts.append(f"{label} {c.get('requests',0)} req · {mb(c.get('wire',0))} diunduh"
+                     +(f" · hemat {mb(saved)} ({extra})" if saved or extra else ""))
+    return " | ".join(parts) or "tidak ada transfer"
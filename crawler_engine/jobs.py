@@ -0,0 +1,218 @@
+# crawler_engine/jobs.py
+# Job crawl yang bisa dilanjutkan: rencana, halaman CSE, shard selesai dan artikel terekstrak
+# dicatat ke SQLite (WAL) begitu selesai. Refresh browser, rerun Streamlit, 429 dari CSE atau
+# restart worker tidak membuang call yang sudah dibayar — resume hanya mengulang yang belum tercatat.
+
+import os, json, time, uuid, zlib, sqlite3, threading
+from datetime import date
+from functools import lru_cache
+
+from .util import CACHE_DIR, noop_progress
+
+JOB_MODES = ("manual","auto","adaptive","batch")
+ARTICLE_FIELDS = ("article_title","article_text","article_author","article_published")
+
+class JobStore:
+    """
+    Checkpoint job crawl (SQLite, WAL):
+      - jobs(id → parameter run, rencana, status running/done/failed, pesan error)
+      - pages(job, key CSE → respons mentah) — halaman yang sudah dibayar tidak diminta ulang
+      - shards(job, label → item mentah sebelum dedup + flag split planner adaptif)
+      - articles(job, url kanonik → field ekstraksi)
+    """
+    def __init__(self,path):
+        os.makedirs(os.path.dirname(path) or ".",exist_ok=True)
+        self.lock=threading.Lock()
+        self.conn=sqlite3.connect(path,check_same_thread=False,isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS jobs(
+            id TEXT PRIMARY KEY, params TEXT, plan TEXT, status TEXT, error TEXT,
+            created REAL, updated REAL)""")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS pages(
+            job TEXT, key TEXT, payload BLOB, PRIMARY KEY(job,key))""")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS shards(
+            job TEXT, label TEXT, start TEXT, end TEXT, split INTEGER, items TEXT, done REAL,
+            PRIMARY KEY(job,label))""")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS articles(
+            job TEXT, url TEXT, fields TEXT, PRIMARY KEY(job,url))""")
+
+    def create(self,params,plan=None):
+        job_id=uuid.uuid4().hex[:12]; now=time.time()
+        with self.lock:
+            self.conn.execute("INSERT INTO jobs VALUES(?,?,?,?,?,?,?)",
+                              (job_id,json.dumps(params,ensure_ascii=False),json.dumps(plan),"running",None,now,now))
+        return job_id
+
+    def get(self,job_id):
+        with self.lock:
+            row=self.conn.execute("SELECT id,params,plan,status,error,created,updated FROM jobs WHERE id=?",
+                                  (job_id,)).fetchone()
+            if not row: return None
+            n_shards,n_pages,n_articles=(self.conn.execute(f"SELECT COUNT(*) FROM {t} WHERE job=?",(job_id,)).fetchone()[0]
+                                         for t in ("shards","pages","articles"))
+        return {"id":row[0],"params":json.loads(row[1]),"plan":json.loads(row[2]),"status":row[3],
+                "error":row[4],"created":row[5],"updated":row[6],
+                "shards_done":n_shards,"pages":n_pages,"articles":n_articles}
+
+    def recent(self,limit=20):
+        with self.lock:
+            ids=[r[0] for r in self.conn.execute("SELECT id FROM jobs ORDER BY updated DESC LIMIT ?",(limit,))]
+        return [self.get(i) for i in ids]
+
+    def set_status(self,job_id,status,error=None):
+        with self.lock:
+            self.conn.execute("UPDATE jobs SET status=?,error=?,updated=? WHERE id=?",
+                              (status,error,time.time(),job_id))
+
+    def get_page(self,job_id,key):
+        with self.lock:
+            row=self.conn.execute("SELECT payload FROM pages WHERE job=? AND key=?",(job_id,key)).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row else None
+
+    def put_page(self,job_id,key,data):
+        blob=zlib.compress(json.dumps(data,ensure_ascii=False).encode("utf-8"))
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO pages VALUES(?,?,?)",(job_id,key,blob))
+            self.conn.execute("UPDATE jobs SET updated=? WHERE id=?",(time.time(),job_id))
+
+    def shards(self,job_id):
+        """label → (items, split), urut tanggal mulai (shard induk sebelum anaknya)."""
+        with self.lock:
+            rows=self.conn.execute("""SELECT label,items,split FROM shards WHERE job=?
+                ORDER BY start, end DESC""",(job_id,)).fetchall()
+        return {label:(json.loads(items),bool(split)) for label,items,split in rows}
+
+    def put_shard(self,job_id,label,s,e,items,split=False):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO shards VALUES(?,?,?,?,?,?,?)",
+                              (job_id,label,s.isoformat(),e.isoformat(),int(split),
+                               json.dumps(items,ensure_ascii=False),time.time()))
+            self.conn.execute("UPDATE jobs SET updated=? WHERE id=?",(time.time(),job_id))
+
+    def articles(self,job_id):
+        with self.lock:
+            rows=self.conn.execute("SELECT url,fields FROM articles WHERE job=?",(job_id,)).fetchall()
+        return {url:json.loads(fields) for url,fields in rows}
+
+    def put_article(self,job_id,url,fields):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO articles VALUES(?,?,?)",
+                              (job_id,url,json.dumps(fields,ensure_ascii=False)))
+
+@lru_cache(maxsize=None)
+def get_job_store():
+    """Satu instance per proses (bertahan lintas rerun Streamlit)."""
+    return JobStore(os.path.join(CACHE_DIR,"jobs.sqlite3"))
+
+class JobCheckpoint:
+    """
+    Handle checkpoint satu job, diteruskan ke crawl/cse sebagai `checkpoint`.
+    Shard & artikel yang sudah tercatat dimuat sekali saat resume; halaman dibaca per key.
+    """
+    def __init__(self,store,job_id):
+        self.store, self.job_id = store, job_id
+        self.done_shards=store.shards(job_id)
+        self.done_articles=store.articles(job_id)
+
+    def page(self,key):
+        return self.store.get_page(self.job_id,key)
+
+    def save_page(self,key,data):
+        self.store.put_page(self.job_id,key,data)
+
+    def shard(self,label):
+        return self.done_shards.get(label)
+
+    def save_shard(self,label,s,e,items,split=False):
+        self.store.put_shard(self.job_id,label,s,e,items,split)
+
+    def article(self,row):
+        from .urls import canonical_url
+        return self.done_articles.get(canonical_url(row["link"])) if row.get("link") else None
+
+    def save_article(self,row):
+        from .urls import canonical_url
+        if row.get("link"):
+            self.store.put_article(self.job_id,canonical_url(row["link"]),{k:row.get(k,"") for k in ARTICLE_FIELDS})
+
+def job_params(mode,base_query,start_date,end_date,gl="id",hl="id",granularity=None,per_shard_limit=None,
+               max_calls=None,target_links=None,extract=False,extract_opts=None,shard_workers=None,qps=None):
+    """Parameter run yang disimpan bersama job (tanpa API key/cx) agar bisa dijalankan ulang."""
+    if mode not in JOB_MODES: raise ValueError(f"mode job tidak dikenal: {mode}")
+    return {"mode":mode,"base_query":base_query,"start_date":start_date.isoformat(),"end_date":end_date.isoformat(),
+            "gl":gl,"hl":hl,"granularity":granularity,"per_shard_limit":per_shard_limit,
+            "max_calls":max_calls,"target_links":target_links,"extract":bool(extract),
+            "extract_opts":extract_opts or {},"shard_workers":shard_workers,"qps":qps}
+
+def create_job(params,plan=None,store=None):
+    return (store or get_job_store()).create(params,plan)
+
+def run_job(job_id,api_key,cx,progress=noop_progress,on_items=None,on_partial=None,on_article=None,
+            dedup=None,store=None):
+    """
+    Jalankan / lanjutkan job dari checkpoint terakhir → (items, stats); stats["transfer"] = byte
+    transfer run ini (http.TransferStats.since).
+    Status job menjadi done, atau failed (pesan error disimpan) lalu exception diteruskan.
+    """
+    from .crawl import run_split_search, run_adaptive_search
+    from .http import TRANSFER
+    from .urls import DedupSet
+    store=store or get_job_store()
+    job=store.get(job_id)
+    if job is None: raise KeyError(f"job tidak ditemukan: {job_id}")
+    p=job["params"]
+    checkpoint=JobCheckpoint(store,job_id)
+    dedup=DedupSet() if dedup is None else dedup
+    start,end=date.fromisoformat(p["start_date"]),date.fromisoformat(p["end_date"])
+    opts={k:p[k] for k in ("shard_workers","qps") if p.get(k) is not None}
+    refresh=bool(p.get("refresh_cache"))   # run delta: jendela overlap tidak dilayani cache CSE
+    transfer=TRANSFER.snapshot()
+    store.set_status(job_id,"running")
+    try:
+        if p["mode"]=="batch":
+            from .batch import run_batch_search
+            items,stats=run_batch_search(api_key,cx,p["queries"],start,end,p["gl"],p["hl"],p["max_calls"],
+                                         p["extract"],p["extract_opts"],progress=progress,on_items=on_items,
+                                         on_partial=on_partial,on_article=on_article,dedup=dedup,
+                                         checkpoint=checkpoint,**opts)
+        elif p["mode"]=="adaptive":
+            items,stats=run_adaptive_search(api_key,cx,p["base_query"],start,end,p["gl"],p["hl"],
+                                            p["max_calls"],p["target_links"],p["extract"],p["extract_opts"],
+                                            progress=progress,on_items=on_items,on_partial=on_partial,
+                                            on_article=on_article,dedup=dedup,checkpoint=checkpoint,
+                                            refresh=refresh,**opts)
+        else:
+            items=run_split_search(api_key,cx,p["base_query"],start,end,p["granularity"],p["per_shard_limit"],
+                                   p["gl"],p["hl"],p["extract"],p["extract_opts"],
+                                   progress=progress,on_items=on_items,on_partial=on_partial,
+                                   on_article=on_article,dedup=dedup,checkpoint=checkpoint,refresh=refresh,**opts)
+            stats={"shards":len(dedup.shard_stats),"unique_links":len(dedup),"duplicates":dedup.totals()["dup"],
+                   "complete_until":end.isoformat()}
+    except BaseException as e:
+        store.set_status(job_id,"failed",f"{type(e).__name__}: {e}")
+        raise
+    store.set_status(job_id,"done")
+    stats["transfer"]=TRANSFER.since(transfer)   # byte jaringan & byte yang dihemat run ini (proses ini)
+    return items, stats
+
+def job_results(job_id,store=None,dedup=None):
+    """
+    Hasil yang sudah tercatat untuk job (selesai atau masih berjalan), tanpa request:
+    shard urut tanggal → dedup → field artikel yang sudah terekstrak → near-duplicate.
+    """
+    from .urls import DedupSet
+    store=store or get_job_store()
+    dedup=DedupSet() if dedup is None else dedup
+    checkpoint=JobCheckpoint(store,job_id)
+    items=[]
+    for label,(shard_items,_) in checkpoint.done_shards.items():
+        items+=dedup.filter(shard_items,label)
+    extracted=0
+    for it in items:
+        fields=checkpoint.article(it)
+        if fields is not None:
+            it.update(fields); extracted+=1
+    if extracted:
+        from .neardup import annotate_near_duplicates
+        annotate_near_duplicates(items)
+    return items
@@ -0,0 +1,204 @@
+# crawler_engine/metrics.py
+# Instrumentasi hot path: timer per fase, histogram latensi per domain, byte terunduh, retry, cache hit.
+# Mati secara default; saat mati tiap titik ukur hanya satu cek boolean. Nyala untuk seluruh proses
+# lewat CRAWLER_METRICS=1 atau enable() (CLI) → REGISTRY, atau hanya untuk satu run lewat
+# `with collecting(registry):` (toggle per sesi di UI): registry run dibawa ContextVar, thread pekerja
+# menerimanya lewat submit(), sehingga run sesi lain yang berjalan bersamaan tidak ikut tercatat.
+# Ekspor: snapshot() untuk panel Streamlit, render_prometheus() / write_prometheus() / serve_prometheus().
+
+import os, time, bisect, threading, contextvars
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    "crawler_phase_seconds": "Durasi fase crawl (histogram)",
+    "crawler_cse_request_seconds": "Latensi request CSE (histogram)",
+    "crawler_cse_rate_limit_wait_seconds": "Waktu menunggu token bucket CSE (histogram)",
+    "crawler_cse_cache_total": "Halaman CSE menurut sumber (checkpoint/hit/miss)",
+    "crawler_cse_retries_total": "Retry / rotasi key CSE menurut alasan",
+    "crawler_cse_failures_total": "Request CSE yang gagal tanpa dicoba ulang (exception jaringan)",
+    "crawler_article_fetch_seconds": "Latensi fetch artikel per domain (histogram)",
+    "crawler_article_fetch_total": "Hasil fetch artikel (fresh/not_modified/unchanged/fetched/error)",
+    "crawler_parse_seconds": "Waktu CPU parse HTML per artikel (histogram)",
+    "crawler_bytes_total": "Byte terunduh di jaringan menurut jenis (cse/article)",
+    "crawler_bytes_saved_total": "Byte yang tidak diunduh menurut jenis & alasan (gzip/cut/rejected)",
+}
+
+FORCED = os.environ.get("CRAWLER_METRICS","") not in ("","0")
+ENABLED = FORCED
+_GLOBAL, _ACTIVE, _STATE_LOCK = FORCED, 0, threading.Lock()
+
+class _Hist:
+    __slots__=("counts","sum","count","max")
+    def __init__(self):
+        self.counts=[0]*(len(LATENCY_BUCKETS)+1); self.sum=0.0; self.count=0; self.max=0.0
+
+    def observe(self,v):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS,v)]+=1
+        self.sum+=v; self.count+=1
+        if v>self.max: self.max=v
+
+    def quantile(self,q):
+        """Perkiraan kuantil = batas atas bucket tempat kuantil jatuh (dibatasi nilai maksimum)."""
+        if not self.count: return 0.0
+        rank, acc = q*self.count, 0
+        for i,c in enumerate(self.counts):
+            acc+=c
+            if acc>=rank: return min(LATENCY_BUCKETS[i],self.max) if i<len(LATENCY_BUCKETS) else self.max
+        return self.max
+
+class Registry:
+    """Counter & histogram berlabel (thread-safe). Key seri = (nama, tuple label terurut)."""
+    def __init__(self):
+        self.lock=threading.Lock()
+        self.counters, self.hists = {}, {}
+
+    def inc(self,name,value=1,**labels):
+        key=(name,tuple(sorted(labels.items())))
+        with self.lock: self.counters[key]=self.counters.get(key,0)+value
+
+    def observe(self,name,value,**labels):
+        key=(name,tuple(sorted(labels.items())))
+        with self.lock:
+            h=self.hists.get(key)
+            if h is None: h=self.hists[key]=_Hist()
+            h.observe(value)
+
+    def reset(self):
+        with self.lock: self.counters.clear(); self.hists.clear()
+
+REGISTRY = Registry()
+
+_RUN = contextvars.ContextVar("crawler_metrics_run",default=None)   # registry run aktif (collecting)
+
+def enable(on=True):
+    """Nyalakan/matikan REGISTRY untuk seluruh proses (CLI); CRAWLER_METRICS tidak bisa dimatikan."""
+    global ENABLED, _GLOBAL
+    with _STATE_LOCK:
+        _GLOBAL=FORCED or bool(on)
+        ENABLED=_GLOBAL or _ACTIVE>0
+
+def enabled():
+    return ENABLED
+
+@contextmanager
+def collecting(registry):
+    """Catat metrik run di blok ini (dan thread yang di-submit lewat submit()) ke `registry` saja."""
+    global ENABLED, _ACTIVE
+    with _STATE_LOCK:
+        _ACTIVE+=1; ENABLED=True
+    token=_RUN.set(registry)
+    try: yield registry
+    finally:
+        _RUN.reset(token)
+        with _STATE_LOCK:
+            _ACTIVE-=1; ENABLED=_GLOBAL or _ACTIVE>0
+
+def submit(executor,fn,*args,**kwargs):
+    """executor.submit yang membawa registry run pemanggil ke thread pekerja."""
+    return executor.submit(contextvars.copy_context().run,fn,*args,**kwargs)
+
+def _targets():
+    run=_RUN.get()
+    if run is None: return (REGISTRY,) if _GLOBAL else ()
+    return (run,REGISTRY) if _GLOBAL else (run,)
+
+def inc(name,value=1,**labels):
+    if ENABLED:
+        for reg in _targets(): reg.inc(name,value,**labels)
+
+def observe(name,value,**labels):
+    if ENABLED:
+        for reg in _targets(): reg.observe(name,value,**labels)
+
+@contextmanager
+def _timer(name,labels,targets):
+    t0=time.perf_counter()
+    try: yield
+    finally:
+        for reg in targets: reg.observe(name,time.perf_counter()-t0,**labels)
+
+class _NoopTimer:
+    def __enter__(self): return self
+    def __exit__(self,*exc): return False
+
+_NOOP = _NoopTimer()
+
+def timed(name="crawler_phase_seconds",**labels):
+    """`with timed(phase="search"):` — no-op bersama saat metrik mati (atau run ini tidak dicatat)."""
+    targets=_targets() if ENABLED else ()
+    return _timer(name,labels,targets) if targets else _NOOP
+
+def phase(name):
+    return timed("crawler_phase_seconds",phase=name)
+
+# =========================
+# Ekspor
+# =========================
+def _fmt_labels(labels,extra=()):
+    items=list(labels)+list(extra)
+    if not items: return ""
+    return "{"+",".join(f'{k}="{str(v).replace(chr(92),chr(92)*2).replace(chr(34),chr(92)+chr(34))}"' for k,v in items)+"}"
+
+def render_prometheus(registry=None):
+    """Format teks eksposisi Prometheus (counter *_total, histogram _bucket/_sum/_count)."""
+    reg=registry or REGISTRY
+    with reg.lock:
+        counters=sorted(reg.counters.items())
+        hists=sorted((k,(list(h.counts),h.sum,h.count)) for k,h in reg.hists.items())
+    lines, seen = [], set()
+    def header(name,kind):
+        if name in seen: return
+        seen.add(name)
+        lines.append(f"# HELP {name} {HELP.get(name,name)}"); lines.append(f"# TYPE {name} {kind}")
+    for (name,labels),v in counters:
+        header(name,"counter"); lines.append(f"{name}{_fmt_labels(labels)} {v}")
+    for (name,labels),(counts,total,n) in hists:
+        header(name,"histogram")
+        acc=0
+        for le,c in zip(list(LATENCY_BUCKETS)+["+Inf"],counts):
+            acc+=c; lines.append(f"{name}_bucket{_fmt_labels(labels,[('le',le)])} {acc}")
+        lines.append(f"{name}_sum{_fmt_labels(labels)} {total:.6f}")
+        lines.append(f"{name}_count{_fmt_labels(labels)} {n}")
+    return "\n".join(lines)+"\n"
+
+def write_prometheus(path,registry=None):
+    """Tulis atomik (tmp + rename) untuk textfile collector node_exporter."""
+    tmp=f"{path}.tmp"
+    with open(tmp,"w",encoding="utf-8") as fh: fh.write(render_prometheus(registry))
+    os.replace(tmp,path)
+
+def serve_prometheus(port=9464,host="127.0.0.1",registry=None):
+    """Endpoint /metrics di thread latar; return server (panggil .shutdown() untuk berhenti)."""
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body=render_prometheus(registry).encode("utf-8")
+            self.send_response(200 if self.path.startswith("/metrics") else 404)
+            self.send_header("Content-Type","text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length",str(len(body))); self.end_headers()
+            self.wfile.write(body)
+        def log_message(self,*a): pass
+    server=ThreadingHTTPServer((host,port),Handler)
+    threading.Thread(target=server.serve_forever,daemon=True).start()
+    return server
+
+def snapshot(registry=None):
+    """
+    Ringkasan untuk UI: fase (total detik, jumlah), latensi per domain (n, p50, p95, max),
+    counter lain per nama → {label: nilai}.
+    """
+    reg=registry or REGISTRY
+    with reg.lock:
+        counters=dict(reg.counters); hists=dict(reg.hists)
+    def lbl(labels): return ",".join(f"{k}={v}" for k,v in labels) or "-"
+    out={"phases":[],"domains":[],"counters":{}}
+    for (name,labels),h in sorted(hists.items()):
+        row={"n":h.count,"total_s":round(h.sum,3),"p50_s":round(h.quantile(0.5),3),"p95_s":round(h.quantile(0.95),3),
+             "max_s":round(h.max,3)}
+        if name=="crawler_article_fetch_seconds": out["domains"].append({"domain":dict(labels)["host"],**row})
+        else: out["phases"].append({"metric":name.removeprefix("crawler_").removesuffix("_seconds"),"label":lbl(labels),**row})
+    for (name,labels),v in sorted(counters.items()):
+        out["counters"].setdefault(name.removeprefix("crawler_").removesuffix("_total"),{})[lbl(labels)]=v
+    return out
@@ -0,0 +1,89 @@
+# crawler_engine/neardup.py
+# Deteksi near-duplicate artikel (berita sindikasi, mis. rilis Antara di puluhan domain):
+# MinHash atas shingle kata + LSH banding → insert inkremental tanpa perbandingan berpasangan.
+
+import re, zlib
+
+from .urls import canonical_url
+
+NEAR_DUP_THRESHOLD = 0.8    # estimasi Jaccard minimum agar dianggap satu cluster
+NUM_PERM = 128
+LSH_BANDS = 16              # 16 band × 8 baris → kandidat mulai ± Jaccard 0.7
+SHINGLE_WORDS = 5
+_PRIME = 4294967291         # prima terbesar < 2^32: (a*h+b) tetap muat di uint64
+
+class NearDupIndex:
+    """
+    Index MinHash/LSH inkremental. add(key, text) → (cluster_id, is_canonical);
+    anggota pertama sebuah cluster menjadi pilihan kanonik (urut insert = urut shard/posisi).
+    """
+    def __init__(self,threshold=NEAR_DUP_THRESHOLD,num_perm=NUM_PERM,bands=LSH_BANDS,
+                 shingle=SHINGLE_WORDS,seed=1):
+        import numpy as np
+        self.np=np
+        rng=np.random.RandomState(seed)
+        self.a=rng.randint(1,_PRIME,num_perm,dtype=np.uint64)
+        self.b=rng.randint(0,_PRIME,num_perm,dtype=np.uint64)
+        self.threshold, self.shingle = threshold, shingle
+        self.bands, self.rows = bands, num_perm//bands
+        self.sigs, self.cluster_of, self.cluster_size = {}, {}, {}
+        self.buckets={}
+
+    def signature(self,text):
+        np=self.np
+        tokens=re.findall(r"\w+",(text or "").lower())
+        if not tokens: return None
+        k=min(self.shingle,len(tokens))
+        shingles={" ".join(tokens[i:i+k]) for i in range(len(tokens)-k+1)}
+        h=np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles),dtype=np.uint64,count=len(shingles))
+        return ((h[:,None]*self.a+self.b)%np.uint64(_PRIME)).min(axis=0).astype(np.uint32)
+
+    def _band_keys(self,sig):
+        return [(i,sig[i*self.rows:(i+1)*self.rows].tobytes()) for i in range(self.bands)]
+
+    def add(self,key,text):
+        if key in self.cluster_of:
+            cid=self.cluster_of[key]
+            return cid, False
+        sig=self.signature(text)
+        if sig is None: return None, True
+        bkeys=self._band_keys(sig)
+        best, best_sim = None, self.threshold
+        for other in {o for bk in bkeys for o in self.buckets.get(bk,())}:
+            sim=float((self.sigs[other]==sig).mean())
+            if sim>=best_sim: best, best_sim = other, sim
+        if best is None:
+            cid, canonical = len(self.cluster_size), True
+            self.cluster_size[cid]=0
+        else:
+            cid, canonical = self.cluster_of[best], False
+        self.sigs[key]=sig; self.cluster_of[key]=cid; self.cluster_size[cid]+=1
+        for bk in bkeys: self.buckets.setdefault(bk,[]).append(key)
+        return cid, canonical
+
+    def __len__(self):
+        return len(self.sigs)
+
+def tag_near_duplicate(index,row,idx=None):
+    """Isi dup_cluster / dup_canonical pada satu baris (baris tanpa article_text tidak di-cluster)."""
+    text=row.get("article_text")
+    if not text:
+        row.update({"dup_cluster":"","dup_canonical":""})
+        return row
+    key=canonical_url(row["link"]) if row.get("link") else idx
+    cid,canonical=index.add(key,text)
+    row.update({"dup_cluster":"" if cid is None else cid,"dup_canonical":canonical})
+    return row
+
+def annotate_near_duplicates(rows,index=None):
+    """Tandai semua baris sesuai urutannya; kembalikan index (bisa dipakai lagi untuk run berikutnya)."""
+    index=NearDupIndex() if index is None else index
+    for i,row in enumerate(rows): tag_near_duplicate(index,row,i)
+    for row in rows:
+        cid=row.get("dup_cluster")
+        row["dup_count"]=index.cluster_size.get(cid,1) if cid!="" else 1
+    return index
+
+def collapse_near_duplicates(rows):
+    """Satu baris per cluster (anggota kanonik); baris tanpa cluster tetap disertakan."""
+    return [r for r in rows if r.get("dup_canonical") is not False]
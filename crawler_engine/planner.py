@@ -0,0 +1,114 @@
+# crawler_engine/planner.py
+# Estimator call/hasil dan Auto Optimize (pilih granularitas + hasil/shard termurah).
+# Jika riwayat yield (yields.py) untuk query/site sudah cukup, estimasi memakai yield teramati;
+# jika belum, kembali ke asumsi terburuk (setiap shard memberi per_shard_limit hasil).
+
+import math
+from datetime import date
+from typing import Tuple
+
+from .cse import CSECache, CSE_MAX_RESULTS, get_cse_cache
+from .util import daterange_chunks, build_query_with_dates
+from .yields import get_yield_store
+
+GRANULARITIES = ["Monthly","Weekly","Daily"]
+
+def estimate_calls_and_results(n_shards:int, per_shard_limit:int, cached_calls:int=0)->Tuple[int,int]:
+    """Return (estimated_calls, estimated_results_cap); call yang dilayani cache tidak dihitung."""
+    calls = n_shards * math.ceil(per_shard_limit/10.0)   # 1 call per 10 hasil
+    calls = max(0, calls - cached_calls)
+    results_cap = n_shards * per_shard_limit             # batas maksimal hasil (sebelum dedup)
+    return calls, results_cap
+
+def count_cached_calls(cx,base_query,shards,per_shard_limit,gl,hl)->int:
+    """Berapa call dari rencana ini yang akan dilayani cache (asumsi tiap halaman penuh)."""
+    total=max(1,min(int(per_shard_limit),CSE_MAX_RESULTS))
+    keys=[]
+    for (s,e,_) in shards:
+        q=build_query_with_dates(base_query,s,e)
+        for start in range(1,total+1,10):
+            keys.append(CSECache.make_key(cx,q,min(10,total-start+1),start,gl,hl))
+    return get_cse_cache().count_cached(keys)
+
+def estimate_with_model(start_date:date, end_date:date, granularity:str, per_shard_limit:int,
+                        base_query:str, cached_calls:int=0):
+    """Perkiraan dari riwayat yield → (calls, link unik, model), atau None jika riwayat belum cukup."""
+    model = get_yield_store().model(base_query, granularity)
+    if model is None: return None
+    calls = links = 0
+    for (s,e,_) in daterange_chunks(start_date, end_date, granularity):
+        c,l = model.predict_shard((e-s).days+1, per_shard_limit)
+        calls += c; links += l
+    return max(0, calls - cached_calls), int(links), model
+
+def max_per_shard_limit_under_calls(n_shards:int, max_calls:int)->int:
+    """Kembalikan limit per shard maksimum (≤100) yang tidak melampaui max_calls."""
+    if n_shards<=0: return 0
+    k = max_calls // n_shards           # k = max ceil(L/10) yang diperbolehkan
+    if k<=0: return 0
+    return min(100, 10*k)               # L ≤ 10*k dan ≤100
+
+def calls_allowed(max_calls:int, quota_left=None)->int:
+    """Batas call efektif: Max Request Calls run ini, dipotong sisa kuota harian pool key."""
+    return int(max_calls) if quota_left is None else max(0, min(int(max_calls), int(quota_left)))
+
+def plan_with_model(start_date:date, end_date:date, target_links:int, max_calls:int, base_query:str):
+    """
+    Rencana dari riwayat yield: di antara (granularitas, limit) yang kasus terburuknya tetap
+    ≤ max_calls, pilih perkiraan call termurah yang mencapai target; jika tidak ada yang
+    mencapai target, pilih perkiraan link unik terbanyak. None jika riwayat belum cukup.
+    """
+    best, best_key = None, None
+    for gran in GRANULARITIES:
+        n_shards = len(daterange_chunks(start_date, end_date, gran))
+        Lmax = max_per_shard_limit_under_calls(n_shards, max_calls)
+        if Lmax <= 0 or get_yield_store().model(base_query, gran) is None:
+            continue
+        for L in range(10, Lmax+1, 10):
+            calls, links, _ = estimate_with_model(start_date, end_date, gran, L, base_query)
+            key = (0, calls, -links) if links >= target_links else (1, -links, calls)
+            if best_key is None or key < best_key:
+                best, best_key = (gran, L, n_shards, calls, links), key
+    return best
+
+def plan_auto_optimize(start_date:date, end_date:date, target_links:int, max_calls:int, quota_left=None,
+                       base_query:str=None):
+    """
+    Cari kombinasi paling hemat:
+      - Coba granularity: Monthly → Weekly → Daily
+      - Hitung jumlah shard & limit per shard maksimum yang muat di max_calls
+      - Pilih limit minimal yang cukup untuk capai target
+    `quota_left` (sisa kuota pool hari ini) ikut membatasi: rencana diperkecil agar muat,
+    atau None jika kuota habis. Dengan `base_query` yang punya riwayat yield, rencana dipilih
+    oleh plan_with_model (est_calls & est_results_cap = perkiraan call & link unik).
+    Return: (granularity, per_shard_limit, n_shards, est_calls, est_results_cap) atau None
+    """
+    max_calls = calls_allowed(max_calls, quota_left)
+    if max_calls <= 0:
+        return None
+    if base_query:
+        plan = plan_with_model(start_date, end_date, target_links, max_calls, base_query)
+        if plan: return plan
+    for gran in GRANULARITIES:
+        shards = daterange_chunks(start_date, end_date, gran)
+        n_shards = len(shards)
+        Lmax = max_per_shard_limit_under_calls(n_shards, max_calls)
+        if Lmax <= 0:
+            continue
+        L_needed = math.ceil(max(1, target_links) / max(1, n_shards))
+        L = min(Lmax, max(10, L_needed))         # minimal cukup, ≥10, ≤Lmax
+        est_calls, est_cap = estimate_calls_and_results(n_shards, L)
+        if est_calls <= max_calls and est_cap >= target_links:
+            return gran, L, n_shards, est_calls, est_cap
+    # fallback: pilih skema dengan est_cap terbesar tanpa > max_calls
+    best = None
+    for gran in GRANULARITIES:
+        shards = daterange_chunks(start_date, end_date, gran)
+        n_shards = len(shards)
+        Lmax = max_per_shard_limit_under_calls(n_shards, max_calls)
+        if Lmax <= 0: continue
+        est_calls, est_cap = estimate_calls_and_results(n_shards, Lmax)
+        cand = (gran, Lmax, n_shards, est_calls, est_cap)
+        if (best is None) or (cand[4] > best[4]):
+            best = cand
+    return best
@@ -0,0 +1,161 @@
+# crawler_engine/quota.py
+# Ledger kuota harian CSE per API key (persisten) + pool key/cx yang dirotasi berdasarkan sisa kuota.
+# Kuota CSE di-reset tengah malam waktu Pasifik; hari ledger mengikuti zona itu.
+
+import os, time, sqlite3, hashlib, threading
+from datetime import datetime
+from functools import lru_cache
+
+from .util import CACHE_DIR
+
+# query/hari/key; opt-in (None = tanpa batas, mis. key berbayar). Key gratis: set 100.
+CSE_DAILY_QUOTA = int(os.environ["CSE_DAILY_QUOTA"]) if os.environ.get("CSE_DAILY_QUOTA") else None
+QUOTA_TZ = "America/Los_Angeles"
+RATE_LIMIT_COOLDOWN = 60.0   # detik; key yang kena 429 per-menit diistirahatkan sebelum dipakai lagi
+
+class QuotaExhausted(RuntimeError):
+    """Tidak ada key di pool yang masih punya kuota hari ini."""
+
+def quota_day(now=None):
+    try:
+        from zoneinfo import ZoneInfo
+        return datetime.fromtimestamp(now or time.time(),ZoneInfo(QUOTA_TZ)).date().isoformat()
+    except Exception:   # tanpa tzdata: pakai UTC
+        return datetime.utcfromtimestamp(now or time.time()).date().isoformat()
+
+def key_id(api_key):
+    """Ledger tidak menyimpan API key mentah, hanya sidik jarinya."""
+    return hashlib.sha1((api_key or "").encode("utf-8")).hexdigest()[:12]
+
+class QuotaLedger:
+    """
+    Ledger persisten (SQLite, WAL): calls(key, hari → ok, gagal, exhausted).
+    Semua call HTTP nyata dicatat, termasuk yang gagal; hit cache/checkpoint tidak.
+    """
+    def __init__(self,path):
+        os.makedirs(os.path.dirname(path) or ".",exist_ok=True)
+        self.lock=threading.Lock()
+        self.conn=sqlite3.connect(path,check_same_thread=False,isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS calls(
+            key TEXT, day TEXT, ok INTEGER DEFAULT 0, failed INTEGER DEFAULT 0, exhausted INTEGER DEFAULT 0,
+            PRIMARY KEY(key,day))""")
+
+    def record(self,api_key,ok=True,exhausted=False,day=None):
+        row=(key_id(api_key),day or quota_day())
+        with self.lock:
+            self.conn.execute("INSERT OR IGNORE INTO calls(key,day) VALUES(?,?)",row)
+            self.conn.execute("""UPDATE calls SET ok=ok+?, failed=failed+?, exhausted=MAX(exhausted,?)
+                WHERE key=? AND day=?""",(int(ok),int(not ok),int(exhausted),*row))
+
+    def usage(self,api_key,day=None):
+        """{"ok", "failed", "exhausted"} untuk key pada hari kuota (default hari ini)."""
+        with self.lock:
+            row=self.conn.execute("SELECT ok,failed,exhausted FROM calls WHERE key=? AND day=?",
+                                  (key_id(api_key),day or quota_day())).fetchone()
+        ok,failed,exhausted=row or (0,0,0)
+        return {"ok":ok,"failed":failed,"exhausted":bool(exhausted)}
+
+    def remaining(self,api_key,daily_quota=CSE_DAILY_QUOTA,day=None):
+        """Sisa call hari ini; None jika key tanpa batas kuota (dan belum ditolak Google hari ini)."""
+        u=self.usage(api_key,day)
+        if u["exhausted"]: return 0
+        return None if not daily_quota else max(0,int(daily_quota)-u["ok"]-u["failed"])
+
+@lru_cache(maxsize=None)
+def get_quota_ledger():
+    """Satu instance per proses (bertahan lintas rerun Streamlit)."""
+    return QuotaLedger(os.path.join(CACHE_DIR,"quota.sqlite3"))
+
+class KeyPool:
+    """
+    Pool (api_key, cx, kuota harian). Tiap call memakai key dengan sisa kuota terbanyak;
+    429 "per day" menandai key habis untuk hari ini, 429 lain (per menit) mengistirahatkan key
+    RATE_LIMIT_COOLDOWN detik. cx pertama dipakai sebagai identitas cache (pool diasumsikan
+    berisi mesin CSE yang setara). Kuota None/0 = tanpa batas: key hanya berhenti dipakai jika
+    Google sendiri menolak dengan kuota harian habis.
+    pick() memesan satu call di bawah lock (dihitung sebagai terpakai sampai record()/release()),
+    sehingga shard paralel tidak bisa bersama-sama melewati batas kuota sebuah key.
+    """
+    def __init__(self,creds,daily_quota=CSE_DAILY_QUOTA,ledger=None):
+        self.creds=[(c[0],c[1],int(c[2]) if len(c)>2 and c[2] else (int(daily_quota) if daily_quota else None))
+                    for c in creds if c[0]]
+        if not self.creds: raise ValueError("pool key kosong")
+        self.ledger=ledger or get_quota_ledger()
+        self.cooldown, self.reserved = {}, {}
+        self.lock=threading.Lock()
+
+    @property
+    def cx(self):
+        return self.creds[0][1]
+
+    def status(self):
+        """Per key: sidik jari, cx, kuota, terpakai hari ini, sisa."""
+        out=[]
+        for api_key,cx,quota in self.creds:
+            u=self.ledger.usage(api_key)
+            out.append({"key":key_id(api_key),"cx":cx,"quota":quota,"used":u["ok"]+u["failed"],
+                        "failed":u["failed"],"remaining":self.ledger.remaining(api_key,quota)})
+        return out
+
+    def remaining(self):
+        """Total sisa call hari ini; None jika ada key tanpa batas yang masih bisa dipakai."""
+        left=[self.ledger.remaining(k,q) for k,_,q in self.creds]
+        return None if None in left else sum(left)
+
+    def _left(self,api_key,quota):
+        """Sisa kuota dikurangi call yang sedang dipesan (None = tanpa batas)."""
+        left=self.ledger.remaining(api_key,quota)
+        return None if left is None else left-self.reserved.get(api_key,0)
+
+    def pick(self):
+        """
+        Pesan satu call pada key dengan sisa kuota terbanyak yang tidak sedang cooldown → (api_key, cx).
+        Jika semua key yang masih berkuota sedang cooldown, tunggu sampai cooldown paling awal selesai;
+        QuotaExhausted hanya jika semua key habis untuk hari ini.
+        """
+        while True:
+            now=time.monotonic()
+            with self.lock:
+                usable=[(left,k,c) for k,c,q in self.creds
+                        for left in (self._left(k,q),) if left is None or left>0]
+                if not usable:
+                    raise QuotaExhausted(f"kuota CSE habis untuk semua {len(self.creds)} key hari ini")
+                ready=[u for u in usable if self.cooldown.get(u[1],0)<=now]
+                if ready:
+                    _,api_key,cx=max(ready,key=lambda r:float("inf") if r[0] is None else r[0])
+                    self.reserved[api_key]=self.reserved.get(api_key,0)+1
+                    return api_key, cx
+                wait=min(self.cooldown[k] for _,k,_ in usable)-now
+            time.sleep(max(wait,0.0))
+
+    def record(self,api_key,ok=True,exhausted=False):
+        """Catat call yang dikirim (pesanan dari pick() berubah menjadi pemakaian di ledger)."""
+        with self.lock:
+            self.ledger.record(api_key,ok,exhausted)
+            self._unreserve(api_key)
+
+    def release(self,api_key):
+        """Batalkan pesanan call yang tidak jadi dikirim."""
+        with self.lock:
+            self._unreserve(api_key)
+
+    def _unreserve(self,api_key):
+        if self.reserved.get(api_key,0)>0: self.reserved[api_key]-=1
+
+    def rate_limited(self,api_key):
+        with self.lock:
+            self.cooldown[api_key]=time.monotonic()+RATE_LIMIT_COOLDOWN
+
+def as_pool(api_key,cx=None,daily_quota=CSE_DAILY_QUOTA):
+    """Terima KeyPool atau satu api_key string (→ pool berisi satu key)."""
+    return api_key if isinstance(api_key,KeyPool) else KeyPool([(api_key,cx)],daily_quota)
+
+def parse_key_pool(text):
+    """Satu key per baris: `api_key cx [kuota_harian]` (dipisah spasi/koma)."""
+    creds=[]
+    for line in (text or "").splitlines():
+        parts=line.replace(","," ").split()
+        if len(parts)>=2 and not parts[0].startswith("#"):
+            creds.append((parts[0],parts[1],int(parts[2]) if len(parts)>2 else None))
+    return creds
@@ -0,0 +1,280 @@
+# crawler_engine/results.py
+# Hasil run disimpan di disk dalam format kolumnar (Parquet, kompresi zstd — teks artikel menyusut
+# beberapa kali lipat) alih-alih list dict + DataFrame di memori front-end. Baris ditulis bertahap
+# per row group; front-end hanya menyimpan handle (ResultSet) dan membaca halaman / kolom yang
+# diperlukan. Tanpa pyarrow: fallback JSONL gzip dengan API yang sama (paging dengan scan baris).
+
+import os, json, gzip, uuid, sqlite3
+from functools import lru_cache
+
+from .util import CACHE_DIR
+
+RESULTS_DIR = os.path.join(CACHE_DIR,"results")
+ROW_GROUP_ROWS = 1000   # baris per row group = satuan tulis & satuan baca halaman
+RESULTS_KEEP = 50       # file hasil lama di RESULTS_DIR yang dipertahankan
+
+# (kolom, tipe) — urutan = urutan kolom tabel hasil
+RESULT_FIELDS = (
+    ("query","str"),("title","str"),("link","str"),("snippet","str"),("position","int"),
+    ("shard_label","str"),("shard_start","str"),("shard_end","str"),
+    ("article_title","str"),("article_text","str"),("article_author","str"),("article_published","str"),
+    ("dup_cluster","int"),("dup_canonical","bool"),("dup_count","int"),
+)
+RESULT_COLUMNS = tuple(c for c,_ in RESULT_FIELDS)
+ARTICLE_COLUMNS = ("article_title","article_text","article_author","article_published")
+
+def _pa():
+    """Import pyarrow saat pertama dipakai; None jika tidak terpasang → JSONL gzip."""
+    try:
+        import pyarrow, pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        return None
+
+@lru_cache(maxsize=None)
+def _schema():
+    pa=_pa()
+    types={"str":pa.string(),"int":pa.int64(),"bool":pa.bool_()}
+    return pa.schema([(c,types[k]) for c,k in RESULT_FIELDS])
+
+def _frame(table):
+    """Tabel/batch Arrow → DataFrame; kolom int tetap int (Int64 nullable, bukan float NaN)."""
+    import pandas as pd
+    pa=_pa()
+    return table.to_pandas(types_mapper={pa.int64():pd.Int64Dtype()}.get)
+
+def _cell(v,kind):
+    if kind=="str": return "" if v is None else str(v)
+    if v is None or v=="": return None
+    return bool(v) if kind=="bool" else int(v)
+
+class ResultWriter:
+    """
+    Tulis baris hasil bertahap: append(rows) berkali-kali, close() → ResultSet.
+    Satu baris per link (kemunculan pertama); kolom di luar RESULT_COLUMNS dibuang.
+    File ditulis ke .tmp lalu di-rename sehingga pembaca tidak pernah melihat file setengah jadi.
+    """
+    def __init__(self,path,row_group=ROW_GROUP_ROWS):
+        os.makedirs(os.path.dirname(path) or ".",exist_ok=True)
+        self.path, self.tmp, self.row_group = path, f"{path}.tmp", row_group
+        self.pa=_pa() if path.endswith(".parquet") else None
+        self.buf, self.links, self.rows = [], set(), 0
+        if self.pa:
+            self.writer=self.pa.parquet.ParquetWriter(self.tmp,_schema(),compression="zstd")
+        else:
+            self.writer=gzip.open(self.tmp,"wt",encoding="utf-8")
+
+    def append(self,rows):
+        for row in rows:
+            link=row.get("link") or ""
+            if link in self.links: continue
+            self.links.add(link); self.buf.append(row)
+            if len(self.buf)>=self.row_group: self._flush()
+
+    def _flush(self):
+        if not self.buf: return
+        if self.pa:
+            cols={c:[_cell(r.get(c),k) for r in self.buf] for c,k in RESULT_FIELDS}
+            self.writer.write_table(self.pa.Table.from_pydict(cols,schema=_schema()))
+        else:
+            for r in self.buf:
+                self.writer.write(json.dumps({c:_cell(r.get(c),k) for c,k in RESULT_FIELDS},ensure_ascii=False)+"\n")
+        self.rows+=len(self.buf); self.buf=[]
+
+    def close(self):
+        self._flush(); self.writer.close()
+        os.replace(self.tmp,self.path)
+        return ResultSet(self.path)
+
+    def abort(self):
+        try: self.writer.close()
+        finally:
+            if os.path.exists(self.tmp): os.remove(self.tmp)
+
+def result_path(name="hasil",directory=None):
+    """Path file hasil baru yang unik (nama file = versi hasil; tidak pernah ditimpa)."""
+    safe="".join(c if c.isalnum() or c in "-_" else "_" for c in name)[:80]
+    ext="parquet" if _pa() else "jsonl.gz"
+    return os.path.join(directory or RESULTS_DIR,f"{safe}-{uuid.uuid4().hex[:8]}.{ext}")
+
+def prune_results(directory=None,keep=RESULTS_KEEP):
+    """Hapus file hasil paling lama di luar `keep` terbaru."""
+    directory=directory or RESULTS_DIR
+    if not os.path.isdir(directory): return
+    files=sorted((os.path.join(directory,f) for f in os.listdir(directory)
+                  if f.endswith((".parquet",".jsonl.gz"))),key=os.path.getmtime,reverse=True)
+    for path in files[keep:]:
+        try: os.remove(path)
+        except OSError: pass
+
+def write_results(rows,name="hasil",directory=None):
+    """Tulis iterable baris ke file hasil baru → ResultSet (baris di-stream per row group)."""
+    writer=ResultWriter(result_path(name,directory))
+    try:
+        writer.append(rows)
+        rs=writer.close()
+    except BaseException:
+        writer.abort(); raise
+    prune_results(directory)
+    return rs
+
+class ResultStream:
+    """
+    Hasil ditulis selama run berjalan, bukan dikumpulkan lalu ditulis sekali di akhir:
+    on_items(items) per shard → file hasil (urut shard, satu baris per link); on_article(row) per
+    artikel selesai → field artikel di SQLite sementara (urut selesai). finish(extract) tanpa ekstraksi
+    langsung menutup file; dengan ekstraksi, pass kedua atas file menggabungkan field artikel dan mengisi
+    kolom near-duplicate menurut urutan shard/posisi (sama seperti extract_items) ke file baru.
+    """
+    def __init__(self,name="hasil",directory=None):
+        self.name, self.directory = name, directory
+        self.writer=ResultWriter(result_path(name,directory))
+        self.db_path=f"{self.writer.path}.articles.sqlite3"
+        self.db=sqlite3.connect(self.db_path)
+        self.db.execute("CREATE TABLE articles(link TEXT PRIMARY KEY, fields TEXT)")
+
+    def on_items(self,items):
+        self.writer.append(items)
+
+    def on_article(self,row):
+        fields=json.dumps({c:row.get(c) for c in ARTICLE_COLUMNS},ensure_ascii=False)
+        self.db.execute("INSERT OR REPLACE INTO articles VALUES(?,?)",(row.get("link") or "",fields))
+
+    def _articles(self,links):
+        out={}
+        for i in range(0,len(links),500):
+            chunk=links[i:i+500]
+            q=f"SELECT link, fields FROM articles WHERE link IN ({','.join('?'*len(chunk))})"
+            out.update((link,json.loads(f)) for link,f in self.db.execute(q,chunk))
+        return out
+
+    def _rows(self,rs,columns=None):
+        """Baris file per batch (list dict; nilai kosong → None)."""
+        for batch in rs.iter_batches(columns):
+            batch=batch.astype(object).where(batch.notna(),None)
+            yield [r for r in batch.to_dict("records") if r.get("link")]
+
+    def finish(self,extract=False):
+        """Tutup file hasil (+ pass kedua near-duplicate jika `extract`) → ResultSet."""
+        from .neardup import NearDupIndex, tag_near_duplicate
+        try:
+            raw=self.writer.close()
+            if not extract:
+                rs=raw
+            else:
+                # pass 1: cluster per baris urut file (hanya link + teks artikel yang dibaca)
+                index, tags = NearDupIndex(), []
+                for rows in self._rows(raw,["link"]):
+                    arts=self._articles([r["link"] for r in rows])
+                    for r in rows:
+                        row=tag_near_duplicate(index,{"link":r["link"],
+                                                      "article_text":arts.get(r["link"],{}).get("article_text")})
+                        tags.append((row["dup_cluster"],row["dup_canonical"]))
+                # pass 2: tulis ulang dengan field artikel + kolom near-duplicate (ukuran cluster sudah final)
+                writer, tag = ResultWriter(result_path(self.name,self.directory)), iter(tags)
+                try:
+                    for rows in self._rows(raw):
+                        arts=self._articles([r["link"] for r in rows])
+                        for r in rows:
+                            cid,canonical=next(tag)
+                            r.update(arts.get(r["link"],{}))
+                            r.update(dup_cluster=cid,dup_canonical=canonical,
+                                     dup_count=index.cluster_size.get(cid,1) if cid!="" else 1)
+                        writer.append(rows)
+                    rs=writer.close()
+                except BaseException:
+                    writer.abort(); raise
+                finally:
+                    os.remove(raw.path)
+        finally:
+            self._drop_db()
+        prune_results(self.directory)
+        return rs
+
+    def abort(self):
+        try: self.writer.abort()
+        finally: self._drop_db()
+
+    def _drop_db(self):
+        self.db.close()
+        if os.path.exists(self.db_path): os.remove(self.db_path)
+
+class ResultSet:
+    """
+    Handle ringan ke file hasil (path + jumlah baris) — aman disimpan di session_state.
+    Semua pembacaan lazy: page() hanya membaca row group yang tercakup, column() hanya kolom itu.
+    `version` (nama file) berubah setiap kali hasil ditulis ulang.
+    """
+    def __init__(self,path):
+        self.path=path
+        self.version=os.path.basename(path).split(".")[0]
+        self.size=os.path.getsize(path)
+        if path.endswith(".parquet"):
+            meta=_pa().parquet.ParquetFile(path).metadata
+            self.groups=[meta.row_group(i).num_rows for i in range(meta.num_row_groups)]
+        else:
+            with gzip.open(path,"rt",encoding="utf-8") as fh: self.groups=[sum(1 for _ in fh)]
+        self.rows=sum(self.groups)
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def parquet(self):
+        return self.path.endswith(".parquet")
+
+    def _jsonl(self,offset=0,limit=None):
+        with gzip.open(self.path,"rt",encoding="utf-8") as fh:
+            for i,line in enumerate(fh):
+                if limit is not None and i>=offset+limit: break
+                if i>=offset: yield json.loads(line)
+
+    def iter_batches(self,columns=None,batch_size=ROW_GROUP_ROWS):
+        """DataFrame per batch (untuk ekspor/statistik tanpa memuat seluruh hasil)."""
+        import pandas as pd
+        cols=list(columns or RESULT_COLUMNS)
+        if self.parquet:
+            for batch in _pa().parquet.ParquetFile(self.path).iter_batches(batch_size,columns=cols):
+                yield _frame(batch)
+            return
+        buf=[]
+        for row in self._jsonl():
+            buf.append({c:row.get(c) for c in cols})
+            if len(buf)>=batch_size: yield pd.DataFrame(buf,columns=cols); buf=[]
+        if buf: yield pd.DataFrame(buf,columns=cols)
+
+    def page(self,offset=0,limit=50,columns=None):
+        """Baris [offset, offset+limit) sebagai DataFrame."""
+        import pandas as pd
+        cols=list(columns or RESULT_COLUMNS)
+        if not self.parquet:
+            return pd.DataFrame([{c:r.get(c) for c in cols} for r in self._jsonl(offset,limit)],columns=cols)
+        groups, start, first = [], 0, None
+        for i,n in enumerate(self.groups):
+            if start+n>offset and start<offset+limit:
+                groups.append(i)
+                if first is None: first=start
+            start+=n
+        if not groups: return pd.DataFrame(columns=cols)
+        table=_pa().parquet.ParquetFile(self.path).read_row_groups(groups,columns=cols)
+        return _frame(table.slice(offset-first,limit))
+
+    def column(self,name):
+        """Satu kolom penuh sebagai Series (mis. statistik near-duplicate tanpa membaca teks)."""
+        import pandas as pd
+        if self.parquet:
+            return _frame(_pa().parquet.read_table(self.path,columns=[name]))[name]
+        return pd.Series([r.get(name) for r in self._jsonl()],name=name)
+
+    def records(self,offset=0,limit=None,columns=None):
+        """Baris sebagai list dict (JSON mentah on-demand)."""
+        if not self.parquet:
+            rows=self._jsonl(offset,limit)
+            return [{c:r.get(c) for c in columns} for r in rows] if columns else list(rows)
+        df=self.page(offset,self.rows if limit is None else limit,columns)
+        return json.loads(df.to_json(orient="records",force_ascii=False))
+
+    def to_frame(self,columns=None):
+        import pandas as pd
+        frames=list(self.iter_batches(columns))
+        return pd.concat(frames,ignore_index=True) if frames else pd.DataFrame(columns=list(columns or RESULT_COLUMNS))
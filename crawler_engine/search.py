@@ -0,0 +1,315 @@
+# crawler_engine/search.py
+# Indeks full-text (SQLite FTS5) atas artikel hasil ekstraksi, diperbarui bertahap saat
+# enrich_with_articles menyelesaikan artikel. Teks di-stem dengan stemmer Bahasa Indonesia
+# (Sastrawi, selain itu stemmer ringan berbasis aturan imbuhan) sebelum masuk
+# FTS5; query pencarian di-stem dengan cara yang sama. Kolom ketiga menyimpan kata asli (tanpa stem)
+# untuk pencarian awalan (kata*). Filter: domain, tanggal, query asal.
+
+import os, re, time, hashlib, sqlite3, threading
+from functools import lru_cache
+
+from .util import CACHE_DIR
+
+SEARCH_INDEX_ENABLED = os.environ.get("CRAWLER_SEARCH_INDEX","1")!="0"
+INDEX_BATCH = 50   # artikel per transaksi saat indexing bertahap
+COUNT_CAP = 10_000 # batas hitung hit (ditampilkan "10000+")
+
+STOPWORDS = frozenset("""
+yang dan di ke dari ini itu dengan untuk pada adalah dalam tidak akan juga atau oleh sebagai karena
+telah sudah ada saat bisa para kata ia mereka kami kita anda namun tersebut lebih serta bagi hingga
+sejak agar jika maka masih harus dapat sangat secara antara oleh pun lagi tak belum yakni yaitu kemudian
+""".split())
+
+# =========================
+# Stemmer Bahasa Indonesia
+# =========================
+@lru_cache(maxsize=None)
+def _sastrawi():
+    """Stemmer Sastrawi jika terpasang; None → stemmer aturan ringan."""
+    try:
+        from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+        return StemmerFactory().create_stemmer()
+    except ImportError:
+        return None
+
+VOWELS = "aeiou"
+MIN_STEM = 4   # stem aturan tidak pernah lebih pendek dari ini (mencegah "sekolah" → "seko")
+# Kata dasar berawalan ny- (meny-/peny- + vokal biasanya meluluhkan s-: menyebut → sebut)
+NY_ROOTS = ("nyata","nyanyi","nyaman","nyawa","nyala","nyali","nyonya")
+# Akhiran per jenis awalan: konfiks ke-/pe(N)-/per- + -an; me(N)-/di-/ter- + -kan/-i
+SUFFIXES = {"me":("kan","i"),"ber":("kan","an"),"pe":("an",),"":("kan","an")}
+
+def _prefixes(w):
+    """Kandidat (sisa kata, jenis awalan) untuk awalan `w`, urut dari yang paling mungkin."""
+    if w.startswith(("memper","diper")): yield w[w.index("per")+3:], "me"
+    if w.startswith("di"): yield w[2:], "me"
+    if w.startswith("ke") and w.endswith("an"): yield w[2:], "pe"
+    if w.startswith("ber") and not w.startswith("belajar"): yield w[3:], "ber"
+    if w.startswith("ter"): yield w[3:], "me"
+    if w.startswith("per"): yield w[3:], "pe"
+    if w[0] not in "mp" or w[1:2]!="e" or len(w)<5: return
+    kind="me" if w[0]=="m" else "pe"
+    if w[2:4]=="ny" and w[4] in VOWELS:
+        rest=w[4:]
+        yield ("ny"+rest if ("ny"+rest).startswith(NY_ROOTS) else "s"+rest), kind
+    elif w[2:4]=="ng":
+        if w[4] in VOWELS: yield w[4:], kind; yield "k"+w[4:], kind
+        else: yield w[4:], kind
+    elif w[2]=="m":
+        if w[3] in VOWELS: yield "p"+w[3:], kind
+        elif w[3] in "bfvp": yield w[3:], kind
+    elif w[2]=="n":
+        if w[3] in VOWELS: yield "t"+w[3:], kind
+        elif w[3] in "cdjzs": yield w[3:], kind   # men+t hanya pada kata serapan (menteri, mental)
+    # pe+r: "perang" bukan pe+rang, tetapi "perasaan" = pe+rasa+an
+    if w[2] in "lrwymn" and w[3] in VOWELS and (kind=="me" or w[2]!="r" or len(w)>6): yield w[2:], kind
+
+def _strip_suffix(w,kind):
+    """
+    → (kata tanpa akhiran, sah?); tidak sah jika kata berakhiran -kan/-an tetapi sisanya terlalu
+    pendek (mengatakan: "atakan" ditolak → "katakan" → kata). Akhiran -i yang terlalu pendek dianggap
+    bagian kata dasar (terjadi → jadi).
+    """
+    for suf in SUFFIXES[kind]:
+        if w.endswith(suf):
+            if len(w)-len(suf)>=MIN_STEM: return w[:-len(suf)], True
+            return w, suf=="i"
+    return w, True
+
+def _rule_stem(word):
+    """
+    Stemmer aturan (tanpa kamus kata dasar) bila Sastrawi tidak terpasang: partikel -lah/-kah/-pun
+    → posesif -nya → satu awalan (di/ke-an/ber/ter/per/memper/diper, me-/pe- dengan peluluhan) →
+    akhiran sesuai awalannya (-kan/-i setelah me-/di-/ter-, -an pada konfiks ke-/pe-/per-).
+    Kandidat awalan dicoba berurutan; yang pertama menyisakan stem ≥ MIN_STEM dipakai.
+    """
+    if len(word)<=MIN_STEM or not word.isalpha(): return word
+    w=word
+    for suf,keep in (("lah",5),("kah",5),("pun",5),("nya",4)):
+        if w.endswith(suf) and len(w)-len(suf)>=keep: w=w[:-len(suf)]
+    for rest,kind in _prefixes(w):
+        if len(rest)<MIN_STEM: continue
+        out,ok=_strip_suffix(rest,kind)
+        if ok: return out
+    return _strip_suffix(w,"")[0]
+
+@lru_cache(maxsize=200_000)
+def stem(word):
+    """
+    Stem satu kata (huruf kecil): Sastrawi (kamus kata dasar) jika terpasang, selain itu
+    _rule_stem. Tidak sempurna secara linguistik, tetapi konsisten untuk indeks & query.
+    """
+    sastrawi=_sastrawi()
+    if sastrawi is not None: return sastrawi.stem(word) or word
+    return _rule_stem(word)
+
+TOKEN_RE = re.compile(r"[0-9a-zà-ÿ]+")
+
+def tokens(text):
+    """Teks → daftar kata asli (huruf kecil, tanpa stopword)."""
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+def analyze(text):
+    """Teks → daftar stem (huruf kecil, tanpa stopword)."""
+    return [stem(t) for t in tokens(text)]
+
+def fts_query(text):
+    """
+    Query pengguna → ekspresi MATCH FTS5 atas teks ter-stem. Kata = AND, "frasa", OR,
+    -kata (kecuali), kata* (awalan). Awalan dicocokkan ke kolom `words` (kata asli): awalan
+    yang di-stem ("pemerin" → "rin") tidak lagi cocok dengan stem kata utuhnya.
+    None jika tidak ada term positif.
+    """
+    pos, neg = [], []
+    for m in re.finditer(r'(-?)"([^"]+)"|(\S+)',text or ""):
+        minus, phrase, word = m.group(1), m.group(2), m.group(3)
+        if word=="OR":
+            if pos and pos[-1]!="OR": pos.append("OR")
+            continue
+        if word and word.startswith("-"): minus, word = "-", word[1:]
+        prefix=bool(word) and word.endswith("*")
+        raw=phrase if phrase is not None else word.rstrip("*")
+        toks=tokens(raw) if prefix else analyze(raw)
+        if not toks: continue
+        term=f'words : "{" ".join(toks)}"*' if prefix else '"'+" ".join(toks)+'"'
+        if prefix and minus: term=f"({term})"
+        (neg if minus else pos).append(term)
+    while pos and pos[-1]=="OR": pos.pop()
+    if not pos: return None
+    return " ".join(pos)+"".join(f" NOT {t}" for t in neg)
+
+def query_terms(text):
+    """(stem, awalan kata asli) dari query pengguna — untuk menebalkan kata cocok di snippet."""
+    stems, prefixes = set(), []
+    for word in re.findall(r'[^\s"]+',text or ""):
+        if word=="OR" or word.startswith("-"): continue
+        if word.endswith("*"): prefixes+=tokens(word.rstrip("*"))
+        else: stems.update(analyze(word))
+    return stems, tuple(prefixes)
+
+def article_day(row):
+    """Tanggal artikel (YYYY-MM-DD): article_published jika terbaca, selain itu awal shard."""
+    m=re.match(r"\d{4}-\d{2}-\d{2}",str(row.get("article_published") or ""))
+    return m.group(0) if m else (row.get("shard_start") or None)
+
+def snippet(text,terms,width=160,prefixes=()):
+    """
+    Potongan teks di sekitar kata pertama yang stem-nya cocok (atau berawalan salah satu `prefixes`);
+    kata cocok ditebalkan (markdown).
+    """
+    text=text or ""
+    hits=[m for m in TOKEN_RE.finditer(text.lower())
+          if stem(m.group(0)) in terms or m.group(0).startswith(prefixes)] if terms or prefixes else []
+    if not hits: return text[:width]+("…" if len(text)>width else "")
+    a=max(0,hits[0].start()-width//3); b=min(len(text),a+width)
+    out, pos = [], a
+    for m in hits:
+        if m.start()<a or m.end()>b: continue
+        out+= [text[pos:m.start()], f"**{text[m.start():m.end()]}**"]; pos=m.end()
+    out.append(text[pos:b])
+    return ("…" if a else "")+"".join(out)+("…" if b<len(text) else "")
+
+# =========================
+# Indeks
+# =========================
+class SearchIndex:
+    """
+    Indeks FTS5 (SQLite, WAL):
+      - docs(url kanonik → link, domain, tanggal, query asal, judul, teks mentah, hash konten)
+      - docs_fts(title, body, words): judul & isi ter-stem + kata asli (judul+isi) untuk pencarian
+        awalan, rowid = docs.rowid; peringkat bm25 (judul ×5)
+    Artikel dengan hash konten sama tidak di-index ulang. Indeks lama tanpa kolom `words` dibangun
+    ulang dari tabel docs saat dibuka.
+    """
+    def __init__(self,path):
+        os.makedirs(os.path.dirname(path) or ".",exist_ok=True)
+        self.lock=threading.Lock()
+        self.conn=sqlite3.connect(path,check_same_thread=False,isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS docs(
+            id INTEGER PRIMARY KEY, url TEXT UNIQUE, link TEXT, domain TEXT, day TEXT, query TEXT,
+            title TEXT, text TEXT, author TEXT, hash TEXT, indexed REAL)""")
+        for col in ("domain","day","query"):
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS ix_docs_{col} ON docs({col})")
+        cols=[r[1] for r in self.conn.execute("PRAGMA table_info(docs_fts)")]
+        if cols and "words" not in cols: self.conn.execute("DROP TABLE docs_fts")
+        self.conn.execute("""CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+            title, body, words, tokenize='unicode61 remove_diacritics 2')""")
+        if cols and "words" not in cols: self._rebuild_fts()
+
+    def _rebuild_fts(self):
+        rows=self.conn.execute("SELECT id,title,text FROM docs").fetchall()
+        self.conn.execute("BEGIN")
+        self.conn.executemany("INSERT INTO docs_fts(rowid,title,body,words) VALUES(?,?,?,?)",
+                              [(i,*self._fts_columns(t,x)) for i,t,x in rows])
+        self.conn.execute("COMMIT")
+
+    @staticmethod
+    def _fts_columns(title,text):
+        return " ".join(analyze(title))," ".join(analyze(text))," ".join(tokens(f"{title} {text}"))
+
+    def add_many(self,rows):
+        """Upsert artikel (butuh link + judul/teks); return jumlah yang (ulang) di-index."""
+        from .article_parser import url_host
+        from .urls import canonical_url
+        docs=[]
+        for row in rows:
+            title=row.get("article_title") or row.get("title") or ""
+            text=row.get("article_text") or ""
+            if not row.get("link") or not (title or text): continue
+            h=hashlib.sha1(f"{title}\x00{text}".encode("utf-8")).hexdigest()
+            docs.append((canonical_url(row["link"]),row["link"],url_host(row["link"]).removeprefix("www."),
+                         article_day(row),row.get("query"),title,text,row.get("article_author") or "",h))
+        # stemming di luar lock (CPU) — hanya tulis ke SQLite yang diserialkan
+        stemmed=[self._fts_columns(d[5],d[6]) for d in docs]
+        n=0
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                for d,cols in zip(docs,stemmed):
+                    old=self.conn.execute("SELECT id,hash FROM docs WHERE url=?",(d[0],)).fetchone()
+                    if old and old[1]==d[8]: continue
+                    if old:
+                        self.conn.execute("""UPDATE docs SET link=?,domain=?,day=?,query=COALESCE(?,query),title=?,
+                            text=?,author=?,hash=?,indexed=? WHERE id=?""",(*d[1:],time.time(),old[0]))
+                        self.conn.execute("DELETE FROM docs_fts WHERE rowid=?",(old[0],))
+                        rowid=old[0]
+                    else:
+                        rowid=self.conn.execute("INSERT INTO docs VALUES(NULL,?,?,?,?,?,?,?,?,?,?)",
+                                                (*d,time.time())).lastrowid
+                    self.conn.execute("INSERT INTO docs_fts(rowid,title,body,words) VALUES(?,?,?,?)",(rowid,*cols))
+                    n+=1
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK"); raise
+        return n
+
+    def _where(self,match,domain,date_from,date_to,query):
+        where, args = ["docs_fts MATCH ?"], [match]
+        if domain: where.append("docs.domain=?"); args.append(domain.removeprefix("www."))
+        if date_from: where.append("docs.day>=?"); args.append(str(date_from))
+        if date_to: where.append("docs.day<=?"); args.append(str(date_to))
+        if query: where.append("docs.query=?"); args.append(query)
+        # CROSS JOIN: FTS selalu loop luar (planner kadang memilih index domain lalu memeriksa MATCH per baris)
+        join="CROSS JOIN docs ON docs.id=docs_fts.rowid" if len(where)>1 else ""
+        return join, " AND ".join(where), args
+
+    def search(self,text,domain=None,date_from=None,date_to=None,query=None,limit=50,offset=0):
+        """Hit berperingkat bm25 → [{link, title, domain, day, query, author, score, snippet}]."""
+        match=fts_query(text)
+        if match is None: return []
+        join,where,args=self._where(match,domain,date_from,date_to,query)
+        with self.lock:
+            # urutkan hanya (rowid, skor); baris docs (teks penuh) dibaca untuk halaman hasil saja
+            ranked=self.conn.execute(f"""SELECT docs_fts.rowid,bm25(docs_fts,5.0,1.0,1.0) AS score FROM docs_fts {join}
+                WHERE {where} ORDER BY score LIMIT ? OFFSET ?""",(*args,int(limit),int(offset))).fetchall()
+            rows={r[0]:r[1:] for r in self.conn.execute(
+                f"SELECT id,link,title,domain,day,query,author,text FROM docs WHERE id IN ({','.join('?'*len(ranked))})",
+                [r[0] for r in ranked])} if ranked else {}
+        terms,prefixes=query_terms(text)
+        return [{"link":r[0],"title":r[1],"domain":r[2],"day":r[3],"query":r[4],"author":r[5],
+                 "score":round(-score,3),"snippet":snippet(r[6],terms,prefixes=prefixes)}
+                for rowid,score in ranked for r in [rows[rowid]]]
+
+    def count(self,text,domain=None,date_from=None,date_to=None,query=None,cap=COUNT_CAP):
+        """Jumlah hit, dibatasi `cap` (query sangat umum tidak perlu dihitung sampai habis)."""
+        match=fts_query(text)
+        if match is None: return 0
+        join,where,args=self._where(match,domain,date_from,date_to,query)
+        with self.lock:
+            return self.conn.execute(f"""SELECT COUNT(*) FROM (SELECT 1 FROM docs_fts {join}
+                WHERE {where} LIMIT ?)""",(*args,int(cap))).fetchone()[0]
+
+    def facets(self,col):
+        """Nilai berbeda untuk filter UI (domain / query) beserta jumlah dokumen, terbanyak dulu."""
+        if col not in ("domain","query"): raise ValueError(col)
+        with self.lock:
+            return self.conn.execute(f"""SELECT {col},COUNT(*) FROM docs WHERE {col} IS NOT NULL
+                GROUP BY {col} ORDER BY 2 DESC""").fetchall()
+
+    def stats(self):
+        with self.lock:
+            n,lo,hi=self.conn.execute("SELECT COUNT(*),MIN(day),MAX(day) FROM docs").fetchone()
+        return {"docs":n,"first_day":lo,"last_day":hi}
+
+    def optimize(self):
+        with self.lock: self.conn.execute("INSERT INTO docs_fts(docs_fts) VALUES('optimize')")
+
+@lru_cache(maxsize=None)
+def get_search_index():
+    """Satu instance per proses (bertahan lintas rerun Streamlit)."""
+    return SearchIndex(os.path.join(CACHE_DIR,"search.sqlite3"))
+
+class Indexer:
+    """Buffer indexing bertahap: add(row) per artikel selesai, flush tiap INDEX_BATCH dan di akhir."""
+    def __init__(self,index=None,batch=INDEX_BATCH):
+        self.index, self.batch, self.buf, self.indexed = index or get_search_index(), batch, [], 0
+
+    def add(self,row):
+        self.buf.append(row)
+        if len(self.buf)>=self.batch: self.flush()
+
+    def flush(self):
+        if self.buf:
+            rows, self.buf = self.buf, []
+            self.indexed+=self.index.add_many(rows)
@@ -0,0 +1,68 @@
+# crawler_engine/urls.py
+# Kanonikalisasi URL berita + seen-set dedup inkremental selama crawl.
+
+import threading
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+# Varian host untuk artikel yang sama (mobile / AMP / www)
+HOST_VARIANT_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+# Parameter pelacak & varian tampilan yang tidak mengubah isi artikel
+TRACKING_PARAM_PREFIXES = ("utm_",)
+DROP_PARAMS = {"fbclid","gclid","dclid","msclkid","yclid","_ga","ref","ref_src",
+               "amp","page","single","showpage","outputtype"}
+
+def canonical_url(url):
+    """
+    Bentuk kanonik untuk dedup & key store artikel:
+      https, host lowercase tanpa www./m./mobile./amp., tanpa port default,
+      segmen path "amp" dibuang, tanpa trailing slash, tanpa fragment,
+      tanpa utm_* / fbclid / ?page=all / ?single=1 dsb.; sisa query diurutkan.
+    """
+    p=urlparse((url or "").strip())
+    if not p.netloc: return (url or "").strip()
+    host=p.hostname or ""
+    for pre in HOST_VARIANT_PREFIXES:
+        if host.startswith(pre) and host.count(".")>1:
+            host=host[len(pre):]; break
+    if p.port and p.port not in (80,443): host=f"{host}:{p.port}"
+    segs=[s for s in p.path.split("/") if s and s.lower()!="amp"]
+    path="/"+"/".join(segs)
+    query=sorted((k,v) for k,v in parse_qsl(p.query,keep_blank_values=True)
+                 if k.lower() not in DROP_PARAMS and not k.lower().startswith(TRACKING_PARAM_PREFIXES))
+    return urlunparse(("https",host,path,"",urlencode(query),""))
+
+class DedupSet:
+    """
+    Seen-set URL kanonik yang diisi bertahap saat hasil shard masuk (thread-safe).
+    Link yang sudah pernah terlihat dibuang sebelum sampai ke ekstraksi; statistik
+    per shard (raw/dup) dipakai planner untuk mengenali shard yang sebagian besar redundan.
+    """
+    def __init__(self,seen=()):
+        self.seen=set(seen)
+        self.shard_stats={}  # label → {"raw": n, "dup": n}
+        self.lock=threading.Lock()
+
+    def filter(self,items,label=None):
+        out, dup = [], 0
+        with self.lock:
+            for it in items:
+                key=canonical_url(it["link"]) if it.get("link") else None
+                if key and key in self.seen:
+                    dup+=1; continue
+                if key: self.seen.add(key)
+                out.append(it)
+            st=self.shard_stats.setdefault(label,{"raw":0,"dup":0})
+            st["raw"]+=len(items); st["dup"]+=dup
+        return out
+
+    def redundancy(self,label):
+        st=self.shard_stats.get(label)
+        return st["dup"]/st["raw"] if st and st["raw"] else 0.0
+
+    def totals(self):
+        raw=sum(s["raw"] for s in self.shard_stats.values())
+        dup=sum(s["dup"] for s in self.shard_stats.values())
+        return {"raw":raw,"dup":dup,"unique":len(self.seen)}
+
+    def __len__(self):
+        return len(self.seen)
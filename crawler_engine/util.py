@@ -0,0 +1,49 @@
+# crawler_engine/util.py
+# Helper umum: teks, shard tanggal, query CSE bertanggal, dan callback progress.
+
+import os, re
+from datetime import date, timedelta
+
+CACHE_DIR = os.environ.get("CRAWLER_CACHE_DIR", ".cache")
+
+def clean_text(x: str) -> str:
+    if not x: return ""
+    return re.sub(r"\s+", " ", str(x)).strip()
+
+def daterange_chunks(start: date, end: date, granularity: str):
+    chunks=[]
+    if start>end: return chunks
+    if granularity=="Monthly":
+        cur=date(start.year,start.month,1)
+        while cur<=end:
+            nxt=date(cur.year+1,1,1) if cur.month==12 else date(cur.year,cur.month+1,1)
+            chunks.append((max(cur,start),min(nxt-timedelta(days=1),end),cur.strftime("%Y-%m")))
+            cur=nxt
+    elif granularity=="Weekly":
+        cur=start
+        while cur<=end:
+            chunk_end=min(cur+timedelta(days=6),end)
+            chunks.append((cur,chunk_end,f"wk_{cur:%Y-%m-%d}"))
+            cur=chunk_end+timedelta(days=1)
+    else:  # Daily
+        cur=start
+        while cur<=end:
+            chunks.append((cur,cur,f"{cur:%Y-%m-%d}"))
+            cur+=timedelta(days=1)
+    return chunks
+
+def build_query_with_dates(base,d_start,d_end):
+    # before pakai end+1 agar inklusif
+    return f"{base.strip()} after:{d_start:%Y-%m-%d} before:{(d_end+timedelta(days=1)):%Y-%m-%d}"
+
+def shard_label(s,e):
+    return f"{s:%Y-%m-%d}" if s==e else f"{s:%Y-%m-%d}_{e:%Y-%m-%d}"
+
+def bisect_range(s,e):
+    mid=s+timedelta(days=(e-s).days//2)
+    return (s,mid),(mid+timedelta(days=1),e)
+
+# Callback progress engine: progress(desc, done, total, detail="").
+# Front-end (Streamlit, CLI) memasang implementasinya sendiri; default tidak melakukan apa-apa.
+def noop_progress(desc, done, total, detail=""):
+    pass
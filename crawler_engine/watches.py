@@ -0,0 +1,185 @@
+# crawler_engine/watches.py
+# Query tersimpan untuk crawl terjadwal (delta): parameter run + high-water mark per query.
+# Setiap run hanya merencanakan shard setelah watermark (dikurangi jendela overlap untuk artikel
+# yang terlambat terindeks), membuang link yang sudah ada di dataset sebelum ekstraksi, lalu
+# menambahkan baris baru ke dataset JSONL — biaya harian sebanding dengan konten baru.
+
+import os, json, time, sqlite3, threading
+from datetime import date, timedelta
+from functools import lru_cache
+
+from .util import CACHE_DIR, noop_progress, daterange_chunks
+
+DELTA_OVERLAP_DAYS = 2   # hari sebelum watermark yang ikut dicari ulang (artikel terlambat terindeks)
+
+class WatchStore:
+    """
+    Query tersimpan (SQLite, WAL):
+      - watches(nama → parameter job, overlap, watermark = tanggal terakhir yang selesai,
+        job terakhir, path dataset)
+      - seen(nama, url kanonik) — link yang sudah masuk dataset, dipakai sebagai seed dedup
+    """
+    def __init__(self,path):
+        os.makedirs(os.path.dirname(path) or ".",exist_ok=True)
+        self.lock=threading.Lock()
+        self.conn=sqlite3.connect(path,check_same_thread=False,isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS watches(
+            name TEXT PRIMARY KEY, params TEXT, overlap INTEGER, watermark TEXT, last_job TEXT,
+            dataset TEXT, created REAL, updated REAL)""")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS seen(
+            name TEXT, url TEXT, PRIMARY KEY(name,url))""")
+
+    def save(self,name,params,overlap=DELTA_OVERLAP_DAYS,dataset=None):
+        """Simpan/perbarui definisi; watermark & link yang sudah terlihat dipertahankan."""
+        now=time.time()
+        with self.lock:
+            self.conn.execute("""INSERT INTO watches VALUES(?,?,?,NULL,NULL,?,?,?)
+                ON CONFLICT(name) DO UPDATE SET params=excluded.params,overlap=excluded.overlap,
+                dataset=excluded.dataset,updated=excluded.updated""",
+                (name,json.dumps(params,ensure_ascii=False),int(overlap),dataset,now,now))
+
+    def get(self,name):
+        with self.lock:
+            row=self.conn.execute("""SELECT name,params,overlap,watermark,last_job,dataset,updated
+                FROM watches WHERE name=?""",(name,)).fetchone()
+            if not row: return None
+            n_seen=self.conn.execute("SELECT COUNT(*) FROM seen WHERE name=?",(name,)).fetchone()[0]
+        return {"name":row[0],"params":json.loads(row[1]),"overlap":row[2],"watermark":row[3],
+                "last_job":row[4],"dataset":row[5],"updated":row[6],"links":n_seen}
+
+    def all(self):
+        with self.lock:
+            names=[r[0] for r in self.conn.execute("SELECT name FROM watches ORDER BY name")]
+        return [self.get(n) for n in names]
+
+    def delete(self,name):
+        with self.lock:
+            self.conn.execute("DELETE FROM watches WHERE name=?",(name,))
+            self.conn.execute("DELETE FROM seen WHERE name=?",(name,))
+
+    def set_job(self,name,job_id):
+        with self.lock:
+            self.conn.execute("UPDATE watches SET last_job=?,updated=? WHERE name=?",(job_id,time.time(),name))
+
+    def advance(self,name,watermark):
+        with self.lock:
+            self.conn.execute("UPDATE watches SET watermark=?,updated=? WHERE name=?",
+                              (watermark.isoformat(),time.time(),name))
+
+    def seen_urls(self,name):
+        with self.lock:
+            return {r[0] for r in self.conn.execute("SELECT url FROM seen WHERE name=?",(name,))}
+
+    def add_seen(self,name,urls):
+        with self.lock:
+            self.conn.executemany("INSERT OR IGNORE INTO seen VALUES(?,?)",[(name,u) for u in urls])
+
+@lru_cache(maxsize=None)
+def get_watch_store():
+    """Satu instance per proses (bertahan lintas rerun Streamlit)."""
+    return WatchStore(os.path.join(CACHE_DIR,"watches.sqlite3"))
+
+def default_dataset(name):
+    safe="".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+    return os.path.join(CACHE_DIR,"datasets",f"{safe}.jsonl")
+
+def dataset_links(path):
+    """URL kanonik di dataset JSONL yang sudah ada (seed saat query disimpan)."""
+    from .urls import canonical_url
+    if not path or not os.path.exists(path): return set()
+    out=set()
+    with open(path,encoding="utf-8") as fh:
+        for line in fh:
+            try: link=json.loads(line).get("link")
+            except ValueError: continue
+            if link: out.add(canonical_url(link))
+    return out
+
+def save_watch(name,params,overlap=DELTA_OVERLAP_DAYS,dataset=None,store=None):
+    """
+    Simpan query terjadwal. `params` dari jobs.job_params: start_date = awal backfill pertama,
+    end_date diabaikan (run delta selalu sampai hari ini). Link di dataset yang sudah ada
+    dianggap terlihat sehingga tidak diekstrak/ditambahkan ulang.
+    """
+    store=store or get_watch_store()
+    dataset=dataset or default_dataset(name)
+    store.save(name,params,overlap,dataset)
+    store.add_seen(name,dataset_links(dataset))
+    return store.get(name)
+
+def delta_window(watch,today=None):
+    """(start, end) run berikutnya: watermark+1 − overlap s/d hari ini, tidak sebelum awal backfill."""
+    today=today or date.today()
+    first=date.fromisoformat(watch["params"]["start_date"])
+    if not watch["watermark"]: return first, today
+    start=date.fromisoformat(watch["watermark"])+timedelta(days=1-int(watch["overlap"] or 0))
+    return max(first,start), today
+
+def delta_job_params(watch,today=None,quota_left=None):
+    """
+    (params, plan) job untuk jendela delta, atau None jika tidak ada tanggal baru.
+    Mode auto direncanakan ulang untuk jendela ini; ValueError jika rencana tidak muat di
+    batas request / sisa kuota.
+    """
+    from .planner import plan_auto_optimize, estimate_calls_and_results, calls_allowed
+    start,end=delta_window(watch,today)
+    if start>end: return None
+    p=dict(watch["params"],start_date=start.isoformat(),end_date=end.isoformat())
+    # hari overlap sudah pernah dicari (dan di-cache); tanpa refresh, artikel terlambat tidak pernah terlihat
+    if watch["watermark"]: p["refresh_cache"]=True
+    allowed=calls_allowed(p["max_calls"],quota_left)
+    if p["mode"]=="adaptive":
+        if allowed<=0: raise ValueError("kuota CSE hari ini habis untuk semua key")
+        p["max_calls"]=allowed
+        return p, {"roots":[l for *_,l in daterange_chunks(start,end,"Monthly")]}
+    if p["mode"]=="auto":
+        plan=plan_auto_optimize(start,end,p["target_links"],p["max_calls"],quota_left,p["base_query"])
+        if not plan: raise ValueError("tidak ada rencana yang muat di batas request / sisa kuota harian")
+        p["granularity"],p["per_shard_limit"]=plan[0],plan[1]
+    shards=daterange_chunks(start,end,p["granularity"])
+    est_calls,est_cap=estimate_calls_and_results(len(shards),p["per_shard_limit"])
+    if p["mode"]=="manual" and est_calls>allowed:
+        raise ValueError(f"estimasi {est_calls} call > batas {p['max_calls']} / sisa kuota {quota_left}")
+    return p, {"granularity":p["granularity"],"per_shard_limit":p["per_shard_limit"],"est_calls":est_calls,
+               "est_cap":est_cap,"shards":[l for *_,l in shards]}
+
+def append_dataset(path,rows):
+    os.makedirs(os.path.dirname(path) or ".",exist_ok=True)
+    with open(path,"a",encoding="utf-8") as fh:
+        for row in rows: fh.write(json.dumps(row,ensure_ascii=False)+"\n")
+
+def run_watch(name,api_key,cx,today=None,quota_left=None,progress=noop_progress,on_items=None,on_partial=None,
+              on_article=None,dedup=None,store=None):
+    """
+    Satu run delta → (job_id, baris baru, stats); job_id None jika tidak ada tanggal baru.
+    Job terakhir yang belum selesai (mis. berhenti karena 429) dilanjutkan dulu dari checkpoint.
+    Link yang sudah ada di dataset dibuang saat shard selesai (sebelum ekstraksi; `dedup` yang
+    diberikan ikut di-seed dengan link tersebut); watermark maju hanya setelah job selesai dan barisnya
+    ditambahkan ke dataset, dan hanya sampai tanggal terakhir yang tercari lengkap (stats
+    "complete_until"): rentang yang terlewat karena budget habis dicari lagi di run berikutnya.
+    """
+    from .jobs import create_job, run_job, get_job_store
+    from .urls import DedupSet, canonical_url
+    store=store or get_watch_store()
+    watch=store.get(name)
+    if watch is None: raise KeyError(f"query tersimpan tidak ditemukan: {name}")
+    last=get_job_store().get(watch["last_job"]) if watch["last_job"] else None
+    if last and last["status"]!="done":
+        job_id=last["id"]
+    else:
+        delta=delta_job_params(watch,today,quota_left)
+        if delta is None: return None, [], {}
+        job_id=create_job(*delta)
+        store.set_job(name,job_id)
+    seen=store.seen_urls(name)
+    if dedup is None: dedup=DedupSet(seen)
+    else: dedup.seen|=seen
+    items,stats=run_job(job_id,api_key,cx,progress=progress,on_items=on_items,on_partial=on_partial,
+                        on_article=on_article,dedup=dedup)
+    append_dataset(watch["dataset"],items)
+    store.add_seen(name,[canonical_url(it["link"]) for it in items if it.get("link")])
+    until=date.fromisoformat(stats.get("complete_until") or get_job_store().get(job_id)["params"]["end_date"])
+    if watch["watermark"]: until=max(until,date.fromisoformat(watch["watermark"]))
+    store.advance(name,until)
+    return job_id, items, dict(stats,new_links=len(items))
@@ -0,0 +1,113 @@
+# crawler_engine/yields.py
+# Model yield yang dipelajari dari riwayat crawl: berapa hasil yang benar-benar tersedia per shard
+# untuk (site, kata kunci, granularitas). Dipakai estimator & Auto Optimize sebagai ganti asumsi
+# "setiap shard selalu memberi per_shard_limit hasil".
+
+import os, re, math, time, sqlite3, statistics, threading
+from functools import lru_cache
+
+from .cse import CSE_MAX_RESULTS
+from .util import CACHE_DIR
+
+MIN_OBSERVATIONS = 3   # minimal shard teramati sebelum model dipakai pada satu level
+
+def query_signature(base_query):
+    """(site, terms): site:... dan kata kunci dinormalisasi (lowercase, urut), tanpa operator tanggal."""
+    sites, terms = [], []
+    for tok in (base_query or "").lower().split():
+        if tok.startswith("site:"): sites.append(tok[5:].removeprefix("www."))
+        elif not re.match(r"^(after|before):",tok): terms.append(tok.strip('"'))
+    return " ".join(sorted(sites)), " ".join(sorted(t for t in terms if t))
+
+def granularity_of(days):
+    return "Daily" if days<=1 else "Weekly" if days<=7 else "Monthly"
+
+def pages_for(available,limit):
+    """Call yang dipakai paginate_shard: berhenti di halaman pendek, maksimal ceil(limit/10)."""
+    limit=max(1,min(int(limit),CSE_MAX_RESULTS))
+    if available>=limit: return math.ceil(limit/10)
+    return int(available)//10+1
+
+class YieldModel:
+    """Laju hasil tersedia per hari + rasio link unik (setelah dedup) dari riwayat."""
+    def __init__(self,rate,unique_ratio,n,level):
+        self.rate, self.unique_ratio, self.n, self.level = rate, unique_ratio, n, level
+
+    def available(self,days):
+        return min(CSE_MAX_RESULTS,self.rate*max(1,days))
+
+    def predict_shard(self,days,limit):
+        """(calls, link unik) yang diperkirakan untuk satu shard `days` hari dengan limit `limit`."""
+        avail=min(float(limit),self.available(days))
+        return pages_for(avail,limit), avail*self.unique_ratio
+
+    def __repr__(self):
+        return f"YieldModel(rate={self.rate:.2f}/hari, unik={self.unique_ratio:.2f}, n={self.n}, level={self.level})"
+
+class YieldStore:
+    """
+    Riwayat yield per shard (SQLite, WAL): site, terms, granularitas, rentang, totalResults,
+    hasil yang dikembalikan, limit yang diminta, link unik setelah dedup. Satu baris per
+    (site, terms, rentang) — shard yang dijalankan ulang memperbarui observasinya.
+    """
+    def __init__(self,path):
+        os.makedirs(os.path.dirname(path) or ".",exist_ok=True)
+        self.lock=threading.Lock()
+        self.conn=sqlite3.connect(path,check_same_thread=False,isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS shard_yield(
+            site TEXT, terms TEXT, granularity TEXT, start TEXT, end TEXT, days INTEGER,
+            total_results INTEGER, returned INTEGER, requested INTEGER, pages INTEGER, unique_links INTEGER,
+            observed REAL, PRIMARY KEY(site,terms,start,end))""")
+
+    def record(self,base_query,s,e,total_results,returned,requested,unique_links):
+        site,terms=query_signature(base_query)
+        days=(e-s).days+1
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO shard_yield VALUES(?,?,?,?,?,?,?,?,?,?,?,?)",
+                              (site,terms,granularity_of(days),s.isoformat(),e.isoformat(),days,int(total_results or 0),
+                               returned,requested,pages_for(returned,requested),unique_links,time.time()))
+
+    def _rows(self,where,args):
+        with self.lock:
+            return self.conn.execute(f"""SELECT days,total_results,returned,requested,unique_links
+                FROM shard_yield WHERE {where}""",args).fetchall()
+
+    def model(self,base_query,granularity=None):
+        """
+        YieldModel dari level paling spesifik yang punya ≥ MIN_OBSERVATIONS shard:
+        (site, terms, granularitas) → (site, terms) → (site); None jika belum ada riwayat.
+        """
+        site,terms=query_signature(base_query)
+        levels=[("site=? AND terms=? AND granularity=?",(site,terms,granularity),"query+granularitas"),
+                ("site=? AND terms=?",(site,terms),"query"),
+                ("site=?",(site,),"site")]
+        for where,args,level in levels:
+            if granularity is None and "granularity" in where: continue
+            rows=self._rows(where,args)
+            if len(rows)>=MIN_OBSERVATIONS: return fit_model(rows,level)
+        return None
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM shard_yield").fetchone()[0]
+
+def fit_model(rows,level):
+    """
+    Laju/hari = median atas shard tak jenuh (hasil < limit: ketersediaan pasti). Shard jenuh hanya
+    memberi batas bawah — totalResults CSE biasanya jauh menggelembung — jadi baru dipakai (dengan
+    nilai `returned`) jika shard tak jenuh < MIN_OBSERVATIONS; estimasi condong ke bawah, rencana lebih halus.
+    """
+    exact, lower = [], []
+    for days,total,returned,requested,_ in rows:
+        saturated=returned>=min(requested,CSE_MAX_RESULTS)
+        (lower if saturated else exact).append(returned/max(1,days))
+    rates=exact if len(exact)>=MIN_OBSERVATIONS else exact+lower
+    returned=sum(r[2] for r in rows)
+    unique_ratio=sum(r[4] for r in rows)/returned if returned else 1.0
+    return YieldModel(statistics.median(rates),unique_ratio,len(rows),level)
+
+@lru_cache(maxsize=None)
+def get_yield_store():
+    """Satu instance per proses (bertahan lintas rerun Streamlit)."""
+    return YieldStore(os.path.join(CACHE_DIR,"yield.sqlite3"))
@@ -2,14 +2,30 @@
 # Streamlit – Google CSE ONLY + query splitting + Max Request Guard + Auto Optimize
 # Estimator realtime untuk "Estimasi request" & "Maks hasil terambil"
 # Jalankan: streamlit run google_cse_search_auto_optimize.py
+# Front-end tipis di atas crawler_engine (mesin yang sama dipakai CLI: python -m crawler_engine).
 
-import re, io, json, math, time
+import re, os
+from contextlib import nullcontext
 from datetime import date, timedelta
-from typing import List, Dict, Tuple
-import concurrent.futures as futures
-
-import requests, pandas as pd, streamlit as st
-from bs4 import BeautifulSoup
+from typing import BinaryIO, List, Dict
+
+import pandas as pd, streamlit as st
+
+from crawler_engine import metrics
+from crawler_engine.articles import ARTICLE_MAX_BYTES, PARSE_WORKERS_DEFAULT, get_article_store
+from crawler_engine.batch import parse_weighted, expand_matrix, plan_batch, batch_params
+from crawler_engine.crawl import SHARD_WORKERS_DEFAULT
+from crawler_engine.cse import get_cse_cache
+from crawler_engine.exports import EXPORT_FORMATS, available_formats, export_result
+from crawler_engine.http import CSE_DEFAULT_QPS, HOST_MAX_CONCURRENCY, HOST_DELAY, transfer_summary
+from crawler_engine.jobs import job_params, create_job, run_job, job_results, get_job_store
+from crawler_engine.planner import (estimate_calls_and_results, estimate_with_model, count_cached_calls,
+                                    plan_auto_optimize, calls_allowed)
+from crawler_engine.quota import CSE_DAILY_QUOTA, KeyPool, parse_key_pool
+from crawler_engine.results import RESULT_COLUMNS, ResultStream, write_results
+from crawler_engine.urls import DedupSet
+from crawler_engine.util import daterange_chunks
+from crawler_engine.watches import DELTA_OVERLAP_DAYS, get_watch_store, save_watch, run_watch, delta_window
 
 APP_TITLE = "Media Crawler - ID"
 st.set_page_config(page_title=APP_TITLE, layout="wide")
@@ -17,212 +33,106 @@ st.set_page_config(page_title=APP_TITLE, layout="wide")
 # =========================
 # Helpers
 # =========================
-def clean_text(x: str) -> str:
-    if not x: return ""
-    return re.sub(r"\s+", " ", str(x)).strip()
+PAGE_SIZES = [50, 100, 500]
+LIVE_ROWS = 50   # baris terakhir yang ditampilkan selama ekstraksi berjalan
 
 def to_dataframe(items: List[Dict]) -> pd.DataFrame:
-    cols = ["title","link","snippet","position","shard_label","shard_start","shard_end",
-            "article_title","article_text","article_author","article_published"]
+    cols = list(RESULT_COLUMNS)
     if not items: return pd.DataFrame(columns=cols)
     df = pd.DataFrame(items)
     for c in cols:
         if c not in df: df[c] = ""
     return df[cols].drop_duplicates(subset=["link"]).reset_index(drop=True)
 
-def export_buttons(df: pd.DataFrame, filename_prefix: str):
-    csv = df.to_csv(index=False).encode("utf-8")
-    st.download_button("⬇️ Unduh CSV", csv, f"{filename_prefix}.csv", "text/csv", key="dl_csv")
-    try:
-        import xlsxwriter
-        buf = io.BytesIO()
-        with pd.ExcelWriter(buf, engine="xlsxwriter") as w:
-            df.to_excel(w, index=False, sheet_name="Results")
-        st.download_button("⬇️ Unduh Excel", buf.getvalue(),
-            f"{filename_prefix}.xlsx",
-            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            key="dl_xlsx")
-    except Exception:
-        st.info("Modul xlsxwriter tidak tersedia. Gunakan CSV; atau install xlsxwriter.")
-
-def daterange_chunks(start: date, end: date, granularity: str):
-    chunks=[]
-    if start>end: return chunks
-    if granularity=="Monthly":
-        cur=date(start.year,start.month,1)
-        while cur<=end:
-            nxt=date(cur.year+1,1,1) if cur.month==12 else date(cur.year,cur.month+1,1)
-            chunks.append((max(cur,start),min(nxt-timedelta(days=1),end),cur.strftime("%Y-%m")))
-            cur=nxt
-    elif granularity=="Weekly":
-        cur=start
-        while cur<=end:
-            chunk_end=min(cur+timedelta(days=6),end)
-            chunks.append((cur,chunk_end,f"wk_{cur:%Y-%m-%d}"))
-            cur=chunk_end+timedelta(days=1)
-    else:  # Daily
-        cur=start
-        while cur<=end:
-            chunks.append((cur,cur,f"{cur:%Y-%m-%d}"))
-            cur+=timedelta(days=1)
-    return chunks
+def store_results(items: List[Dict], prefix: str):
+    """Tulis hasil ke file kolumnar; session_state hanya memegang handle (ResultSet)."""
+    st.session_state.results = write_results(items, prefix)
+    st.session_state.filename_prefix = prefix
 
-# =========================
-# Google CSE
-# =========================
-def search_cse(api_key,cx,query,num=10,start=1,gl="id",hl="id"):
-    url="https://www.googleapis.com/customsearch/v1"
-    r=requests.get(url,params={
-        "key":api_key,"cx":cx,"q":query,
-        "num":min(max(num,1),10),"start":max(start,1),
-        "gl":gl,"hl":hl},timeout=25)
-    r.raise_for_status()
-    data=r.json()
-    return [{
-        "title":clean_text(it.get("title")),
-        "link":it.get("link"),
-        "snippet":clean_text(it.get("snippet")),
-        "position":i
-    } for i,it in enumerate(data.get("items",[]),start=start)]
-
-def search_cse_paginated(api_key,cx,query,total,gl="id",hl="id"):
-    total=max(1,min(int(total),100))  # CSE hard cap per query
-    collected, start_idx, remain=[],1,total
-    while remain>0:
-        batch=min(remain,10)
-        items=search_cse(api_key,cx,query,num=batch,start=start_idx,gl=gl,hl=hl)
-        if not items: break
-        collected+=items
-        remain-=len(items); start_idx+=len(items)
-        time.sleep(0.20)
-    return collected
-
-def build_query_with_dates(base,d_start,d_end):
-    # before pakai end+1 agar inklusif
-    return f"{base.strip()} after:{d_start:%Y-%m-%d} before:{(d_end+timedelta(days=1)):%Y-%m-%d}"
+EXPORT_LABELS = {"csv":"⬇️ CSV", "xlsx":"⬇️ Excel", "parquet":"⬇️ Parquet", "jsonl":"⬇️ JSONL", "jsonl.gz":"⬇️ JSONL.gz"}
 
-# =========================
-# Estimator
-# =========================
-def estimate_calls_and_results(n_shards:int, per_shard_limit:int)->Tuple[int,int]:
-    """Return (estimated_calls, estimated_results_cap)."""
-    calls = n_shards * math.ceil(per_shard_limit/10.0)   # 1 call per 10 hasil
-    results_cap = n_shards * per_shard_limit             # batas maksimal hasil (sebelum dedup)
-    return calls, results_cap
-
-def max_per_shard_limit_under_calls(n_shards:int, max_calls:int)->int:
-    """Kembalikan limit per shard maksimum (≤100) yang tidak melampaui max_calls."""
-    if n_shards<=0: return 0
-    k = max_calls // n_shards           # k = max ceil(L/10) yang diperbolehkan
-    if k<=0: return 0
-    return min(100, 10*k)               # L ≤ 10*k dan ≤100
+def open_export(rs, fmt: str, collapse: bool) -> BinaryIO:
+    """File ekspor terbuka — Streamlit membacanya sendiri, tanpa salinan bytes di skrip."""
+    return open(export_result(rs, fmt, collapse=collapse), "rb")
 
-# =========================
-# Article Extraction (optional)
-# =========================
-def extract_article(url):
-    try:
-        from newsfetch.news import Newspaper
-        n=Newspaper(url=url)
-        return {
-            "article_title":clean_text(getattr(n,"headline","") or ""),
-            "article_text":clean_text(getattr(n,"article","") or ""),
-            "article_author":clean_text(", ".join(getattr(n,"authors",[]) or []) or ""),
-            "article_published":clean_text(str(getattr(n,"date_publish","")) or "")
-        }
-    except Exception:
-        pass
-    # Fallback sederhana
-    try:
-        r=requests.get(url,timeout=20,headers={"User-Agent":"Mozilla/5.0"})
-        if r.ok:
-            soup=BeautifulSoup(r.text,"html.parser")
-            paras=" ".join(p.get_text() for p in soup.find_all("p"))
-            return {
-                "article_title":clean_text(soup.title.get_text() if soup.title else ""),
-                "article_text":clean_text(paras),
-                "article_author":"", "article_published":""
-            }
-    except Exception:
-        pass
-    return {"article_title":"","article_text":"","article_author":"","article_published":""}
-
-def enrich_with_articles(items,max_workers=8):
-    out=[]
-    with futures.ThreadPoolExecutor(max_workers=max_workers) as ex:
-        futs={ex.submit(extract_article,it["link"]):it for it in items if it.get("link")}
-        for fut,base in futs.items():
-            try: base.update(fut.result(timeout=60))
-            except Exception: pass
-            out.append(base)
-    return out
+def export_buttons(rs, filename_prefix: str, collapse: bool = False):
+    """Unduhan lazy: file dibuat saat tombol diklik, sekali per versi hasil (di-cache di disk, ditulis per batch)."""
+    formats = available_formats()
+    for col, fmt in zip(st.columns(len(formats)), formats):
+        ext, mime = EXPORT_FORMATS[fmt]
+        col.download_button(EXPORT_LABELS[fmt], lambda fmt=fmt: open_export(rs, fmt, collapse),
+                            f"{filename_prefix}.{ext}", mime, key=f"dl_{fmt}", on_click="ignore")
+    if "xlsx" not in formats:
+        st.caption("Excel butuh modul xlsxwriter; Parquet butuh pyarrow.")
 
 # =========================
 # Progress helper
 # =========================
-def stqdm(iterable,desc="Progress"):
-    total=len(iterable)
-    prog=st.progress(0,text=f"{desc}: 0/{total}")
-    for i,val in enumerate(iterable,1):
-        prog.progress(i/total,text=f"{desc}: {i}/{total}")
-        yield val
-    prog.empty()
-
-# =========================
-# Auto Optimize
-# =========================
-def plan_auto_optimize(start_date:date, end_date:date, target_links:int, max_calls:int):
-    """
-    Cari kombinasi paling hemat:
-      - Coba granularity: Monthly → Weekly → Daily
-      - Hitung jumlah shard & limit per shard maksimum yang muat di max_calls
-      - Pilih limit minimal yang cukup untuk capai target
-    Return: (granularity, per_shard_limit, n_shards, est_calls, est_results_cap) atau None
-    """
-    for gran in ["Monthly","Weekly","Daily"]:
-        shards = daterange_chunks(start_date, end_date, gran)
-        n_shards = len(shards)
-        Lmax = max_per_shard_limit_under_calls(n_shards, max_calls)
-        if Lmax <= 0:
-            continue
-        L_needed = math.ceil(max(1, target_links) / max(1, n_shards))
-        L = min(Lmax, max(10, L_needed))         # minimal cukup, ≥10, ≤Lmax
-        est_calls, est_cap = estimate_calls_and_results(n_shards, L)
-        if est_calls <= max_calls and est_cap >= target_links:
-            return gran, L, n_shards, est_calls, est_cap
-    # fallback: pilih skema dengan est_cap terbesar tanpa > max_calls
-    best = None
-    for gran in ["Monthly","Weekly","Daily"]:
-        shards = daterange_chunks(start_date, end_date, gran)
-        n_shards = len(shards)
-        Lmax = max_per_shard_limit_under_calls(n_shards, max_calls)
-        if Lmax <= 0: continue
-        est_calls, est_cap = estimate_calls_and_results(n_shards, Lmax)
-        cand = (gran, Lmax, n_shards, est_calls, est_cap)
-        if (best is None) or (cand[4] > best[4]):
-            best = cand
-    return best
-
-def run_split_search(api_key,cx,base_query,start_date,end_date,granularity,per_shard_limit,gl,hl, extract=False, max_workers=8):
-    shards = daterange_chunks(start_date, end_date, granularity)
-    all_items=[]
-    for (s,e,label) in stqdm(shards,"Memproses shard"):
-        q=build_query_with_dates(base_query,s,e)
-        items=search_cse_paginated(api_key,cx,q,total=per_shard_limit,gl=gl,hl=hl)
-        for it in items:
-            it.update({"shard_label":label,"shard_start":s.isoformat(),"shard_end":e.isoformat()})
-        all_items+=items
-    if extract and all_items:
-        st.write("📥 Mengekstrak isi artikel…")
-        all_items = enrich_with_articles(all_items, max_workers=max_workers)
-    return all_items
+class StProgress:
+    """Callback progress engine → satu st.progress per tahap (hilang saat tahap selesai)."""
+    def __init__(self):
+        self.bars={}
+
+    def __call__(self,desc,done,total,detail=""):
+        if desc not in self.bars: self.bars[desc]=st.progress(0,text=desc)
+        text=f"{desc}: {done}/{total}"+(f" · {detail}" if detail else "")
+        self.bars[desc].progress(min(1.0,done/max(total,1)),text=text)
+        if total and done>=total: self.bars[desc].empty()
+
+def metrics_scope():
+    """Metrik run sesi ini masuk ke registry milik sesi (run sesi lain tidak ikut tercatat)."""
+    return metrics.collecting(st.session_state.metrics_registry) if st.session_state.get("metrics_on") else nullcontext()
+
+def run_callbacks(sink: ResultStream):
+    """progress + ekor tabel parsial live + seen-set dedup; shard & artikel langsung di-stream ke file hasil."""
+    st.session_state.dedup=DedupSet()
+    live=st.empty()
+    def show_partial(rows):
+        with live.container():
+            st.caption(f"{len(rows)} artikel selesai — {min(len(rows),LIVE_ROWS)} terakhir:")
+            st.dataframe(to_dataframe(rows[-LIVE_ROWS:]), use_container_width=True)
+    return dict(progress=StProgress(), on_partial=show_partial, dedup=st.session_state.dedup,
+                on_items=sink.on_items, on_article=sink.on_article)
+
+def job_prefix(params: Dict) -> str:
+    safe = re.sub(r"\W+","_", f"{params['base_query']}_{params['start_date']}_{params['end_date']}".lower())
+    return f"google_cse_{params['mode']}_{safe}"
+
+def show_job_results(job_id: str):
+    """Muat hasil yang sudah tercatat untuk job (tanpa request) ke session_state."""
+    st.session_state.dedup = DedupSet()
+    items = job_results(job_id, dedup=st.session_state.dedup)
+    st.session_state.job_id = job_id
+    store_results(items, job_prefix(get_job_store().get(job_id)["params"]))
+
+def execute_job(job_id: str):
+    """Jalankan/lanjutkan job; jika berhenti di tengah (mis. 429), tampilkan hasil yang sudah tercatat."""
+    st.session_state.job_id = job_id
+    st.caption(f"Job **{job_id}** — checkpoint tersimpan per halaman/shard/artikel.")
+    params = get_job_store().get(job_id)["params"]
+    sink = ResultStream(job_prefix(params))
+    try:
+        with metrics_scope():
+            items, stats = run_job(job_id, pool, pool.cx, **run_callbacks(sink))
+    except Exception as e:
+        sink.abort()
+        st.error(f"Job {job_id} berhenti: {e}. Klik **▶️ Lanjutkan** untuk melanjutkan dari checkpoint terakhir.")
+        show_job_results(job_id)
+        return None
+    st.session_state.results = sink.finish(params["extract"])
+    st.session_state.filename_prefix = job_prefix(params)
+    st.session_state.transfer = stats.get("transfer")
+    return stats
 
 # =========================
 # Session State
 # =========================
-if "results_df" not in st.session_state: st.session_state.results_df=pd.DataFrame()
-if "raw_items" not in st.session_state: st.session_state.raw_items=[]
+if "results" not in st.session_state: st.session_state.results=None   # ResultSet (file hasil di disk)
 if "filename_prefix" not in st.session_state: st.session_state.filename_prefix="google_cse_results"
+if "transfer" not in st.session_state: st.session_state.transfer=None   # byte transfer run terakhir
+if "dedup" not in st.session_state: st.session_state.dedup=DedupSet()
+if "metrics_registry" not in st.session_state: st.session_state.metrics_registry=metrics.Registry()
+if "job_id" not in st.session_state: st.session_state.job_id=st.query_params.get("job","")
 
 # =========================
 # UI — Realtime estimator (di luar form)
@@ -252,23 +162,111 @@ with st.sidebar:
     target_links = st.number_input("Target jumlah link", min_value=1, value=1000)
 
     extract_articles = st.checkbox("Ekstrak isi artikel (news-fetch)", value=False)
-    max_workers = st.slider("Thread ekstraksi", 1, 16, 8)
+    colw1,colw2 = st.columns(2)
+    with colw1:
+        max_workers = st.slider("Thread fetch", 1, 32, 8, help="Worker I/O pengunduh halaman artikel.")
+    with colw2:
+        parse_workers = st.slider("Proses parser", 0, os.cpu_count() or 1, PARSE_WORKERS_DEFAULT,
+                                  help="Worker proses untuk parsing HTML (CPU). 0 = parse di thread fetch.")
+    colh1,colh2 = st.columns(2)
+    with colh1:
+        per_host = st.slider("Koneksi/host", 1, 8, HOST_MAX_CONCURRENCY,
+                             help="Maksimum request simultan ke satu domain berita.")
+    with colh2:
+        host_delay = st.number_input("Jeda/host (detik)", min_value=0.0, max_value=10.0, value=HOST_DELAY, step=0.1)
+    max_article_kb = st.number_input("Batas unduh/artikel (KB)", min_value=0, value=ARTICLE_MAX_BYTES//1024, step=256,
+                                     help="Body artikel dipotong di batas ini (0 = tanpa batas). Respons bukan HTML tidak diunduh.")
+
+    colp1,colp2 = st.columns(2)
+    with colp1:
+        shard_workers = st.slider("Shard paralel", 1, 16, SHARD_WORKERS_DEFAULT)
+    with colp2:
+        qps = st.number_input("QPS CSE (global)", min_value=0.5, max_value=50.0, value=CSE_DEFAULT_QPS, step=0.5,
+                              help="Batas request CSE per detik untuk semua shard paralel (token bucket).")
 
     api_key = st.text_input("CSE API Key", type="password")
     cx = st.text_input("CSE cx", type="password")
+    key_pool_text = st.text_area("Pool key tambahan", height=68,
+                                 help="Satu per baris: `api_key cx [kuota_harian]`. Tiap call memakai key dengan sisa kuota terbanyak.")
+    daily_quota = st.number_input("Kuota harian/key", min_value=0, value=CSE_DAILY_QUOTA or 0,
+                                  help="Batas call CSE per key per hari (reset tengah malam waktu Pasifik). "
+                                       "0 = tanpa batas (key berbayar); isi 100 untuk key gratis.")
+    creds = ([(api_key, cx)] if api_key and cx else []) + parse_key_pool(key_pool_text)
+    pool = KeyPool(creds, daily_quota or None) if creds else None
+    quota_left = pool.remaining() if pool else None
+    calls_cap = calls_allowed(max_calls, quota_left)
+
+    extract_opts = dict(max_workers=max_workers, per_host=per_host, delay=host_delay, parse_workers=parse_workers,
+                        max_bytes=int(max_article_kb)*1024)
 
     # Estimator realtime
     shards_preview = daterange_chunks(start_date, end_date, granularity)
-    est_calls_manual, est_results_cap_manual = estimate_calls_and_results(len(shards_preview), per_shard_limit) if shards_preview else (0,0)
+    cached_manual = count_cached_calls(pool.cx if pool else cx, base_query, shards_preview, per_shard_limit, gl, hl) if (shards_preview and base_query) else 0
+    est_calls_manual, est_results_cap_manual = estimate_calls_and_results(len(shards_preview), per_shard_limit, cached_manual) if shards_preview else (0,0)
 
     m1,m2,m3 = st.columns(3)
     m1.metric("Jumlah shard", len(shards_preview))
-    m2.metric("Estimasi request", est_calls_manual)
+    m2.metric("Estimasi request", est_calls_manual, help=f"{cached_manual} call akan dilayani cache")
     m3.metric("Maks hasil terambil", est_results_cap_manual)
+    model_est = estimate_with_model(start_date, end_date, granularity, per_shard_limit, base_query, cached_manual) if (shards_preview and base_query) else None
+    if model_est:
+        model_calls, model_links, model = model_est
+        st.caption(f"Model yield ({model.level}, {model.n} shard teramati, ± {model.rate:.1f} hasil/hari): "
+                   f"perkiraan **{model_calls}** request → **{model_links}** link unik.")
+
+    c1,c2,c3 = st.columns(3)
+    c1.metric("Cache hit", get_cse_cache().hits)
+    c2.metric("Cache miss", get_cse_cache().misses)
+    c3.metric("Sisa kuota", "-" if quota_left is None else quota_left,
+              help="Sisa call CSE hari ini di semua key pool (\"-\" = tanpa batas kuota).")
+    if pool and len(pool.creds)>1:
+        with st.expander("Kuota per key"):
+            st.dataframe(pd.DataFrame(pool.status()), use_container_width=True)
+
+    if metrics.FORCED:
+        st.session_state.metrics_on = True
+        st.checkbox("📊 Instrumentasi", value=True, disabled=True,
+                    help="Aktif untuk seluruh proses lewat CRAWLER_METRICS.")
+    else:
+        st.checkbox("📊 Instrumentasi", key="metrics_on",
+                    help="Catat timer fase, latensi per domain, byte, retry & cache hit selama run sesi ini (panel Metrik).")
 
     # Tombol eksekusi
     submitted = st.button("Jalankan (Manual)")
     auto_btn  = st.button("🚀 Auto Optimize")
+    adaptive_btn = st.button("🧬 Adaptive (bisection)",
+                             help="Mulai Monthly, belah shard yang jenuh (100 hasil) sampai harian; pakai Max Request Calls & Target link.")
+
+    with st.expander("📦 Batch kata kunci × site"):
+        batch_kw = st.text_area("Kata kunci (1 per baris, opsional '| bobot')", value="",
+                                help="Contoh: `AI | 2` — bobot lebih besar mendapat porsi budget lebih besar.")
+        batch_sites = st.text_area("Site (1 per baris, opsional '| bobot')", value="", help="Contoh: `kompas.com`")
+        batch_auto = st.checkbox("Rencana per query otomatis", value=True,
+                                 help="Jika mati: granularitas & hasil/shard di atas dipakai untuk semua query.")
+        batch_queries = expand_matrix(parse_weighted(batch_kw), parse_weighted(batch_sites))
+        st.caption(f"{len(batch_queries)} query · satu antrian shard, budget Max Request Calls & dedup bersama.")
+        batch_btn = st.button("📦 Jalankan batch", disabled=not batch_queries)
+
+    # Job tersimpan: lampirkan (lihat hasil tercatat) atau lanjutkan dari checkpoint
+    st.subheader("Job")
+    job_id_input = st.text_input("Job ID", value=st.session_state.job_id,
+                                 help="Job yang sedang/sudah berjalan (juga dari CLI). Rencana & parameter ikut tersimpan.")
+    colj1,colj2 = st.columns(2)
+    attach_btn = colj1.button("📎 Lampirkan")
+    resume_btn = colj2.button("▶️ Lanjutkan", help="Hanya mengulang halaman/shard/artikel yang belum tercatat. Butuh API key & CX (atau pool).")
+
+    # Query tersimpan: crawl delta setelah watermark, baris baru ditambahkan ke dataset
+    st.subheader("Query tersimpan")
+    with st.expander("💾 Simpan parameter saat ini"):
+        watch_name = st.text_input("Nama", value=re.sub(r"\W+","_",base_query.lower()).strip("_"))
+        watch_mode = st.selectbox("Mode delta", ["auto","adaptive","manual"],
+                                  help="manual memakai granularitas & hasil/shard di atas; auto direncanakan ulang tiap run.")
+        watch_overlap = st.number_input("Overlap (hari)", 0, 30, DELTA_OVERLAP_DAYS,
+                                        help="Hari sebelum watermark yang dicari ulang untuk artikel yang terlambat terindeks.")
+        save_watch_btn = st.button("💾 Simpan query", help="Run pertama mulai dari tanggal Mulai; berikutnya hanya tanggal baru.")
+    watches = get_watch_store().all()
+    watch_sel = st.selectbox("Query", [w["name"] for w in watches]) if watches else None
+    delta_btn = st.button("🔁 Jalankan delta", disabled=not watches)
 
 st.markdown("""
 **Tips:** Atur **granularitas** agar efektif. Gunakan **Monthly** dulu (paling hemat request). Jika hasil kurang, turunkan ke **Weekly** atau **Daily**.
@@ -276,47 +274,214 @@ st.markdown("""
 
 # ========== Eksekusi Manual ==========
 if submitted:
-    if not base_query or not api_key or not cx:
-        st.error("Isi **kata kunci, API key, dan CX** terlebih dahulu.")
+    if not base_query or not pool:
+        st.error("Isi **kata kunci, API key, dan CX** (atau pool key) terlebih dahulu.")
     elif start_date > end_date:
         st.error("Tanggal mulai tidak boleh melebihi tanggal selesai.")
     else:
-        est_calls, _ = estimate_calls_and_results(len(shards_preview), per_shard_limit)
-        if est_calls > max_calls:
-            st.error(f"Estimasi {est_calls} call > batas {max_calls}. Kurangi rentang, naikkan granularitas, atau kecilkan hasil/shard.")
+        est_calls, _ = estimate_calls_and_results(len(shards_preview), per_shard_limit, cached_manual)
+        if est_calls > calls_cap:
+            st.error(f"Estimasi {est_calls} call > batas {calls_cap} (Max Request {max_calls}, sisa kuota {quota_left}). "
+                     "Kurangi rentang, naikkan granularitas, kecilkan hasil/shard, atau tambah key.")
         else:
-            items = run_split_search(api_key,cx,base_query,start_date,end_date,granularity,per_shard_limit,gl,hl, extract_articles, max_workers)
-            df = to_dataframe(items)
-            st.session_state.results_df, st.session_state.raw_items = df, items
-            safe = re.sub(r"\W+","_", f"{base_query}_{start_date}_{end_date}".lower())
-            st.session_state.filename_prefix = f"google_cse_manual_{safe}"
+            params = job_params("manual", base_query, start_date, end_date, gl, hl, granularity, per_shard_limit,
+                                max_calls, target_links, extract_articles, extract_opts, shard_workers, qps)
+            execute_job(create_job(params, {"granularity":granularity,"per_shard_limit":per_shard_limit,
+                                            "est_calls":est_calls,"shards":[l for *_,l in shards_preview]}))
 
 # ========== Eksekusi Auto Optimize ==========
 if auto_btn:
-    if not base_query or not api_key or not cx:
-        st.error("Isi **kata kunci, API key, dan CX** terlebih dahulu.")
+    if not base_query or not pool:
+        st.error("Isi **kata kunci, API key, dan CX** (atau pool key) terlebih dahulu.")
     elif start_date > end_date:
         st.error("Tanggal mulai tidak boleh melebihi tanggal selesai.")
     else:
-        plan = plan_auto_optimize(start_date, end_date, target_links, max_calls)
+        plan = plan_auto_optimize(start_date, end_date, target_links, max_calls, quota_left, base_query)
         if not plan:
-            st.error("Tidak ada rencana yang muat di batas request (max_calls terlalu kecil).")
+            st.error("Tidak ada rencana yang muat di batas request / sisa kuota harian pool.")
         else:
             gran_opt, L_opt, n_shards, est_calls, est_cap = plan
+            if calls_cap < max_calls:
+                st.warning(f"Rencana diperkecil ke sisa kuota hari ini ({quota_left} call).")
             st.info(f"Rencana: **{gran_opt}** | hasil/shard **{L_opt}** | shard **{n_shards}** | "
-                    f"estimasi request **{est_calls}** | estimasi maksimal hasil **{est_cap}**")
-            items = run_split_search(api_key,cx,base_query,start_date,end_date,gran_opt,L_opt,gl,hl, extract_articles, max_workers)
-            df = to_dataframe(items)
-            st.session_state.results_df, st.session_state.raw_items = df, items
-            safe = re.sub(r"\W+","_", f"{base_query}_{start_date}_{end_date}".lower())
-            st.session_state.filename_prefix = f"google_cse_auto_{safe}"
+                    f"estimasi request **{est_calls}** | estimasi hasil **{est_cap}**")
+            params = job_params("auto", base_query, start_date, end_date, gl, hl, gran_opt, L_opt,
+                                max_calls, target_links, extract_articles, extract_opts, shard_workers, qps)
+            execute_job(create_job(params, {"granularity":gran_opt,"per_shard_limit":L_opt,"n_shards":n_shards,
+                                            "est_calls":est_calls,"est_cap":est_cap}))
+
+# ========== Eksekusi Adaptive ==========
+if adaptive_btn:
+    if not base_query or not pool:
+        st.error("Isi **kata kunci, API key, dan CX** (atau pool key) terlebih dahulu.")
+    elif start_date > end_date:
+        st.error("Tanggal mulai tidak boleh melebihi tanggal selesai.")
+    elif calls_cap <= 0:
+        st.error("Kuota CSE hari ini habis untuk semua key di pool.")
+    else:
+        params = job_params("adaptive", base_query, start_date, end_date, gl, hl, None, None,
+                            calls_cap, target_links, extract_articles, extract_opts, shard_workers, qps)
+        stats = execute_job(create_job(params, {"roots":[l for *_,l in daterange_chunks(start_date,end_date,"Monthly")]}))
+        if stats:
+            skipped = f", {stats['skipped_shards']} belum kebagian budget — lanjutkan job" if stats["skipped_shards"] else ""
+            st.info(f"Adaptive: **{stats['shards']}** shard ({stats['splits']} dibelah{skipped}) | request **{stats['calls']}** | "
+                    f"link unik **{stats['unique_links']}**")
+
+# ========== Eksekusi Batch ==========
+if batch_btn:
+    if not pool:
+        st.error("Isi **API key dan CX** (atau pool key) terlebih dahulu.")
+    elif start_date > end_date:
+        st.error("Tanggal mulai tidak boleh melebihi tanggal selesai.")
+    elif calls_cap <= 0:
+        st.error("Kuota CSE hari ini habis untuk semua key di pool.")
+    else:
+        planned = plan_batch(batch_queries, start_date, end_date, calls_cap, target_links,
+                             None if batch_auto else granularity, None if batch_auto else per_shard_limit)
+        params = batch_params(planned, start_date, end_date, gl, hl, calls_cap, target_links,
+                              extract_articles, extract_opts, shard_workers, qps)
+        coarse = [q["query"] for q in planned if q.get("coarse")]
+        if coarse:
+            st.warning(f"{len(coarse)} query mendapat rencana kasar (Monthly, 1 halaman/shard) karena porsi budget-nya "
+                       f"terlalu kecil untuk target: " + ", ".join(coarse[:10]) + (" …" if len(coarse) > 10 else ""))
+        stats = execute_job(create_job(params, {"queries":[(q["query"],q["granularity"],q["per_shard_limit"]) for q in planned]}))
+        if stats:
+            st.info(f"Batch: **{len(planned)}** query | request **{stats['calls']}** | shard **{stats['shards']}** "
+                    f"({stats['skipped_shards']} belum kebagian budget — lanjutkan job) | link unik **{stats['unique_links']}** "
+                    f"| duplikat lintas query **{stats['duplicates']}**")
+            st.dataframe(pd.DataFrame(stats["queries"]), use_container_width=True)
+
+# ========== Job: lampirkan / lanjutkan ==========
+if attach_btn or resume_btn:
+    job = get_job_store().get(job_id_input.strip()) if job_id_input.strip() else None
+    if not job:
+        st.error("Job ID tidak ditemukan.")
+    elif resume_btn and not pool:
+        st.error("Isi **API key dan CX** (atau pool key) untuk melanjutkan job.")
+    elif resume_btn:
+        stats = execute_job(job["id"])
+        if stats: st.info(f"Job {job['id']} selesai: { {k:v for k,v in stats.items() if k!='transfer'} }")
+    else:
+        show_job_results(job["id"])
+
+# ========== Query tersimpan / delta ==========
+if save_watch_btn:
+    if not base_query or not watch_name:
+        st.error("Isi **kata kunci** dan **nama** query.")
+    else:
+        manual = watch_mode=="manual"
+        params = job_params(watch_mode, base_query, start_date, start_date, gl, hl,
+                            granularity if manual else None, per_shard_limit if manual else None,
+                            max_calls, target_links, extract_articles, extract_opts, shard_workers, qps)
+        w = save_watch(watch_name, params, watch_overlap)
+        st.success(f"Query **{w['name']}** tersimpan → `{w['dataset']}` ({w['links']} link sudah ada di dataset).")
+        st.rerun()
+
+if delta_btn and watch_sel:
+    if not pool:
+        st.error("Isi **API key dan CX** (atau pool key) untuk menjalankan delta.")
+    else:
+        s_, e_ = delta_window(get_watch_store().get(watch_sel))
+        st.caption(f"Delta **{watch_sel}**: {s_} … {e_}")
+        sink = ResultStream(f"delta_{watch_sel}_{e_}")
+        try:
+            with metrics_scope():
+                job_id, rows, stats = run_watch(watch_sel, pool, pool.cx, quota_left=quota_left, **run_callbacks(sink))
+        except Exception as e:
+            sink.abort()
+            st.error(f"Delta {watch_sel} berhenti: {e}. Run berikutnya melanjutkan job terakhir dari checkpoint.")
+        else:
+            if job_id is None:
+                sink.abort()
+                st.info("Tidak ada tanggal baru sejak watermark.")
+            else:
+                st.session_state.job_id = job_id
+                st.session_state.results = sink.finish(get_job_store().get(job_id)["params"]["extract"])
+                st.session_state.filename_prefix = f"delta_{watch_sel}_{e_}"
+                st.session_state.transfer = stats.get("transfer")
+                st.info(f"Delta {watch_sel}: **{len(rows)}** link baru ditambahkan ke dataset "
+                        f"({stats.get('duplicates',0)} duplikat/sudah ada dilewati).")
+
+if st.session_state.job_id:
+    st.query_params["job"] = st.session_state.job_id
+    job = get_job_store().get(st.session_state.job_id)
+    if job:
+        st.caption(f"Job **{job['id']}** ({job['params']['mode']}) — status **{job['status']}** · "
+                   f"shard {job['shards_done']} · halaman {job['pages']} · artikel {job['articles']}"
+                   + (f" · error: {job['error']}" if job["error"] else ""))
 
 # ========== Render hasil ==========
-if not st.session_state.results_df.empty:
-    df = st.session_state.results_df
-    items = st.session_state.raw_items
-    st.success(f"Ditemukan {len(df)} link unik dari {len(items)} total hasil (sebelum deduplikasi).")
-    st.dataframe(df, use_container_width=True)
-    export_buttons(df, st.session_state.filename_prefix)
+rs = st.session_state.results
+if rs is not None and len(rs):
+    dd = st.session_state.dedup.totals()
+    st.success(f"Ditemukan {len(rs)} link unik dari {dd['raw'] or len(rs)} total hasil "
+               f"({dd['dup']} duplikat URL dibuang saat crawl, sebelum ekstraksi).")
+    with st.expander("Duplikat per shard"):
+        st.dataframe(pd.DataFrame([{"shard":k,"hasil":v["raw"],"duplikat":v["dup"],
+                                    "redundan":round(v["dup"]/v["raw"],2) if v["raw"] else 0.0}
+                                   for k,v in st.session_state.dedup.shard_stats.items()]),
+                     use_container_width=True)
+    st.caption(f"Cache CSE — hit {get_cse_cache().hits} · miss {get_cse_cache().misses}")
+    if st.session_state.transfer:
+        st.caption(f"Transfer run terakhir — {transfer_summary(st.session_state.transfer)}")
+    if get_article_store().stats:
+        a=get_article_store().stats
+        st.caption(f"Artikel — dari store {a['fresh']} · 304 {a['not_modified']} · konten sama {a['unchanged']} · di-parse {a['parsed']}")
+    # Tabel per halaman: hanya row group yang tercakup yang dibaca dari disk
+    pc1, pc2, pc3 = st.columns([1,1,3])
+    page_size = pc1.selectbox("Baris/halaman", PAGE_SIZES)
+    n_pages = max(1, -(-len(rs)//page_size))
+    page = pc2.number_input(f"Halaman (1–{n_pages})", 1, n_pages, 1)
+    offset = (page-1)*page_size
+    pc3.caption(f"Baris {offset+1}–{min(offset+page_size,len(rs))} dari {len(rs)} · "
+                f"`{rs.path}` ({rs.size/2**20:.1f} MB)")
+    st.dataframe(rs.page(offset, page_size), use_container_width=True)
+    if st.toggle("JSON mentah halaman ini", value=False):
+        st.json(rs.records(offset, page_size), expanded=False)
+    canonical = rs.column("dup_canonical")
+    collapse = False
+    if (canonical==False).any():
+        clusters = rs.column("dup_cluster")
+        n_clusters = clusters[canonical==True].nunique()
+        st.caption(f"Near-duplicate: {int((canonical==False).sum())} artikel sindikasi dalam {n_clusters} cluster.")
+        collapse = st.checkbox("Ekspor 1 baris per cluster near-duplicate", value=False)
+    export_buttons(rs, st.session_state.filename_prefix, collapse)
 else:
-    st.info("Atur parameter di sidebar lalu klik **Jalankan (Manual)** atau **🚀 Auto Optimize**.")
+    st.info("Atur parameter di sidebar lalu klik **Jalankan (Manual)** atau **🚀 Auto Optimize**, "
+            "atau lampirkan **Job ID** yang sudah ada.")
+
+if st.session_state.get("metrics_on"):
+    with st.expander("📊 Metrik"):
+        snap = metrics.snapshot(st.session_state.metrics_registry)
+        byte_kinds = snap["counters"].get("bytes", {})
+        k1,k2,k3,k4 = st.columns(4)
+        k1.metric("MB terunduh", round(sum(byte_kinds.values())/2**20, 2),
+                  help=" · ".join(f"{k}: {v/2**20:.2f} MB" for k,v in byte_kinds.items()))
+        k2.metric("Retry CSE", sum(snap["counters"].get("cse_retries", {}).values()))
+        cache_src = snap["counters"].get("cse_cache", {})
+        k3.metric("Halaman dari cache", cache_src.get("result=hit", 0)+cache_src.get("result=checkpoint", 0))
+        k4.metric("Halaman dari API", cache_src.get("result=miss", 0))
+        st.markdown("**Timer fase**")
+        st.dataframe(pd.DataFrame(snap["phases"]), use_container_width=True)
+        if snap["domains"]:
+            st.markdown("**Latensi fetch per domain** (p50/p95 = batas atas bucket)")
+            st.dataframe(pd.DataFrame(snap["domains"]).sort_values("p95_s", ascending=False), use_container_width=True)
+        st.json(snap["counters"], expanded=False)
+        cm1,cm2 = st.columns(2)
+        cm1.download_button("⬇️ Prometheus (.prom)", metrics.render_prometheus(st.session_state.metrics_registry),
+                            "crawler_metrics.prom", "text/plain")
+        if cm2.button("Reset metrik"):
+            st.session_state.metrics_registry.reset(); st.rerun()
+
+if watches:
+    with st.expander("Query tersimpan"):
+        st.dataframe(pd.DataFrame([{"nama":w["name"],"mode":w["params"]["mode"],"query":w["params"]["base_query"],
+                                    "watermark":w["watermark"] or "-","overlap":w["overlap"],"link":w["links"],
+                                    "dataset":w["dataset"]} for w in watches]), use_container_width=True)
+
+with st.expander("Job terakhir"):
+    st.dataframe(pd.DataFrame([{"job":j["id"],"status":j["status"],"mode":j["params"]["mode"],
+                                "query":j["params"]["base_query"],
+                                "rentang":f"{j['params']['start_date']}..{j['params']['end_date']}",
+                                "shard":j["shards_done"],"halaman":j["pages"],"artikel":j["articles"]}
+                               for j in get_job_store().recent()]), use_container_width=True)
@@ -0,0 +1,53 @@
+# pages/cari_artikel.py
+# Halaman Streamlit "Cari artikel": pencarian full-text atas artikel yang sudah diekstrak
+# (indeks FTS5 di crawler_engine.search, diisi otomatis saat ekstraksi berjalan).
+# Muncul sebagai halaman kedua saat menjalankan: streamlit run crawler_extract_berita.py
+
+import time
+from datetime import date
+
+import pandas as pd, streamlit as st
+
+from crawler_engine.search import COUNT_CAP, get_search_index
+
+PAGE_SIZE = 20
+
+st.set_page_config(page_title="Cari artikel", layout="wide")
+st.title("🔎 Cari artikel")
+
+index = get_search_index()
+stats = index.stats()
+if not stats["docs"]:
+    st.info("Indeks masih kosong. Jalankan crawl dengan **Ekstrak isi artikel**, atau impor dataset JSONL: "
+            "`python -m crawler_engine index import hasil.jsonl`.")
+    st.stop()
+st.caption(f"{stats['docs']:,} artikel terindeks · {stats['first_day'] or '-'} … {stats['last_day'] or '-'} · "
+           "kata = AND, \"frasa\", OR, -kecuali, awalan* (stemming Bahasa Indonesia).")
+
+text = st.text_input("Kata kunci", placeholder='mis. banjir jakarta -politik')
+c1,c2,c3,c4 = st.columns([2,2,1,1])
+domains = [d for d,_ in index.facets("domain")]
+queries = [q for q,_ in index.facets("query")]
+domain = c1.selectbox("Domain", ["(semua)"]+domains)
+query = c2.selectbox("Query asal", ["(semua)"]+queries)
+first = date.fromisoformat(stats["first_day"]) if stats["first_day"] else None
+last = date.fromisoformat(stats["last_day"]) if stats["last_day"] else None
+date_from = c3.date_input("Dari", value=first)
+date_to = c4.date_input("Sampai", value=last)
+
+if text.strip():
+    filters = dict(domain=None if domain=="(semua)" else domain, query=None if query=="(semua)" else query,
+                   date_from=date_from, date_to=date_to)
+    t0 = time.perf_counter()
+    total = index.count(text, **filters)
+    pages = max(1, -(-total//PAGE_SIZE))
+    page = st.number_input("Halaman", 1, pages, 1) if pages>1 else 1
+    hits = index.search(text, limit=PAGE_SIZE, offset=(page-1)*PAGE_SIZE, **filters)
+    st.caption(f"{total:,}{'+' if total>=COUNT_CAP else ''} hasil · {(time.perf_counter()-t0)*1000:.0f} ms")
+    for h in hits:
+        st.markdown(f"**[{h['title'] or h['link']}]({h['link']})**  \n"
+                    f"`{h['domain']}` · {h['day'] or '-'} · skor {h['score']:.2f}"
+                    + (f" · query: _{h['query']}_" if h["query"] else "") + f"  \n{h['snippet']}")
+    if hits:
+        with st.expander("Tabel hasil halaman ini"):
+            st.dataframe(pd.DataFrame(hits).drop(columns=["snippet"]), use_container_width=True)
@@ -0,0 +1,29 @@
+# tests/conftest.py
+# Store persisten (cache CSE, job, kuota, watch) ke direktori sementara sebelum crawler_engine di-import,
+# plus server CSE tiruan (bench.servers.MockCSE) untuk test yang butuh HTTP.
+
+import os, tempfile
+
+os.environ["CRAWLER_CACHE_DIR"]=tempfile.mkdtemp(prefix="crawler-test-")
+os.environ.setdefault("CRAWLER_SEARCH_INDEX","0")
+
+import pytest
+
+@pytest.fixture
+def mock_cse(monkeypatch):
+    """MockCSE tanpa latensi: 5 artikel/hari/query (Monthly > 100 hasil → adaptif membelah)."""
+    import crawler_engine.cse as cse
+    from bench.servers import MockCSE
+    mock=MockCSE(rate_per_day=5,latency=0.0).start()
+    monkeypatch.setattr(cse,"CSE_URL",mock.url)
+    monkeypatch.setattr(cse,"CSE_RETRY_BACKOFF",0.01)
+    cache=cse.get_cse_cache()
+    with cache.lock: cache.conn.execute("DELETE FROM cse_cache")
+    yield mock
+    mock.stop()
+
+@pytest.fixture
+def pool(tmp_path):
+    """KeyPool satu key tanpa batas kuota dengan ledger terpisah per test."""
+    from crawler_engine.quota import KeyPool, QuotaLedger
+    return KeyPool([("test-key","test-cx")],None,ledger=QuotaLedger(str(tmp_path/"quota.sqlite3")))
@@ -0,0 +1,39 @@
+# tests/test_articles.py
+# Body artikel streaming: berhenti awal setelah <article> berita utama, bukan kartu teaser sebelumnya.
+
+from bench.servers import FakeNewsSites
+from crawler_engine.article_parser import parse_article_html
+from crawler_engine.articles import EARLY_STOP_MIN_TEXT, paragraph_chars, read_body
+
+class Streamed:
+    """Respons tiruan: iter_content memotong body per `n` byte seperti requests."""
+    def __init__(self,body):
+        self.body=body
+
+    def iter_content(self,n):
+        for i in range(0,len(self.body),n): yield self.body[i:i+n]
+
+def fixture_page():
+    return FakeNewsSites(hosts=1).page("/read/2024/06/01/3/berita-20240601-3")
+
+def test_fixture_has_large_teaser_article_before_story():
+    html=fixture_page()
+    start=html.index(b'<article class="terkini"')
+    teaser=html[start:html.index(b"</article>",start)+len(b"</article>")]
+    assert len(teaser)>2048 and paragraph_chars(teaser)<EARLY_STOP_MIN_TEXT
+    assert html.index(b"<article><h1>")>start
+
+def test_early_stop_skips_teaser_and_keeps_story():
+    html=fixture_page()
+    body,cut=read_body(Streamed(html),max_bytes=0,early_stop=True)
+    assert cut and len(body)<len(html)
+    full=parse_article_html("https://berita.example.id/a",html)
+    part=parse_article_html("https://berita.example.id/a",body)
+    assert part["article_text"] and part["article_text"]==full["article_text"]
+
+def test_no_early_stop_reads_whole_body():
+    html=fixture_page()
+    assert read_body(Streamed(html),max_bytes=0,early_stop=False)==(html,False)
+
+def test_paragraph_chars_ignores_markup():
+    assert paragraph_chars(b'<p class="x">Halo <b>dunia</b></p><div>abc</div><p>ok</p>')==len("Halo dunia")+2
@@ -0,0 +1,43 @@
+# tests/test_batch.py
+# Batch kata kunci × site: bobot, antrian weighted fair queueing, dan rencana yang tidak membuang query.
+
+from collections import Counter
+from datetime import date
+
+from crawler_engine.batch import expand_matrix, parse_weighted, plan_batch, run_batch_search, shard_queue
+
+START, END = date(2024,1,1), date(2024,6,30)
+
+def test_parse_weighted_and_expand_matrix():
+    kw=parse_weighted("banjir | 2\n# komentar\n\ngempa\nlongsor | x")
+    assert kw==[("banjir",2.0),("gempa",1.0),("longsor",1.0)]
+    qs=expand_matrix(kw,[("kompas.com",1.5),"site:detik.com"])
+    assert [q["query"] for q in qs][:2]==["banjir site:kompas.com","banjir site:detik.com"]
+    assert qs[0]["priority"]==3.0 and len(qs)==6
+    assert expand_matrix(["a","a",("b",0)])==[{"query":"a","priority":1.0}]
+
+def test_shard_queue_is_weighted_fair():
+    qs=[{"query":"berat","priority":2.0,"granularity":"Daily"},{"query":"ringan","priority":1.0,"granularity":"Daily"}]
+    queue=shard_queue(qs,START,END)
+    head=Counter(qi for qi,*_ in queue[:90])
+    assert head[0]==60 and head[1]==30
+    assert len({label for *_,label in queue})==len(queue)
+    firsts=[s for qi,s,_,_ in queue if qi==0]
+    assert firsts==sorted(firsts)   # shard satu query tetap urut tanggal
+
+def test_plan_batch_never_drops_queries():
+    qs=expand_matrix([f"kw{i}" for i in range(40)],["a.id","b.id","c.id","d.id","e.id"])
+    plan=plan_batch(qs,START,END,300,2000)
+    assert [p["query"] for p in plan]==[q["query"] for q in qs]
+    coarse=[p for p in plan if p.get("coarse")]
+    assert coarse and all(p["granularity"]=="Monthly" and p["per_shard_limit"]==10 for p in coarse)
+    assert plan_batch(qs[:2],START,END,300,2000,"Weekly",20)[1]=={**qs[1],"granularity":"Weekly","per_shard_limit":20}
+
+def test_run_batch_dedups_across_queries(mock_cse,pool):
+    qs=[dict(q,granularity="Monthly",per_shard_limit=10) for q in expand_matrix(["batch a","batch b"])]
+    items,stats=run_batch_search(pool,pool.cx,qs,START,date(2024,2,29),"id","id",100,qps=1000)
+    # MockCSE memberi link yang sama untuk hari yang sama → sebagian link query kedua sudah dimiliki query pertama
+    a,b=stats["queries"]
+    assert stats["calls"]==4 and a["unique"]==a["raw"]==20 and b["unique"]<b["raw"]
+    assert len(items)==len({it["link"] for it in items})==a["unique"]+b["unique"]
+    assert [it["query"] for it in items[:20]]==["batch a"]*20
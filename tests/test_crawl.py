@@ -0,0 +1,96 @@
+# tests/test_crawl.py
+# Planner adaptif (bisection, determinisme, pemotongan BudgetView) dan resume job dari checkpoint.
+
+import json
+from datetime import date
+
+import crawler_engine.articles as articles
+from crawler_engine.crawl import extract_items, run_adaptive_search, run_split_search
+from crawler_engine.jobs import JobCheckpoint, JobStore, create_job, job_params, run_job
+
+JAN, FEB_END = date(2024,1,1), date(2024,2,29)   # 60 hari × 5 artikel = 300 link
+
+def adaptive(pool,query,max_calls=1000,workers=4,checkpoint=None):
+    return run_adaptive_search(pool,pool.cx,query,JAN,FEB_END,"id","id",max_calls,10_000,
+                               shard_workers=workers,qps=1000,checkpoint=checkpoint)
+
+def links(items):
+    return [it["link"] for it in items]
+
+def test_adaptive_bisects_saturated_months(mock_cse,pool):
+    items,stats=adaptive(pool,"adaptif belah")
+    assert stats["splits"]>=2 and stats["skipped_shards"]==0
+    assert len(items)==300 and len(set(links(items)))==300
+    assert stats["complete_until"]==FEB_END.isoformat()
+    days=[(date.fromisoformat(it["shard_start"]),date.fromisoformat(it["shard_end"])) for it in items]
+    assert all((e-s).days<31 for s,e in days)   # tidak ada shard bulanan jenuh yang dipakai apa adanya
+
+def test_adaptive_order_independent_of_workers(mock_cse,pool):
+    from crawler_engine.cse import get_cse_cache
+    one,_=adaptive(pool,"adaptif urutan",workers=1)
+    cache=get_cse_cache()
+    with cache.lock: cache.conn.execute("DELETE FROM cse_cache")
+    four,_=adaptive(pool,"adaptif urutan",workers=4)
+    assert links(one)==links(four)
+
+def test_budget_truncated_shard_is_not_saved_and_resume_completes(mock_cse,pool,tmp_path):
+    store=JobStore(str(tmp_path/"jobs.sqlite3"))
+    job_id=store.create({"mode":"adaptive"})
+    items,stats=adaptive(pool,"adaptif budget",max_calls=3,checkpoint=JobCheckpoint(store,job_id))
+    assert stats["calls"]==3 and stats["skipped_shards"]>0
+    assert stats["complete_until"]<FEB_END.isoformat()
+    saved=store.shards(job_id)
+    assert all(split for _,split in saved.values())   # hanya dua probe bulanan yang lengkap
+    assert sum(len(v) for v,_ in saved.values())==len(items)
+    resumed,stats=adaptive(pool,"adaptif budget",checkpoint=JobCheckpoint(store,job_id))
+    assert stats["skipped_shards"]==0 and stats["complete_until"]==FEB_END.isoformat()
+    assert len(resumed)==300 and len(set(links(resumed)))==300
+
+def test_run_job_resume_replays_checkpoint_without_calls(mock_cse,pool,tmp_path):
+    store=JobStore(str(tmp_path/"jobs.sqlite3"))
+    params=job_params("manual","job resume",JAN,FEB_END,granularity="Weekly",per_shard_limit=20,qps=1000)
+    job_id=create_job(params,store=store)
+    first,_=run_job(job_id,pool,pool.cx,store=store)
+    calls=mock_cse.calls
+    again,stats=run_job(job_id,pool,pool.cx,store=store)
+    assert mock_cse.calls==calls and links(again)==links(first)
+    assert store.get(job_id)["status"]=="done" and stats["unique_links"]==len(first)
+
+def test_cli_resume_output_has_no_duplicates(mock_cse,tmp_path):
+    from crawler_engine.cli import main
+    from crawler_engine.jobs import get_job_store
+    out=str(tmp_path/"out.jsonl")
+    common=["--api-key","k","--cx","c","-q","-o",out]
+    main(["search","--query","cli resume","--from","2024-01-01","--to","2024-02-29","--plan","Weekly",
+          "--per-shard","20","--qps","1000"]+common)
+    n=sum(1 for _ in open(out,encoding="utf-8"))
+    main(["resume",get_job_store().recent(1)[0]["id"]]+common)
+    rows=[json.loads(line) for line in open(out,encoding="utf-8")]
+    assert n>0 and len(rows)==n and len({r["link"] for r in rows})==n
+
+def test_failed_articles_are_not_checkpointed(monkeypatch):
+    fetched=[]
+    def fake_enrich(items,on_article=None,**kw):
+        for it in items:
+            fetched.append(it["link"])
+            it.update(articles.EMPTY_ARTICLE if it["link"].endswith("gagal")
+                      else dict(articles.EMPTY_ARTICLE,article_text="isi berita"))
+            on_article(it)
+    monkeypatch.setattr(articles,"enrich_with_articles",fake_enrich)
+    class Checkpoint:
+        def __init__(self): self.saved={}
+        def article(self,row): return self.saved.get(row["link"])
+        def save_article(self,row): self.saved[row["link"]]={k:row[k] for k in articles.EMPTY_ARTICLE}
+    cp=Checkpoint()
+    rows=lambda:[{"link":"https://a.id/ok"},{"link":"https://a.id/gagal"}]
+    extract_items(rows(),checkpoint=cp)
+    out=extract_items(rows(),checkpoint=cp)
+    assert fetched==["https://a.id/ok","https://a.id/gagal","https://a.id/gagal"]
+    assert list(cp.saved)==["https://a.id/ok"] and out[0]["article_text"]=="isi berita"
+
+def test_split_search_dedups_across_shards(mock_cse,pool):
+    from crawler_engine.urls import DedupSet
+    dedup=DedupSet()
+    items=run_split_search(pool,pool.cx,"split dedup",JAN,date(2024,1,31),"Weekly",100,"id","id",
+                           qps=1000,dedup=dedup)
+    assert len(items)==155 and dedup.totals()["dup"]==0 and len(dedup.shard_stats)==5
@@ -0,0 +1,50 @@
+# tests/test_cse.py
+# Cache CSE: TTL, entri permanen untuk shard lampau (settle days), eviksi LRU, dan refresh.
+
+import time
+from datetime import date
+
+from crawler_engine.cse import CSECache, get_cse_cache, search_cse_page
+from crawler_engine.http import TokenBucket
+
+def test_ttl_expires_but_permanent_entries_stay(tmp_path):
+    cache=CSECache(str(tmp_path/"c.sqlite3"),ttl=0)
+    cache.put("tmp",{"a":1}); cache.put("perm",{"b":2},permanent=True)
+    time.sleep(0.01)
+    assert cache.get("tmp") is None and cache.get("perm")=={"b":2}
+    assert (cache.hits,cache.misses)==(1,1)
+    assert cache.count_cached(["tmp","perm"])==1
+
+def test_lru_evicts_least_recently_accessed(tmp_path):
+    cache=CSECache(str(tmp_path/"c.sqlite3"))
+    payload={"x":"".join(chr(0x4e00+i) for i in range(400))}   # ± 1 KB terkompres
+    cache.put("a",payload); cache.put("b",payload)
+    size=cache.conn.execute("SELECT MAX(size) FROM cse_cache").fetchone()[0]
+    cache.max_bytes=2*size
+    time.sleep(0.01); assert cache.get("a")==payload   # a lebih baru diakses daripada b
+    cache.put("c",payload)
+    assert cache.get("b") is None and cache.get("a")==payload and cache.get("c")==payload
+
+def test_is_past_query_settle_days():
+    today=date(2024,3,20)
+    assert CSECache.is_past_query("banjir after:2024-03-01 before:2024-03-13",today,settle_days=7)
+    assert not CSECache.is_past_query("banjir after:2024-03-01 before:2024-03-14",today,settle_days=7)
+    assert not CSECache.is_past_query("banjir tanpa tanggal",today)
+
+def test_make_key_depends_on_every_part():
+    base=("cx","q",10,1,"id","id")
+    keys={CSECache.make_key(*base),CSECache.make_key("cx2",*base[1:]),CSECache.make_key("cx","q",10,11,"id","id"),
+          CSECache.make_key("cx","q",10,1,"id","en")}
+    assert len(keys)==4
+
+def test_cache_hit_and_refresh(mock_cse,pool):
+    limiter=TokenBucket(1000)
+    q="cache refresh after:2023-01-01 before:2023-01-03"
+    first=search_cse_page(pool,pool.cx,q,limiter=limiter)
+    again=search_cse_page(pool,pool.cx,q,limiter=limiter)
+    assert mock_cse.calls==1 and again==first and first[1]==10
+    fresh=search_cse_page(pool,pool.cx,q,limiter=limiter,refresh=True)
+    assert mock_cse.calls==2 and fresh==first
+    key=CSECache.make_key(pool.cx,q,10,1,"id","id")
+    expires=get_cse_cache().conn.execute("SELECT expires FROM cse_cache WHERE key=?",(key,)).fetchone()[0]
+    assert expires is None   # shard lampau → permanen
@@ -0,0 +1,44 @@
+# tests/test_exports.py
+# Ekspor hasil: XLSX dipecah ke sheet Results, Results_2, ... saat melewati XLSX_MAX_ROWS; CSV/JSONL utuh.
+
+import csv, gzip, json
+
+import pytest
+
+import crawler_engine.exports as exports
+from crawler_engine.results import write_results
+
+def rows(n):
+    return [{"title":f"Berita {i}","link":f"https://a.id/{i}","snippet":"=SUM(A1)","position":i+1} for i in range(n)]
+
+def test_xlsx_splits_sheets(tmp_path,monkeypatch):
+    pytest.importorskip("xlsxwriter"); openpyxl=pytest.importorskip("openpyxl")
+    monkeypatch.setattr(exports,"XLSX_MAX_ROWS",4)
+    rs=write_results(rows(10),"xlsx",str(tmp_path))
+    path=exports.export_to(rs,"xlsx",str(tmp_path/"out.xlsx"),columns=["title","link","snippet"])
+    wb=openpyxl.load_workbook(path,read_only=True)
+    assert wb.sheetnames==["Results","Results_2","Results_3"]
+    sheets=[list(wb[name].iter_rows(values_only=True)) for name in wb.sheetnames]
+    assert all(s[0]==("title","link","snippet") for s in sheets)
+    assert [len(s)-1 for s in sheets]==[4,4,2]
+    assert [r[0] for s in sheets for r in s[1:]]==[f"Berita {i}" for i in range(10)]
+    assert sheets[0][1][2]=="=SUM(A1)"   # teks, bukan formula
+
+def test_xlsx_empty_result_has_header_sheet(tmp_path):
+    pytest.importorskip("xlsxwriter"); openpyxl=pytest.importorskip("openpyxl")
+    rs=write_results([],"kosong",str(tmp_path))
+    path=exports.export_to(rs,"xlsx",str(tmp_path/"kosong.xlsx"))
+    assert openpyxl.load_workbook(path,read_only=True).sheetnames==["Results"]
+
+def test_csv_and_jsonl_gz_roundtrip(tmp_path):
+    rs=write_results(rows(5),"teks",str(tmp_path))
+    with open(exports.export_to(rs,"csv",str(tmp_path/"out.csv")),encoding="utf-8",newline="") as fh:
+        got=list(csv.DictReader(fh))
+    assert [r["link"] for r in got]==[f"https://a.id/{i}" for i in range(5)]
+    with gzip.open(exports.export_to(rs,"jsonl.gz",str(tmp_path/"out.jsonl.gz")),"rt",encoding="utf-8") as fh:
+        assert [json.loads(line)["title"] for line in fh]==[f"Berita {i}" for i in range(5)]
+    assert not [p for p in tmp_path.iterdir() if p.name.endswith(".tmp")]
+
+def test_unknown_format(tmp_path):
+    rs=write_results(rows(1),"x",str(tmp_path))
+    with pytest.raises(ValueError): exports.export_to(rs,"docx",str(tmp_path/"out.docx"))
@@ -0,0 +1,32 @@
+# tests/test_neardup.py
+# Near-duplicate MinHash/LSH: berita sindikasi satu cluster, anggota pertama kanonik.
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from crawler_engine.neardup import NearDupIndex, annotate_near_duplicates, collapse_near_duplicates
+
+RILIS=("Jakarta (ANTARA) - Badan Meteorologi Klimatologi dan Geofisika memperkirakan hujan lebat disertai "
+       "angin kencang akan melanda sebagian besar wilayah Jawa Barat hingga akhir pekan ini sehingga warga "
+       "di daerah rawan banjir dan longsor diminta meningkatkan kewaspadaan serta memantau informasi resmi.")
+LAIN=("Tim nasional sepak bola Indonesia menang dua gol tanpa balas atas Vietnam dalam laga kualifikasi "
+      "Piala Dunia yang digelar di Stadion Utama Gelora Bung Karno pada Selasa malam di hadapan puluhan ribu suporter.")
+
+def test_index_clusters_syndicated_copies():
+    idx=NearDupIndex()
+    assert idx.add("a",RILIS)==(0,True)
+    assert idx.add("b",RILIS+" Baca juga: berita lainnya.")==(0,False)
+    assert idx.add("c",LAIN)==(1,True)
+    assert idx.add("a",RILIS)==(0,False)   # key yang sama tidak dihitung dua kali
+    assert idx.add("kosong","")==(None,True)
+    assert len(idx)==3 and idx.cluster_size=={0:2,1:1}
+
+def test_annotate_and_collapse():
+    rows=[{"link":"https://a.id/1","article_text":RILIS},{"link":"https://b.id/1","article_text":LAIN},
+          {"link":"https://c.id/1","article_text":RILIS},{"link":"https://d.id/1","article_text":""}]
+    annotate_near_duplicates(rows)
+    assert [r["dup_canonical"] for r in rows]==[True,True,False,""]
+    assert [r["dup_count"] for r in rows]==[2,1,2,1]
+    assert rows[0]["dup_cluster"]==rows[2]["dup_cluster"]!=rows[1]["dup_cluster"]
+    assert [r["link"] for r in collapse_near_duplicates(rows)]==["https://a.id/1","https://b.id/1","https://d.id/1"]
@@ -0,0 +1,60 @@
+# tests/test_quota.py
+# KeyPool: rotasi ke key dengan sisa terbanyak, kuota harian, cooldown 429, dan pesanan call paralel.
+
+import threading, time
+
+import pytest
+
+import crawler_engine.quota as quota
+from crawler_engine.quota import KeyPool, QuotaExhausted, QuotaLedger, parse_key_pool
+
+@pytest.fixture
+def ledger(tmp_path):
+    return QuotaLedger(str(tmp_path/"quota.sqlite3"))
+
+def test_pick_rotates_to_key_with_most_remaining(ledger):
+    pool=KeyPool([("a","cx1",3),("b","cx2",5)],ledger=ledger)
+    picked=[]
+    for _ in range(6):
+        k,_=pool.pick(); pool.record(k); picked.append(k)
+    assert picked[:3]==["b","b","a"]   # seri sisa kuota → key pertama di pool
+    assert [s["remaining"] for s in pool.status()]==[1,1] and pool.remaining()==2
+
+def test_exhausted_keys_raise(ledger):
+    pool=KeyPool([("a","cx",1),("b","cx",None)],ledger=ledger)
+    k,_=pool.pick(); pool.record(k,ok=False,exhausted=True)   # key tanpa batas ditolak Google
+    k,_=pool.pick(); assert k=="a"; pool.record(k)
+    with pytest.raises(QuotaExhausted): pool.pick()
+
+def test_release_returns_reservation(ledger):
+    pool=KeyPool([("a","cx",1)],ledger=ledger)
+    k,_=pool.pick()
+    with pytest.raises(QuotaExhausted): pool.pick()
+    pool.release(k)
+    assert pool.pick()[0]=="a" and pool.remaining()==1
+
+def test_all_keys_cooling_down_waits_instead_of_raising(ledger,monkeypatch):
+    monkeypatch.setattr(quota,"RATE_LIMIT_COOLDOWN",0.2)
+    pool=KeyPool([("a","cx"),("b","cx")],ledger=ledger)
+    for _ in range(2):
+        k,_=pool.pick(); pool.record(k,ok=False); pool.rate_limited(k)
+    t=time.monotonic()
+    assert pool.pick()[0] in ("a","b")
+    assert time.monotonic()-t>=0.15
+
+def test_concurrent_picks_never_exceed_quota(ledger):
+    pool=KeyPool([("a","cx",5),("b","cx",5)],ledger=ledger)
+    got, refused = [], []
+    def call():
+        try: k,_=pool.pick()
+        except QuotaExhausted: refused.append(1); return
+        time.sleep(0.01); pool.record(k); got.append(k)
+    threads=[threading.Thread(target=call) for _ in range(30)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert len(got)==10 and len(refused)==20
+    assert [s["used"] for s in pool.status()]==[5,5]
+
+def test_parse_key_pool():
+    text="# komentar\nk1 cx1 100\nk2,cx2\nrusak\n"
+    assert parse_key_pool(text)==[("k1","cx1",100),("k2","cx2",None)]
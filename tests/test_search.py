@@ -0,0 +1,39 @@
+# tests/test_search.py
+# Stemmer Bahasa Indonesia (aturan bawaan & Sastrawi) dan query awalan indeks full-text.
+
+import pytest
+
+from crawler_engine.search import SearchIndex, _rule_stem, _sastrawi, fts_query, stem
+
+ROOTS = {
+    "sekolah": "sekolah", "menteri": "menteri", "kebijakan": "bijak", "pemerintah": "perintah",
+    "pendidikan": "didik", "didik": "didik", "menyatakan": "nyata", "pernyataan": "nyata",
+    "menyebutkan": "sebut", "mengatakan": "kata", "dilakukan": "laku", "memberikan": "beri",
+    "pemberian": "beri", "terjadi": "jadi", "berita": "berita", "perang": "perang",
+}
+
+@pytest.mark.parametrize("word,root",sorted(ROOTS.items()))
+def test_rule_stem_roots(word,root):
+    assert _rule_stem(word)==root
+
+@pytest.mark.parametrize("word,root",sorted(ROOTS.items()))
+def test_stem_roots(word,root):
+    if _sastrawi() is None: pytest.skip("Sastrawi tidak terpasang")
+    assert stem(word)==root
+
+@pytest.mark.parametrize("a,b",[("pendidikan","didik"),("menyatakan","pernyataan"),("dibaca","membaca"),
+                                ("pemerintahan","pemerintah")])
+def test_rule_stem_consistent(a,b):
+    assert _rule_stem(a)==_rule_stem(b)
+
+def test_rule_stem_never_shorter_than_min():
+    for w in ("sekolah","menteri","masalahnya","setelah","penting","bencana"):
+        assert len(_rule_stem(w))>=4
+
+def test_prefix_query_matches_unstemmed_words(tmp_path):
+    ix=SearchIndex(str(tmp_path/"search.sqlite3"))
+    ix.add_many([{"link":"https://a.id/1","article_title":"Kebijakan","article_text":"Pemerintah mengumumkan kebijakan."},
+                 {"link":"https://a.id/2","article_title":"Banjir","article_text":"Banjir melanda Jakarta."}])
+    assert fts_query("pemerin*")=='words : "pemerin"*'
+    assert [h["link"] for h in ix.search("pemerin*")]==["https://a.id/1"]
+    assert [h["link"] for h in ix.search("banj* -pemerin*")]==["https://a.id/2"]
@@ -0,0 +1,34 @@
+# tests/test_urls.py
+# Kanonikalisasi URL dan seen-set dedup (link dimiliki kemunculan pertama).
+
+import pytest
+
+from crawler_engine.urls import DedupSet, canonical_url
+
+@pytest.mark.parametrize("url",[
+    "https://www.kompas.com/read/2024/01/02/berita",
+    "http://m.kompas.com/read/2024/01/02/berita/",
+    "https://amp.kompas.com/read/2024/01/02/berita?utm_source=x&fbclid=y",
+    "https://kompas.com/amp/read/2024/01/02/berita?page=all#komentar",
+    "https://KOMPAS.com:443/read/2024/01/02/berita",
+])
+def test_canonical_url_variants(url):
+    assert canonical_url(url)=="https://kompas.com/read/2024/01/02/berita"
+
+def test_canonical_url_keeps_content_params_sorted():
+    assert canonical_url("https://x.id/a?b=2&a=1&utm_medium=z")=="https://x.id/a?a=1&b=2"
+    assert canonical_url("https://x.id:8080/a")=="https://x.id:8080/a"
+
+def test_dedup_keeps_first_occurrence_in_call_order():
+    d=DedupSet()
+    first=d.filter([{"link":"https://www.a.id/1"},{"link":"https://a.id/2"},{"link":"https://m.a.id/1/"}],"s1")
+    second=d.filter([{"link":"https://a.id/2?utm_source=x"},{"link":"https://a.id/3"}],"s2")
+    assert [it["link"] for it in first]==["https://www.a.id/1","https://a.id/2"]
+    assert [it["link"] for it in second]==["https://a.id/3"]
+    assert d.redundancy("s1")==pytest.approx(1/3) and d.redundancy("s2")==0.5
+    assert d.totals()=={"raw":5,"dup":2,"unique":3} and len(d)==3
+
+def test_dedup_keeps_rows_without_link_and_seeds():
+    d=DedupSet({canonical_url("https://a.id/1")})
+    out=d.filter([{"link":"https://www.a.id/1"},{"title":"tanpa link"},{"title":"tanpa link"}])
+    assert out==[{"title":"tanpa link"},{"title":"tanpa link"}]
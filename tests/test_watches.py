@@ -0,0 +1,46 @@
+# tests/test_watches.py
+# Query terjadwal: jendela delta (watermark + overlap), refresh cache, dan watermark yang hanya maju.
+
+import json
+from datetime import date
+
+from crawler_engine.jobs import job_params
+from crawler_engine.watches import WatchStore, delta_job_params, delta_window, run_watch, save_watch
+
+JAN = date(2024,1,1)
+
+def watch(watermark=None,overlap=2,mode="adaptive"):
+    return {"params":job_params(mode,"q",JAN,JAN,max_calls=100,target_links=1000),
+            "overlap":overlap,"watermark":watermark}
+
+def test_delta_window():
+    today=date(2024,3,1)
+    assert delta_window(watch(),today)==(JAN,today)
+    assert delta_window(watch("2024-02-20"),today)==(date(2024,2,19),today)
+    assert delta_window(watch("2024-02-20",overlap=0),today)==(date(2024,2,21),today)
+    assert delta_window(watch("2024-01-01",overlap=10),today)==(JAN,today)   # tidak sebelum awal backfill
+
+def test_delta_job_params():
+    params,plan=delta_job_params(watch("2024-02-20"),date(2024,3,1),quota_left=40)
+    assert params["refresh_cache"] and params["max_calls"]==40
+    assert (params["start_date"],params["end_date"])==("2024-02-19","2024-03-01") and plan["roots"]
+    assert "refresh_cache" not in delta_job_params(watch(),date(2024,3,1))[0]
+    assert delta_job_params(watch("2024-03-01",overlap=0),date(2024,3,1)) is None
+
+def test_run_watch_advances_watermark_and_skips_seen_links(mock_cse,pool,tmp_path):
+    store=WatchStore(str(tmp_path/"watches.sqlite3"))
+    dataset=str(tmp_path/"dataset.jsonl")
+    params=job_params("adaptive","pantau banjir",JAN,JAN,max_calls=1000,target_links=10_000,qps=1000)
+    save_watch("banjir",params,overlap=2,dataset=dataset,store=store)
+    _,first,_=run_watch("banjir",pool,pool.cx,today=date(2024,2,10),store=store)
+    assert store.get("banjir")["watermark"]=="2024-02-10" and len(first)==41*5
+    job_id,second,_=run_watch("banjir",pool,pool.cx,today=date(2024,2,20),store=store)
+    assert len(second)==10*5 and not {r["link"] for r in second}&{r["link"] for r in first}
+    assert store.get("banjir")["watermark"]=="2024-02-20" and store.get("banjir")["last_job"]==job_id
+    rows=[json.loads(line) for line in open(dataset,encoding="utf-8")]
+    assert len(rows)==len({r["link"] for r in rows})==51*5
+    # run yang terpotong budget di jendela overlap tidak memundurkan watermark
+    store.save("banjir",dict(params,max_calls=1),12,dataset)
+    _,_,stats=run_watch("banjir",pool,pool.cx,today=date(2024,2,20),store=store)
+    assert stats["skipped_shards"] and stats["complete_until"]<"2024-02-20"
+    assert store.get("banjir")["watermark"]=="2024-02-20"
@@ -0,0 +1,27 @@
+# tests/test_yields.py
+# Model yield: laju dari shard tak jenuh; totalResults yang menggelembung tidak menaikkan estimasi.
+
+import pytest
+
+from crawler_engine.yields import MIN_OBSERVATIONS, YieldStore, fit_model
+
+def test_fit_model_ignores_inflated_total_results():
+    # (hari, totalResults, returned, requested, unique)
+    exact=[(7,9_000,35,100,35),(7,12_000,42,100,40),(7,8_000,28,100,28)]
+    saturated=[(31,250_000,100,100,95)]*5
+    model=fit_model(exact+saturated,"Weekly")
+    assert model.rate==pytest.approx(5.0) and model.n==8
+
+def test_fit_model_uses_saturated_lower_bound_when_few_exact():
+    rows=[(7,900,14,100,14)]+[(31,50_000,100,100,100)]*(MIN_OBSERVATIONS)
+    assert fit_model(rows,"Monthly").rate==pytest.approx(100/31)
+
+def test_store_model_needs_min_observations(tmp_path):
+    from datetime import date
+    store=YieldStore(str(tmp_path/"y.sqlite3"))
+    for d in range(MIN_OBSERVATIONS-1):
+        store.record("banjir site:a.id",date(2024,1,1+7*d),date(2024,1,7+7*d),99_000,30,100,30)
+    assert store.model("banjir site:a.id","Weekly") is None
+    store.record("banjir site:a.id",date(2024,2,1),date(2024,2,7),99_000,30,100,30)
+    model=store.model("banjir site:a.id","Weekly")
+    assert model is not None and model.available(7)==pytest.approx(30)